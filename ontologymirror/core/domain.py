@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 class RawColumn(BaseModel):
@@ -6,6 +6,8 @@ class RawColumn(BaseModel):
     original_type: str
     nullable: bool = True
     pk: bool = False
+    fk: Optional[str] = None  # "table.column" this column references
+    profile: Optional[Dict[str, Any]] = None  # column statistics, see extractors/column_profiler.py
 
 class RawTable(BaseModel):
     name: str
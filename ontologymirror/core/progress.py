@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+
+# Seconds between two forwarded update() events (phase changes and errors always go through)
+DEFAULT_INTERVAL = 0.25
+
+# Phases of an operation, in the order they usually come
+READ = "read"           # reading (and for whole files, sanitizing) a source file
+LOAD = "load"           # executing statements into SQLite
+SKIP = "skip"           # file already loaded (see import_manifest)
+MERGE = "merge"         # copying shard databases into the target (sharded imports)
+INDEX = "index"         # building deferred indexes
+EXTRACT = "extract"     # reading tables back (DBExtractor)
+DONE = "done"
+ABORTED = "aborted"
+
+
+class ProgressEvent:
+    """
+    One progress report of an import or extraction.
+
+    done / total count `unit` ("bytes" of the source files, or "tables"); total is
+    None when unknown. items is the number of statements (or tables) processed so far,
+    rate items per second since the operation started, eta the estimated seconds
+    left from the done / total rate. file is the file (or table) being worked on,
+    error the message of a failure.
+    """
+
+    __slots__ = ('operation', 'phase', 'file', 'done', 'total', 'unit', 'items', 'rate', 'eta', 'elapsed',
+                 'error', 'message')
+
+    def __init__(self, operation, phase, file=None, done=0, total=None, unit="bytes", items=0, rate=None,
+                 eta=None, elapsed=0.0, error=None, message=None):
+        self.operation = operation
+        self.phase = phase
+        self.file = file
+        self.done = done
+        self.total = total
+        self.unit = unit
+        self.items = items
+        self.rate = rate
+        self.eta = eta
+        self.elapsed = elapsed
+        self.error = error
+        self.message = message
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def summary(self):
+        """One status line, e.g. "load orders.sql 12.5/40.0 MB, 8200 stmt/s, ETA 0:03"."""
+        parts = [self.phase or self.operation]
+        if self.file:
+            parts.append(os.path.basename(self.file))
+        if self.unit == "bytes":
+            amount = f"{self.done / 1e6:.1f}" + (f"/{self.total / 1e6:.1f}" if self.total else "") + " MB"
+        else:
+            amount = f"{self.done}" + (f"/{self.total}" if self.total else "") + f" {self.unit}"
+        line = " ".join(parts) + " " + amount
+        if self.rate:
+            line += f", {self.rate:.0f} stmt/s" if self.unit == "bytes" else f", {self.rate:.1f} {self.unit}/s"
+        if self.eta is not None:
+            line += f", ETA {int(self.eta) // 60}:{int(self.eta) % 60:02d}"
+        if self.error:
+            line += f" - {self.error}"
+        elif self.message:
+            line += f" - {self.message}"
+        return line
+
+    def __repr__(self):
+        return f"ProgressEvent({self.operation!r}, {self.phase!r}, done={self.done}, total={self.total})"
+
+
+class ProgressReporter:
+    """
+    Builds the ProgressEvents of one operation and passes them to sink(event).
+
+    update() is called as often as convenient (every statement group, every table);
+    only one event per `interval` seconds reaches the sink, carrying the latest
+    counters, so a fast load cannot flood a UI queue. phase(), error() and finish()
+    are always forwarded. Safe to call from any thread; the sink runs on the caller's.
+    """
+
+    def __init__(self, sink, operation, total=None, unit="bytes", interval=DEFAULT_INTERVAL):
+        self.sink = sink
+        self.operation = operation
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._last_sent = 0.0
+        self._phase = None
+        self._file = None
+        self._done = 0
+        self._items = 0
+
+    def phase(self, phase, file=None, message=None):
+        with self._lock:
+            self._phase = phase
+            if file is not None:
+                self._file = file
+            event = self._event(message=message)
+        self._send(event)
+
+    def update(self, done=None, items=None, file=None):
+        """Sets the counters (absolute values); forwards an event if `interval` has passed."""
+        with self._lock:
+            if done is not None:
+                self._done = done
+            if items is not None:
+                self._items = items
+            if file is not None:
+                self._file = file
+            now = time.monotonic()
+            if now - self._last_sent < self.interval:
+                return
+            event = self._event(now)
+        self._send(event)
+
+    def error(self, message, file=None):
+        with self._lock:
+            if file is not None:
+                self._file = file
+            event = self._event(error=message)
+        self._send(event)
+
+    def finish(self, ok=True, message=None):
+        with self._lock:
+            self._phase = DONE if ok else ABORTED
+            if ok and self.total is not None:
+                self._done = self.total
+            event = self._event(message=message)
+        self._send(event)
+
+    def _event(self, now=None, error=None, message=None):
+        now = time.monotonic() if now is None else now
+        self._last_sent = now
+        elapsed = now - self.started
+        rate = self._items / elapsed if elapsed > 0 else None
+        eta = None
+        if self.total and 0 < self._done < self.total and elapsed > 0:
+            eta = (self.total - self._done) * elapsed / self._done
+        return ProgressEvent(self.operation, self._phase, self._file, self._done, self.total, self.unit,
+                             self._items, rate, eta, elapsed, error, message)
+
+    def _send(self, event):
+        if self.sink is not None:
+            self.sink(event)
+
+
+class ProgressBoard:
+    """
+    Latest ProgressEvent of each running job, for a polling endpoint.
+    sink(job_id) returns a ProgressReporter sink that stores into the board;
+    finished jobs are forgotten after `keep` seconds.
+    """
+
+    def __init__(self, keep=600):
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._jobs = {}     # job_id -> (event dict, errors, monotonic time of the last event)
+
+    def sink(self, job_id):
+        def store(event):
+            with self._lock:
+                _, errors, _ = self._jobs.get(job_id, (None, [], 0))
+                if event.error:
+                    errors = errors + [{"file": event.file, "error": event.error}]
+                self._jobs[job_id] = (event.to_dict(), errors, time.monotonic())
+        return store
+
+    def get(self, job_id):
+        """{"event": latest event dict, "errors": [...]} or None for an unknown job."""
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {"event": job[0], "errors": job[1]}
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.keep
+        for job_id in [j for j, (event, _, at) in self._jobs.items()
+                       if at < cutoff and event["phase"] in (DONE, ABORTED)]:
+            del self._jobs[job_id]
@@ -0,0 +1,337 @@
+import hashlib
+import itertools
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+
+# Prefix of the tables an import adds to the database it loads (the importer's manifest and
+# quarantine tables); they are not part of the imported schema, so table listings and
+# extraction leave them out
+IMPORT_TABLE_PREFIX = "_import_"
+
+
+def is_import_table(name):
+    """Whether a table is one of the importer's own (see IMPORT_TABLE_PREFIX)."""
+    return name.startswith(IMPORT_TABLE_PREFIX)
+
+# Set-based catalog queries per dialect: every table of the given schemas in one query
+# each for tables (with the planner's row estimate), columns, keys and indexes.
+
+_PG_TABLES = """
+    SELECT n.nspname, c.relname, c.reltuples::bigint, st.n_tup_ins + st.n_tup_upd + st.n_tup_del
+    FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_all_tables st ON st.relid = c.oid
+    WHERE c.relkind IN ('r', 'p') AND NOT c.relispartition AND n.nspname IN :schemas
+    ORDER BY n.nspname, c.relname
+"""
+_PG_COLUMNS = """
+    SELECT n.nspname, c.relname, a.attname, format_type(a.atttypid, a.atttypmod), NOT a.attnotnull,
+           pg_get_expr(d.adbin, d.adrelid)
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE a.attnum > 0 AND NOT a.attisdropped AND c.relkind IN ('r', 'p') AND n.nspname IN :schemas
+    ORDER BY n.nspname, c.relname, a.attnum
+"""
+_PG_CONSTRAINTS = """
+    SELECT n.nspname, c.relname, con.conname, con.contype,
+           ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(attnum, ord)
+                 JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum ORDER BY k.ord),
+           fn.nspname, fc.relname,
+           ARRAY(SELECT a.attname FROM unnest(con.confkey) WITH ORDINALITY k(attnum, ord)
+                 JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum ORDER BY k.ord)
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_class fc ON fc.oid = con.confrelid
+    LEFT JOIN pg_namespace fn ON fn.oid = fc.relnamespace
+    WHERE con.contype IN ('p', 'f') AND n.nspname IN :schemas
+    ORDER BY n.nspname, c.relname, con.conname
+"""
+_PG_INDEXES = """
+    SELECT n.nspname, c.relname, i.relname, ix.indisunique,
+           ARRAY(SELECT a.attname FROM unnest(ix.indkey::int2[]) WITH ORDINALITY k(attnum, ord)
+                 JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum ORDER BY k.ord)
+    FROM pg_index ix
+    JOIN pg_class c ON c.oid = ix.indrelid
+    JOIN pg_class i ON i.oid = ix.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE NOT ix.indisprimary AND c.relkind IN ('r', 'p') AND n.nspname IN :schemas
+    ORDER BY n.nspname, c.relname, i.relname
+"""
+
+_MYSQL_TABLES = """
+    SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_ROWS, UPDATE_TIME FROM information_schema.TABLES
+    WHERE TABLE_TYPE = 'BASE TABLE' AND TABLE_SCHEMA IN :schemas
+    ORDER BY TABLE_SCHEMA, TABLE_NAME
+"""
+_MYSQL_COLUMNS = """
+    SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE = 'YES', COLUMN_DEFAULT
+    FROM information_schema.COLUMNS WHERE TABLE_SCHEMA IN :schemas
+    ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+"""
+_MYSQL_KEYS = """
+    SELECT TABLE_SCHEMA, TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME,
+           REFERENCED_TABLE_SCHEMA, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+    FROM information_schema.KEY_COLUMN_USAGE
+    WHERE TABLE_SCHEMA IN :schemas AND (CONSTRAINT_NAME = 'PRIMARY' OR REFERENCED_TABLE_NAME IS NOT NULL)
+    ORDER BY TABLE_SCHEMA, TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+"""
+_MYSQL_INDEXES = """
+    SELECT TABLE_SCHEMA, TABLE_NAME, INDEX_NAME, NON_UNIQUE = 0, COLUMN_NAME
+    FROM information_schema.STATISTICS WHERE TABLE_SCHEMA IN :schemas AND INDEX_NAME <> 'PRIMARY'
+    ORDER BY TABLE_SCHEMA, TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+"""
+
+_MSSQL_TABLES = """
+    SELECT s.name, t.name, (SELECT SUM(p.rows) FROM sys.partitions p
+                            WHERE p.object_id = t.object_id AND p.index_id IN (0, 1)),
+           t.modify_date
+    FROM sys.tables t JOIN sys.schemas s ON s.schema_id = t.schema_id
+    WHERE t.is_ms_shipped = 0 AND s.name IN :schemas
+    ORDER BY s.name, t.name
+"""
+_MSSQL_COLUMNS = """
+    SELECT s.name, t.name, c.name, ty.name, c.max_length, c.precision, c.scale, c.is_nullable, dc.definition
+    FROM sys.columns c
+    JOIN sys.tables t ON t.object_id = c.object_id
+    JOIN sys.schemas s ON s.schema_id = t.schema_id
+    JOIN sys.types ty ON ty.user_type_id = c.user_type_id
+    LEFT JOIN sys.default_constraints dc ON dc.object_id = c.default_object_id
+    WHERE t.is_ms_shipped = 0 AND s.name IN :schemas
+    ORDER BY s.name, t.name, c.column_id
+"""
+_MSSQL_INDEXES = """
+    SELECT s.name, t.name, i.name, i.is_primary_key, i.is_unique, c.name
+    FROM sys.indexes i
+    JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    JOIN sys.tables t ON t.object_id = i.object_id
+    JOIN sys.schemas s ON s.schema_id = t.schema_id
+    WHERE t.is_ms_shipped = 0 AND ic.is_included_column = 0 AND s.name IN :schemas
+    ORDER BY s.name, t.name, i.name, ic.key_ordinal
+"""
+_MSSQL_FOREIGN_KEYS = """
+    SELECT s.name, t.name, fk.name, pc.name, rs.name, rt.name, rc.name
+    FROM sys.foreign_key_columns fkc
+    JOIN sys.foreign_keys fk ON fk.object_id = fkc.constraint_object_id
+    JOIN sys.tables t ON t.object_id = fkc.parent_object_id
+    JOIN sys.schemas s ON s.schema_id = t.schema_id
+    JOIN sys.columns pc ON pc.object_id = fkc.parent_object_id AND pc.column_id = fkc.parent_column_id
+    JOIN sys.tables rt ON rt.object_id = fkc.referenced_object_id
+    JOIN sys.schemas rs ON rs.schema_id = rt.schema_id
+    JOIN sys.columns rc ON rc.object_id = fkc.referenced_object_id AND rc.column_id = fkc.referenced_column_id
+    WHERE s.name IN :schemas
+    ORDER BY s.name, t.name, fk.name, fkc.constraint_column_id
+"""
+
+# SQLite has one catalog per attached database; {schema} is its quoted name, :schema the plain one
+_SQLITE_TABLES = """
+    SELECT name FROM {schema}.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\'
+    ORDER BY name
+"""
+_SQLITE_COLUMNS = """
+    SELECT m.name, p.name, p.type, NOT p."notnull", p.dflt_value, p.pk
+    FROM {schema}.sqlite_master m JOIN pragma_table_info(m.name, :schema) p
+    WHERE m.type = 'table' ORDER BY m.name, p.cid
+"""
+_SQLITE_FOREIGN_KEYS = """
+    SELECT m.name, f.id, f."from", f."table", f."to"
+    FROM {schema}.sqlite_master m JOIN pragma_foreign_key_list(m.name, :schema) f
+    WHERE m.type = 'table' ORDER BY m.name, f.id, f.seq
+"""
+_SQLITE_INDEXES = """
+    SELECT m.name, il.name, il."unique", ii.name
+    FROM {schema}.sqlite_master m
+    JOIN pragma_index_list(m.name, :schema) il
+    JOIN pragma_index_info(il.name, :schema) ii
+    WHERE m.type = 'table' AND il.origin <> 'pk' ORDER BY m.name, il.name, ii.seqno
+"""
+# Row counts ANALYZE recorded: the first number of a table's stat rows
+_SQLITE_STATS = "SELECT tbl, max(CAST(stat AS INTEGER)) FROM {schema}.sqlite_stat1 GROUP BY tbl"
+
+
+def read_catalog(conn, schemas) -> Optional[Dict[Tuple[str, str], Dict[str, Any]]]:
+    """
+    Every table of `schemas` with its columns, primary key, foreign keys, indexes and
+    estimated row count, read with a handful of set-based catalog queries (PostgreSQL,
+    MySQL / MariaDB, MSSQL, SQLite) instead of several inspector round-trips per table.
+
+    conn: SQLAlchemy Connection; schemas: schema names, the default one by its name too.
+    Returns {(schema, table): entry} in schema and table order, or None for other dialects.
+    entry: {"schema", "name", "columns": [{"name", "type", "nullable", "default", "primary_key"}],
+    "primary_key": [column], "foreign_keys": [{"name", "constrained_columns", "referred_schema",
+    "referred_table", "referred_columns"}], "indexes": [{"name", "column_names", "unique"}],
+    "row_count": the catalog's estimate, None if it has none, "modified": what the catalog
+    tracks of the table's changes (PostgreSQL's row change counters, MySQL's UPDATE_TIME,
+    MSSQL's modify_date) as a string, None on SQLite}.
+    """
+    reader = _READERS.get(conn.dialect.name)
+    if reader is None:
+        return None
+    tables = {}
+    if schemas:
+        reader(conn, list(schemas), tables)
+    for table in tables.values():
+        primary_key = set(table["primary_key"])
+        for column in table["columns"]:
+            column["primary_key"] = column["name"] in primary_key
+    return tables
+
+
+def fingerprint(entry) -> str:
+    """
+    SHA-1 of what a catalog entry says about its table (columns, keys, indexes, row
+    estimate, change marker): equal fingerprints mean the table needs no re-extraction.
+    """
+    state = [entry.get(key) for key in ("columns", "primary_key", "foreign_keys", "indexes", "row_count", "modified")]
+    return hashlib.sha1(json.dumps(state, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _entry(schema, name, row_count, modified=None):
+    return {"schema": schema, "name": name, "columns": [], "primary_key": [], "foreign_keys": [], "indexes": [],
+            "row_count": int(row_count) if row_count is not None and row_count >= 0 else None,
+            "modified": str(modified) if modified is not None else None}
+
+
+def _column(name, type_, nullable, default):
+    return {"name": name, "type": type_, "nullable": bool(nullable), "default": default}
+
+
+def _foreign_key(name, columns, referred_schema, referred_table, referred_columns):
+    return {"name": name, "constrained_columns": list(columns), "referred_schema": referred_schema,
+            "referred_table": referred_table, "referred_columns": list(referred_columns)}
+
+
+def _rows(conn, query, schemas):
+    return conn.execute(text(query).bindparams(bindparam("schemas", expanding=True)), {"schemas": schemas})
+
+
+def _groups(rows, width):
+    """Rows grouped by their first `width` fields (one group per constraint or index)."""
+    return itertools.groupby(rows, key=lambda row: tuple(row[:width]))
+
+
+def _read_postgresql(conn, schemas, tables):
+    for schema, name, rows, modified in _rows(conn, _PG_TABLES, schemas):
+        tables[(schema, name)] = _entry(schema, name, rows, modified)
+    for schema, name, column, type_, nullable, default in _rows(conn, _PG_COLUMNS, schemas):
+        if (schema, name) in tables:
+            tables[(schema, name)]["columns"].append(_column(column, type_, nullable, default))
+    for schema, name, constraint, kind, columns, ref_schema, ref_table, ref_columns in \
+            _rows(conn, _PG_CONSTRAINTS, schemas):
+        table = tables.get((schema, name))
+        if table is None:
+            continue
+        if kind == 'p':
+            table["primary_key"] = list(columns)
+        else:
+            table["foreign_keys"].append(_foreign_key(constraint, columns, ref_schema, ref_table, ref_columns))
+    for schema, name, index, unique, columns in _rows(conn, _PG_INDEXES, schemas):
+        if (schema, name) in tables:
+            tables[(schema, name)]["indexes"].append({"name": index, "column_names": list(columns),
+                                                      "unique": bool(unique)})
+
+
+def _read_mysql(conn, schemas, tables):
+    for schema, name, rows, modified in _rows(conn, _MYSQL_TABLES, schemas):
+        tables[(schema, name)] = _entry(schema, name, rows, modified)
+    for schema, name, column, type_, nullable, default in _rows(conn, _MYSQL_COLUMNS, schemas):
+        if (schema, name) in tables:
+            tables[(schema, name)]["columns"].append(_column(column, type_, nullable, default))
+    for (schema, name, constraint), rows in _groups(_rows(conn, _MYSQL_KEYS, schemas), 3):
+        table = tables.get((schema, name))
+        if table is None:
+            continue
+        rows = list(rows)
+        if constraint == 'PRIMARY':
+            table["primary_key"] = [row[3] for row in rows]
+        else:
+            table["foreign_keys"].append(_foreign_key(constraint, [row[3] for row in rows], rows[0][4], rows[0][5],
+                                                      [row[6] for row in rows]))
+    for (schema, name, index), rows in _groups(_rows(conn, _MYSQL_INDEXES, schemas), 3):
+        if (schema, name) in tables:
+            rows = list(rows)
+            tables[(schema, name)]["indexes"].append({"name": index, "column_names": [row[4] for row in rows],
+                                                      "unique": bool(rows[0][3])})
+
+
+def _mssql_type(name, max_length, precision, scale):
+    """T-SQL spelling of a sys.columns type: nvarchar(50), varchar(max), decimal(10,2) ..."""
+    if name in ('varchar', 'char', 'varbinary', 'binary', 'nvarchar', 'nchar'):
+        if max_length == -1:
+            return f"{name}(max)"
+        return f"{name}({max_length // 2 if name.startswith('n') else max_length})"
+    if name in ('decimal', 'numeric'):
+        return f"{name}({precision},{scale})"
+    if name in ('datetime2', 'datetimeoffset', 'time'):
+        return f"{name}({scale})"
+    return name
+
+
+def _read_mssql(conn, schemas, tables):
+    for schema, name, rows, modified in _rows(conn, _MSSQL_TABLES, schemas):
+        tables[(schema, name)] = _entry(schema, name, rows, modified)
+    for schema, name, column, type_, max_length, precision, scale, nullable, default in \
+            _rows(conn, _MSSQL_COLUMNS, schemas):
+        if (schema, name) in tables:
+            tables[(schema, name)]["columns"].append(
+                _column(column, _mssql_type(type_, max_length, precision, scale), nullable, default))
+    for (schema, name, index), rows in _groups(_rows(conn, _MSSQL_INDEXES, schemas), 3):
+        table = tables.get((schema, name))
+        if table is None:
+            continue
+        rows = list(rows)
+        if rows[0][3]:
+            table["primary_key"] = [row[5] for row in rows]
+        else:
+            table["indexes"].append({"name": index, "column_names": [row[5] for row in rows],
+                                     "unique": bool(rows[0][4])})
+    for (schema, name, constraint), rows in _groups(_rows(conn, _MSSQL_FOREIGN_KEYS, schemas), 3):
+        if (schema, name) in tables:
+            rows = list(rows)
+            tables[(schema, name)]["foreign_keys"].append(
+                _foreign_key(constraint, [row[3] for row in rows], rows[0][4], rows[0][5], [row[6] for row in rows]))
+
+
+def _read_sqlite(conn, schemas, tables):
+    quote = conn.dialect.identifier_preparer.quote
+    for schema in schemas:
+        params = {"schema": schema}
+        quoted = quote(schema)
+        counts = {}
+        if conn.execute(text(f"SELECT 1 FROM {quoted}.sqlite_master WHERE name = 'sqlite_stat1'")).first():
+            counts = dict(conn.execute(text(_SQLITE_STATS.format(schema=quoted))).all())
+        for (name,) in conn.execute(text(_SQLITE_TABLES.format(schema=quoted))):
+            tables[(schema, name)] = _entry(schema, name, counts.get(name))
+        primary_keys = {}
+        for name, column, type_, nullable, default, pk in conn.execute(
+                text(_SQLITE_COLUMNS.format(schema=quoted)), params):
+            if (schema, name) in tables:
+                tables[(schema, name)]["columns"].append(_column(column, type_, nullable, default))
+                if pk:
+                    primary_keys.setdefault(name, []).append((pk, column))
+        for name, columns in primary_keys.items():
+            tables[(schema, name)]["primary_key"] = [column for _, column in sorted(columns)]
+        for (name, _), rows in _groups(conn.execute(text(_SQLITE_FOREIGN_KEYS.format(schema=quoted)), params), 2):
+            if (schema, name) in tables:
+                rows = list(rows)
+                # SQLite keeps referenced tables by name, in the same database
+                tables[(schema, name)]["foreign_keys"].append(
+                    _foreign_key(None, [row[2] for row in rows], schema, rows[0][3], [row[4] for row in rows]))
+        for (name, index), rows in _groups(conn.execute(text(_SQLITE_INDEXES.format(schema=quoted)), params), 2):
+            if (schema, name) in tables:
+                rows = list(rows)
+                tables[(schema, name)]["indexes"].append({"name": index, "column_names": [row[3] for row in rows],
+                                                          "unique": bool(rows[0][2])})
+
+
+_READERS = {
+    "postgresql": _read_postgresql,
+    "mysql": _read_mysql,
+    "mariadb": _read_mysql,
+    "mssql": _read_mssql,
+    "sqlite": _read_sqlite,
+}
@@ -0,0 +1,134 @@
+import hashlib
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Rows read per table by default when profiling
+DEFAULT_ROW_BUDGET = 10000
+# Most frequent value patterns reported per column
+TOP_PATTERNS = 5
+# Distinct patterns counted per column; rarer ones seen after that are not counted
+_MAX_PATTERNS = 1000
+# Characters of a value turned into its pattern
+_PATTERN_PREFIX = 64
+
+
+class HyperLogLog:
+    """
+    Approximate distinct count in 2**precision one-byte registers
+    (precision 12: 4 KB per column, about 1.6% standard error).
+    """
+
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any):
+        data = value.encode('utf-8', 'surrogatepass') if isinstance(value, str) else \
+            value if isinstance(value, bytes) else repr(value).encode('utf-8')
+        x = int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+        bits = 64 - self.precision
+        index = x >> bits
+        rank = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        if estimate <= 2.5 * m:
+            # Small counts: linear counting over the empty registers is closer
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+def value_pattern(value: Any) -> str:
+    """Shape of a value: runs of digits become '9', of upper / lower case letters 'A' / 'a' ('AB-1234' -> 'A-9')."""
+    pattern = []
+    for c in str(value)[:_PATTERN_PREFIX]:
+        if c.isdigit():
+            c = '9'
+        elif c.isalpha():
+            c = 'A' if c.isupper() else 'a'
+        if not pattern or pattern[-1] != c or c not in '9Aa':
+            pattern.append(c)
+    return ''.join(pattern)
+
+
+class ColumnProfile:
+    """Statistics of one column, updated value by value in a single pass."""
+
+    __slots__ = ('rows', 'nulls', 'distinct', 'min', 'max', 'length', 'patterns', '_as_text')
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.distinct = HyperLogLog()
+        self.min = self.max = None
+        self.length = 0
+        self.patterns = Counter()
+        self._as_text = False    # values of mixed types are compared as text
+
+    def add(self, value: Any):
+        self.rows += 1
+        if value is None:
+            self.nulls += 1
+            return
+        self.distinct.add(value)
+        text = _text(value)
+        self.length += len(text)
+        pattern = value_pattern(text)
+        if pattern in self.patterns or len(self.patterns) < _MAX_PATTERNS:
+            self.patterns[pattern] += 1
+        key = text if self._as_text else value
+        if self.min is None:
+            self.min = self.max = key
+            return
+        try:
+            if key < self.min:
+                self.min = key
+            elif key > self.max:
+                self.max = key
+        except TypeError:
+            self._as_text = True
+            texts = (_text(self.min), _text(self.max), text)
+            self.min, self.max = min(texts), max(texts)
+
+    def result(self) -> Dict[str, Any]:
+        """
+        {"rows", "null_ratio", "distinct_estimate", "min", "max", "avg_length",
+        "top_patterns": [[pattern, count], ...]}; min / max as text.
+        """
+        values = self.rows - self.nulls
+        return {
+            "rows": self.rows,
+            "null_ratio": round(self.nulls / self.rows, 4) if self.rows else None,
+            "distinct_estimate": min(self.distinct.count(), values),
+            "min": _text(self.min) if self.min is not None else None,
+            "max": _text(self.max) if self.max is not None else None,
+            "avg_length": round(self.length / values, 2) if values else None,
+            "top_patterns": [[pattern, count] for pattern, count in self.patterns.most_common(TOP_PATTERNS)],
+        }
+
+
+def _text(value: Any) -> str:
+    return value.decode('latin-1') if isinstance(value, bytes) else str(value)
+
+
+def profile_rows(columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                 row_budget: Optional[int] = DEFAULT_ROW_BUDGET) -> Dict[str, Dict[str, Any]]:
+    """
+    Profiles of columns over rows (tuples in column order), read once and at most
+    row_budget of them (None = all): {column: ColumnProfile.result()}.
+    """
+    profiles: List[ColumnProfile] = [ColumnProfile() for _ in columns]
+    for n, row in enumerate(rows):
+        if row_budget is not None and n >= row_budget:
+            break
+        for profile, value in zip(profiles, row):
+            profile.add(value)
+    return {column: profile.result() for column, profile in zip(columns, profiles)}
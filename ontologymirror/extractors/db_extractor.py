@@ -1,7 +1,13 @@
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from ..core.progress import EXTRACT, ProgressReporter
 from .base import BaseExtractor
+from .catalog import fingerprint, is_import_table, read_catalog
+from .column_profiler import DEFAULT_ROW_BUDGET, profile_rows
+from .sampling import (DEFAULT_SAMPLE_ROWS, RANDOM_SCAN_FACTOR, SAMPLE_BINARY_BYTES, SAMPLE_STRATEGIES,
+                       SAMPLE_TEXT_CHARS, sample_value, wide_kind)
 
 class DBExtractor(BaseExtractor):
     """
@@ -9,14 +15,64 @@ class DBExtractor(BaseExtractor):
     Supports SQLite, PostgreSQL, MySQL, MSSQL (via SQLAlchemy).
     """
 
-    def __init__(self, connection_string: str, db_type: str = "SQLite"):
+    # Schemas of the database system itself (lower-case), never extracted
+    SYSTEM_SCHEMAS = frozenset((
+        "information_schema", "pg_catalog", "pg_toast", "mysql", "performance_schema", "sys", "guest",
+        "db_owner", "db_accessadmin", "db_securityadmin", "db_ddladmin", "db_backupoperator",
+        "db_datareader", "db_datawriter", "db_denydatareader", "db_denydatawriter",
+    ))
+    # (first n characters / bytes of a value, its length in bytes) per SQLAlchemy dialect name:
+    # wide text and binary columns are cut in the sample query, not after fetching them whole
+    SAMPLE_CUT_SQL = {
+        "sqlite": ("SUBSTR({0}, 1, {1})", "LENGTH({0})"),
+        "postgresql": ("SUBSTRING({0} FROM 1 FOR {1})", "OCTET_LENGTH({0})"),
+        "mysql": ("SUBSTRING({0}, 1, {1})", "OCTET_LENGTH({0})"),
+        "mariadb": ("SUBSTRING({0}, 1, {1})", "OCTET_LENGTH({0})"),
+        "mssql": ("SUBSTRING({0}, 1, {1})", "DATALENGTH({0})"),
+    }
+
+    def __init__(self, connection_string: str, db_type: str = "SQLite", on_progress: Optional[Callable] = None,
+                 workers: int = 1, schemas: Optional[List[str]] = None,
+                 snapshot: Optional[Dict[str, Dict[str, Any]]] = None, profile: bool = False,
+                 profile_budget: Optional[int] = DEFAULT_ROW_BUDGET, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                 sample_strategy: str = "head", sample_columns: Optional[Dict[str, List[str]]] = None):
         """
         Args:
             connection_string (str): SQLAlchemy connection string.
             db_type (str): Type of database (used for dialect-specific queries like LIMIT vs TOP).
+            on_progress (callable): function(ProgressEvent) receiving throttled "extract"
+                events counted in tables (see ontologymirror/core/progress.py).
+            workers (int): Tables inspected and sampled at the same time, each over one pooled
+                connection (the engine's pool is sized to match). 1 = one table after the other.
+                The output is in the same order either way.
+            schemas (list): Schemas to extract. None = the default schema and every other one
+                but the system schemas (SYSTEM_SCHEMAS). Tables outside the default schema
+                are named "schema.table".
+            snapshot (dict): Tables of an earlier extract() by table_name. A table whose
+                fingerprint is unchanged is returned from it as it is, without being sampled again.
+            profile (bool): Also profile every column in one streaming scan of the table
+                (null ratio, approximate distinct count, min / max, average length and
+                top value patterns; see column_profiler.py), attached to it as "profile".
+            profile_budget (int): Rows read per table when profiling; None = every row.
+            sample_rows (int): Sample rows per table.
+            sample_strategy (str): How they are picked, one of SAMPLE_STRATEGIES: "head"
+                (the first rows), "random" or "stratified" (spread over the primary key's
+                range; tables without a single integer key fall back to "head").
+            sample_columns (dict): Columns to sample by table_name; other tables sample all.
         """
+        if sample_strategy not in SAMPLE_STRATEGIES:
+            raise ValueError(f"Unknown sample strategy {sample_strategy!r}; expected one of {SAMPLE_STRATEGIES}")
         super().__init__(connection_string)
         self.db_type = db_type
+        self.on_progress = on_progress
+        self.workers = max(workers, 1)
+        self.schemas = schemas
+        self.snapshot = snapshot or {}
+        self.profile = profile
+        self.profile_budget = profile_budget
+        self.sample_rows = max(sample_rows, 0)
+        self.sample_strategy = sample_strategy
+        self.sample_columns = sample_columns or {}
         self.engine: Optional[Engine] = None
 
     def extract(self) -> List[Dict[str, Any]]:
@@ -29,48 +85,48 @@ class DBExtractor(BaseExtractor):
                 {
                     "table_name": "users",
                     "columns": [...],
-                    "sample_data": [[1, "John"], [2, "Jane"]]
+                    "foreign_keys": [...],
+                    "indexes": [...],
+                    "row_count": 1200,      # the catalog's estimate, None if unknown
+                    "fingerprint": "9f3c...",   # changes with the table (see catalog.py)
+                    "sampling": {"strategy": "head", "rows": 5, "columns": None},
+                    "sample_columns": ["id", "name"],
+                    "sample_data": [[1, "John"], [2, "Jane"]]   # typed values, see sampling.py
                 }
             ]
         """
         self._connect()
         inspector = inspect(self.engine)
-        table_names = inspector.get_table_names()
-        
-        extracted_data = []
-        
-        for table in table_names:
-            # 1. Get Columns
-            columns = []
-            try:
-                cols = inspector.get_columns(table)
-                for col in cols:
-                    columns.append({
-                        "name": col["name"],
-                        "type": str(col["type"]),
-                        "primary_key": col.get("primary_key", False),
-                        "nullable": col.get("nullable", True)
-                    })
-            except Exception as e:
-                print(f"Error getting columns for {table}: {e}")
-                continue
+        tables = self._list_tables(inspector)
+        catalog = self._read_catalog(tables, inspector.default_schema_name)
+        reporter = ProgressReporter(self.on_progress, "extract", total=len(tables), unit="tables")
+        reporter.phase(EXTRACT)
 
-            # 2. Get Sample Data
-            sample_rows = self._fetch_sample_data(table)
-            
-            extracted_data.append({
-                "table_name": table,
-                "columns": columns,
-                "sample_data": sample_rows
-            })
-            
-        return extracted_data
+        if self.workers > 1 and len(tables) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(self._extract_table, schema, table, reporter, catalog)
+                           for schema, table in tables]
+                for done, _ in enumerate(as_completed(futures), 1):
+                    reporter.update(done, done)
+                results = [future.result() for future in futures]
+        else:
+            results = []
+            for done, (schema, table) in enumerate(tables):
+                reporter.update(done, done, table)
+                results.append(self._extract_table(schema, table, reporter, catalog))
+
+        reporter.finish()
+        return [result for result in results if result is not None]
 
     def _connect(self):
         """Creates the SQLAlchemy Engine"""
         if not self.engine:
             try:
-                self.engine = create_engine(self.source)
+                options = {}
+                if self.workers > 1 and make_url(self.source).get_backend_name() != "sqlite":
+                    # One connection per worker, kept open between tables
+                    options = {"pool_size": self.workers, "max_overflow": 0}
+                self.engine = create_engine(self.source, **options)
                 # Test connection
                 with self.engine.connect() as conn:
                     pass
@@ -78,25 +134,260 @@ class DBExtractor(BaseExtractor):
                 print(f"Failed to connect to {self.source}: {e}")
                 raise e
 
-    def _fetch_sample_data(self, table_name: str) -> List[Any]:
-        """Fetches 5 rows of sample data."""
-        query = ""
-        # Dialect specific queries
-        # Note: In a larger app, we might use the specific Connector classes we built in tools/
-        # But here we keep it self-contained to avoid dependency on 'tools'
-        if self.db_type == "MSSQL":
-            query = f"SELECT TOP 5 * FROM {table_name}"
+    def _list_tables(self, inspector) -> List[Tuple[Optional[str], str]]:
+        """(schema, table) to extract, schema None for the default one: default schema first, then by name."""
+        default = inspector.default_schema_name
+        if self.schemas is not None:
+            schemas = list(self.schemas)
         else:
-            # SQLite, Postgres, MySQL all support LIMIT
-            query = f"SELECT * FROM {table_name} LIMIT 5"
-            
+            schemas = [default] + sorted(
+                s for s in inspector.get_schema_names()
+                if s != default and s.lower() not in self.SYSTEM_SCHEMAS and not s.lower().startswith("pg_")
+            )
+        tables = []
+        for schema in schemas:
+            # The importer's bookkeeping tables are not part of the source schema
+            names = inspector.get_table_names() if schema == default else inspector.get_table_names(schema=schema)
+            tables.extend((None if schema == default else schema, t) for t in names if not is_import_table(t))
+        return tables
+
+    def _read_catalog(self, tables, default: Optional[str]) -> Optional[Dict[Tuple[str, str], Dict[str, Any]]]:
+        """
+        Columns, keys, indexes and row estimates of every schema listed, read in a few
+        catalog queries (catalog.py) instead of inspector calls per table.
+        None for dialects without catalog queries, or if they fail: tables are inspected one by one then.
+        """
+        schemas = sorted({schema or default for schema, _ in tables if schema or default})
         try:
             with self.engine.connect() as conn:
-                result = conn.execute(text(query))
-                # Convert rows to serializable format (list of tuples/dicts)
-                # We convert to string to avoid serialization issues with dates/decimals for now
-                rows = [tuple(str(item) for item in row) for row in result.fetchall()]
-                return rows
+                return read_catalog(conn, schemas)
+        except Exception as e:
+            print(f"Catalog queries failed, inspecting tables one by one: {e}")
+            return None
+
+    def _extract_table(self, schema: Optional[str], table: str, reporter,
+                       catalog: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Columns and sample rows of one table over one connection (or its snapshot,
+        if the fingerprint is unchanged); None if its columns cannot be read.
+        """
+        name = f"{schema}.{table}" if schema else table
+        with self.engine.connect() as conn:
+            # 1. Get Columns (from the catalog read up front, else the inspector)
+            entry = None
+            if catalog is not None:
+                entry = catalog.get((schema or self.engine.dialect.default_schema_name, table))
+            try:
+                if entry is None:
+                    entry = self._inspect_table(conn, schema, table)
+                columns = [{
+                    "name": col["name"],
+                    "type": col["type"],
+                    "primary_key": col["primary_key"],
+                    "nullable": col["nullable"]
+                } for col in entry["columns"]]
+            except Exception as e:
+                print(f"Error getting columns for {name}: {e}")
+                reporter.error(str(e), name)
+                return None
+            digest = fingerprint(entry)
+            previous = self.snapshot.get(name)
+            if previous is not None and previous.get("fingerprint") == digest and \
+                    previous.get("sampling") == self._sampling(name) and \
+                    (not self.profile or all("profile" in col for col in previous["columns"])):
+                return previous
+
+            # 2. Get Sample Data
+            sample_columns, sample_rows = self._fetch_sample_data(table, schema, conn, entry)
+
+            # 3. Profile Columns
+            if self.profile:
+                profiles = self._profile_table(table, schema, conn)
+                for col in columns:
+                    col["profile"] = profiles.get(col["name"])
+
+        return {
+            "table_name": name,
+            "columns": columns,
+            "foreign_keys": entry["foreign_keys"],
+            "indexes": entry["indexes"],
+            "row_count": entry["row_count"],
+            "fingerprint": digest,
+            "sampling": self._sampling(name),
+            "sample_columns": sample_columns,
+            "sample_data": sample_rows
+        }
+
+    @staticmethod
+    def _inspect_table(conn, schema: Optional[str], table: str) -> Dict[str, Any]:
+        """A catalog entry of one table read with the inspector (dialects without catalog queries)."""
+        inspector = inspect(conn)
+        columns = [{
+            "name": col["name"],
+            "type": str(col["type"]),
+            "primary_key": bool(col.get("primary_key", False)),
+            "nullable": col.get("nullable", True)
+        } for col in inspector.get_columns(table, schema=schema)]
+        try:
+            foreign_keys = [{key: fk[key] for key in ("name", "constrained_columns", "referred_schema",
+                                                      "referred_table", "referred_columns")}
+                            for fk in inspector.get_foreign_keys(table, schema=schema)]
+            indexes = [{"name": ix["name"], "column_names": ix["column_names"], "unique": bool(ix["unique"])}
+                       for ix in inspector.get_indexes(table, schema=schema)]
+        except NotImplementedError:
+            foreign_keys, indexes = [], []
+        return {"columns": columns, "foreign_keys": foreign_keys, "indexes": indexes, "row_count": None}
+
+    def _target(self, table_name: str, schema: Optional[str]) -> str:
+        preparer = self.engine.dialect.identifier_preparer
+        target = preparer.quote(table_name)
+        if schema:
+            target = f"{preparer.quote_schema(schema)}.{target}"
+        return target
+
+    def _select_query(self, target: str, limit: Optional[int], select: str = "*", where: str = "",
+                      order_by: str = "") -> str:
+        """SELECT `select` of a quoted table (and clauses), of its first `limit` rows unless None."""
+        if limit is None:
+            return f"SELECT {select} FROM {target}{where}{order_by}"
+        # Dialect specific queries
+        # Self-contained on purpose: ontologymirror does not depend on the tools/ connectors
+        # (their catalog queries and progress reporting are shared from ontologymirror instead)
+        if self.db_type == "MSSQL":
+            return f"SELECT TOP {int(limit)} {select} FROM {target}{where}{order_by}"
+        # SQLite, Postgres, MySQL all support LIMIT
+        return f"SELECT {select} FROM {target}{where}{order_by} LIMIT {int(limit)}"
+
+    def _profile_table(self, table_name: str, schema: Optional[str], conn) -> Dict[str, Dict[str, Any]]:
+        """Column profiles of a table from one streamed scan of up to profile_budget rows; {} if it cannot be read."""
+        query = self._select_query(self._target(table_name, schema), self.profile_budget)
+        try:
+            result = conn.execution_options(stream_results=True, yield_per=1000).execute(text(query))
+            try:
+                return profile_rows(list(result.keys()), result, self.profile_budget)
+            finally:
+                result.close()
+        except Exception as e:
+            print(f"Error profiling {table_name}: {e}")
+            return {}
+
+    def _sampling(self, name: str) -> Dict[str, Any]:
+        """How a table's sample rows are picked; a snapshot sampled otherwise is not reused."""
+        return {"strategy": self.sample_strategy, "rows": self.sample_rows, "columns": self.sample_columns.get(name)}
+
+    def _fetch_sample_data(self, table_name: str, schema: Optional[str] = None, conn=None,
+                           entry: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Any]]:
+        """
+        Sample rows of a table picked by sample_strategy, of the sample_columns given for it
+        (over conn, or a connection of its own): (column names, rows of sample_value()s).
+        entry: the table's catalog entry, for its primary key and row estimate.
+        """
+        name = f"{schema}.{table_name}" if schema else table_name
+        try:
+            if conn is None:
+                with self.engine.connect() as conn:
+                    return self._sample_rows(conn, table_name, schema, self.sample_columns.get(name), entry)
+            return self._sample_rows(conn, table_name, schema, self.sample_columns.get(name), entry)
         except Exception as e:
             print(f"Error fetching sample data for {table_name}: {e}")
-            return []
+            return [], []
+
+    def _sample_select(self, columns: Optional[List[str]], entry: Optional[Dict[str, Any]]):
+        """
+        Select list of the sample query: the given columns (all without), wide text and binary
+        ones (sampling.wide_kind) cut to what sample_value keeps, each binary one followed by
+        its length. Returns (select, names, kinds) with the kind of each name, or kinds None
+        for a plain select list (dialects without SAMPLE_CUT_SQL, or no column types).
+        """
+        preparer = self.engine.dialect.identifier_preparer
+        cut = self.SAMPLE_CUT_SQL.get(self.engine.dialect.name)
+        types = {col["name"]: col["type"] for col in entry["columns"]} if entry else {}
+        names = list(columns) if columns else list(types)
+        if cut is None or not names or not all(name in types for name in names):
+            return (", ".join(preparer.quote(c) for c in columns) if columns else "*"), None, None
+        substring, length = cut
+        items, kinds = [], []
+        for name in names:
+            column, kind = preparer.quote(name), wide_kind(str(types[name]))
+            if kind == "text":
+                # One character more than is kept, so sample_value still marks the value as cut
+                items.append(f"{substring.format(column, SAMPLE_TEXT_CHARS + 1)} AS {column}")
+            elif kind == "binary":
+                items.append(f"{substring.format(column, SAMPLE_BINARY_BYTES)} AS {column}")
+                items.append(length.format(column))
+            else:
+                items.append(column)
+            kinds.append(kind)
+        return ", ".join(items), names, kinds
+
+    def _sample_rows(self, conn, table_name: str, schema: Optional[str], columns: Optional[List[str]],
+                     entry: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Any]]:
+        target = self._target(table_name, schema)
+        select, cut_names, kinds = self._sample_select(columns, entry)
+        names, rows = None, None
+        if self.sample_strategy == "stratified":
+            names, rows = self._stratified_rows(conn, target, select, entry)
+        elif self.sample_strategy == "random":
+            names, rows = self._random_rows(conn, target, select, entry)
+        if rows is None:
+            result = conn.execute(text(self._select_query(target, self.sample_rows, select)))
+            names, rows = list(result.keys()), result.fetchall()
+        # Typed, JSON-safe and size-bounded (large text and binary values are cut)
+        if kinds is None:
+            return names, [tuple(sample_value(item) for item in row) for row in rows]
+        return cut_names, [self._cut_row(row, kinds) for row in rows]
+
+    @staticmethod
+    def _cut_row(row, kinds: List[Optional[str]]) -> Tuple[Any, ...]:
+        """sample_value()s of a row of a _sample_select query (binary values come with their length)."""
+        values, i = [], 0
+        for kind in kinds:
+            if kind == "binary":
+                values.append(sample_value(row[i], length=row[i + 1]))
+                i += 2
+            else:
+                values.append(sample_value(row[i]))
+                i += 1
+        return tuple(values)
+
+    def _random_rows(self, conn, target: str, select: str, entry: Optional[Dict[str, Any]]):
+        """Random rows: TABLESAMPLE narrows large PostgreSQL / MSSQL tables down before ORDER BY random."""
+        dialect = self.engine.dialect.name
+        order_by = {"mssql": " ORDER BY NEWID()", "mysql": " ORDER BY RAND()",
+                    "mariadb": " ORDER BY RAND()"}.get(dialect, " ORDER BY RANDOM()")
+        row_count = entry.get("row_count") if entry else None
+        scan = self.sample_rows * RANDOM_SCAN_FACTOR
+        if row_count and row_count > scan and dialect in ("postgresql", "mssql"):
+            percent = 100.0 * scan / row_count
+            sampled = f"{target} TABLESAMPLE SYSTEM ({percent:.6f})" if dialect == "postgresql" \
+                else f"{target} TABLESAMPLE ({percent:.6f} PERCENT)"
+            result = conn.execute(text(self._select_query(sampled, self.sample_rows, select, order_by=order_by)))
+            names, rows = list(result.keys()), result.fetchall()
+            # The estimate or the pages picked can leave too few rows; then sort the whole table
+            if len(rows) == self.sample_rows:
+                return names, rows
+        result = conn.execute(text(self._select_query(target, self.sample_rows, select, order_by=order_by)))
+        return list(result.keys()), result.fetchall()
+
+    def _stratified_rows(self, conn, target: str, select: str, entry: Optional[Dict[str, Any]]):
+        """
+        The first row of each of sample_rows equal ranges of the primary key, one indexed
+        query per range; (None, None) unless the table has a single integer primary key.
+        """
+        key = [col["name"] for col in entry["columns"] if col["primary_key"]] if entry else []
+        if len(key) != 1 or not self.sample_rows:
+            return None, None
+        key = self.engine.dialect.identifier_preparer.quote(key[0])
+        low, high = conn.execute(text(f"SELECT MIN({key}), MAX({key}) FROM {target}")).one()
+        if not all(isinstance(bound, int) and not isinstance(bound, bool) for bound in (low, high)):
+            return None, None
+        n = self.sample_rows
+        bounds = sorted({low + (high - low) * i // n for i in range(n)})
+        query = text(self._select_query(target, 1, select, where=f" WHERE {key} >= :low AND {key} < :high",
+                                        order_by=f" ORDER BY {key}"))
+        names, rows = None, []
+        for start, end in zip(bounds, bounds[1:] + [high + 1]):
+            result = conn.execute(query, {"low": start, "high": end})
+            names = list(result.keys())
+            rows.extend(result.fetchall())
+        return names, rows
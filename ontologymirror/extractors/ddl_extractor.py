@@ -0,0 +1,319 @@
+import os
+import re
+from typing import List, Dict, Any, Optional
+
+from sqlparse import lexer
+from sqlparse import tokens as T
+
+from .base import BaseExtractor
+from ontologymirror.core.domain import RawColumn, RawTable
+
+# Statements the parser looks at; everything else (INSERTs included) is skipped unparsed.
+# Leading comments only match whole, so a commented-out CREATE TABLE is not picked up.
+_DDL_HEAD_RE = re.compile(
+    r'(?is)(?:\s|--[^\n]*(?=\n|\Z)|/\*(?:[^*]|\*(?!/))*(?:\*/|\Z))*'
+    r'(?:CREATE\s+(?:(?:GLOBAL|LOCAL)\s+)?(?:(?:TEMPORARY|TEMP|UNLOGGED)\s+)?TABLE|ALTER\s+TABLE)\b'
+)
+
+# Words that end a column's type and start its constraints / options
+_TYPE_END = frozenset((
+    'NOT', 'NULL', 'CONSTRAINT', 'DEFAULT', 'PRIMARY', 'REFERENCES', 'UNIQUE', 'CHECK', 'KEY',
+    'IDENTITY', 'AUTO_INCREMENT', 'AUTOINCREMENT', 'COLLATE', 'GENERATED', 'COMMENT', 'ON', 'AS',
+    'SPARSE', 'ROWGUIDCOL', 'FILESTREAM', 'MASKED', 'ENCRYPTED', 'CHARACTER', 'CHARSET', 'WITH',
+    'INVISIBLE', 'VISIBLE', 'STORAGE', 'COLUMN_FORMAT', 'SRID',
+))
+# Table-level elements that carry no column information
+_IGNORED_ELEMENTS = frozenset((
+    'UNIQUE', 'KEY', 'INDEX', 'CHECK', 'FULLTEXT', 'SPATIAL', 'PERIOD', 'EXCLUDE', 'LIKE',
+))
+_NO_SPACE_BEFORE = frozenset(('(', ')', ',', '.', '[', ']'))
+
+
+class _Tok:
+    """A significant token: `key` is the upper-cased word to match on ('' for quoted names)."""
+    __slots__ = ('key', 'text')
+
+    def __init__(self, key, text):
+        self.key = key
+        self.text = text
+
+
+def _tokens(sql):
+    """sqlparse lexer tokens without whitespace/comments; merged keywords ('NOT NULL') split into words."""
+    out = []
+    for ttype, value in lexer.tokenize(sql):
+        if ttype in T.Text or ttype in T.Comment:
+            continue
+        if ttype in T.Keyword and ' ' in value.strip():
+            out.extend(_Tok(w.upper(), w) for w in value.split())
+        elif len(value) > 1 and value[0] in '[`"':
+            out.append(_Tok('', value))
+        else:
+            out.append(_Tok(value.upper(), value))
+    return out
+
+
+def _unquote(name):
+    if len(name) > 1 and (name[0], name[-1]) in (('[', ']'), ('`', '`'), ('"', '"')):
+        inner = name[1:-1]
+        return inner.replace(name[-1] * 2, name[-1]) if name[0] != '[' else inner
+    return name
+
+
+def _read_name(toks, i):
+    """Reads a possibly qualified name at toks[i]; returns (last part, unquoted; next index)."""
+    if i >= len(toks):
+        return None, i
+    name = _unquote(toks[i].text)
+    i += 1
+    while i + 1 < len(toks) and toks[i].key == '.':
+        name = _unquote(toks[i + 1].text)
+        i += 2
+    return name, i
+
+
+def _closing(toks, i):
+    """Index of the ')' matching the '(' at toks[i] (len(toks) if unbalanced)."""
+    depth = 0
+    for j in range(i, len(toks)):
+        if toks[j].key == '(':
+            depth += 1
+        elif toks[j].key == ')':
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(toks)
+
+
+def _split(toks, lo, hi):
+    """Splits toks[lo:hi] at commas outside parentheses."""
+    parts, depth, start = [], 0, lo
+    for j in range(lo, hi):
+        key = toks[j].key
+        if key == '(':
+            depth += 1
+        elif key == ')':
+            depth -= 1
+        elif key == ',' and depth == 0:
+            parts.append(toks[start:j])
+            start = j + 1
+    parts.append(toks[start:hi])
+    return [p for p in parts if p]
+
+
+def _column_list(toks, i):
+    """Names in the '(a, b DESC, c(10))' list at toks[i]; returns (names, index after ')')."""
+    if i >= len(toks) or toks[i].key != '(':
+        return [], i
+    end = _closing(toks, i)
+    return [_unquote(p[0].text) for p in _split(toks, i + 1, end)], end + 1
+
+
+def _render_type(toks):
+    out = ''
+    for tok in toks:
+        text = _unquote(tok.text)
+        if out and tok.key not in _NO_SPACE_BEFORE and out[-1] not in '(.[':
+            out += ' '
+        out += text
+    return out
+
+
+class DDLExtractor(BaseExtractor):
+    """
+    Extracts table schemas from a .sql file by parsing its DDL, without loading it.
+
+    CREATE TABLE statements (and ALTER TABLE ... ADD CONSTRAINT / ADD COLUMN, as
+    written by pg_dump and SSDT) are tokenized with sqlparse and read straight into
+    RawTable/RawColumn: column types, nullability, primary keys and foreign keys.
+    The file is streamed with SQLStatementReader and INSERTs are skipped without
+    tokenizing, so a data dump costs about one regex pass. No sample data is
+    produced; use SQLFileExtractor when rows are needed.
+    """
+
+    def __init__(self, file_path: str, dialect: Optional[str] = "auto"):
+        """
+        Args:
+            file_path (str): Path to the .sql file.
+            dialect (str): "tsql", "mysql" or "postgres"; "auto" detects it from the file
+                head (see self.detected_dialect). Only affects how strings are scanned
+                (MySQL backslash escapes); the DDL grammar accepted is the union of all three.
+        """
+        self.file_path = file_path
+        self.dialect = dialect
+        self.detected_dialect: Optional[str] = None
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"SQL file not found: {file_path}")
+
+        super().__init__(file_path)
+
+    def extract(self) -> List[Dict[str, Any]]:
+        """
+        Same shape as DBExtractor.extract(); columns also carry "foreign_key"
+        ("table.column" or None) and sample_data is always empty.
+        """
+        return [
+            {
+                "table_name": table.name,
+                "columns": [
+                    {"name": c.name, "type": c.original_type, "primary_key": c.pk,
+                     "nullable": c.nullable, "foreign_key": c.fk}
+                    for c in table.columns
+                ],
+                "sample_data": [],
+            }
+            for table in self.extract_tables()
+        ]
+
+    def extract_tables(self) -> List[RawTable]:
+        """Parses the file; tables are returned in the order they are created."""
+        from tools.db_manager_lib.core.sql_stream import SQLStatementReader, detect_encoding
+        from tools.db_manager_lib.core.dialect import sniff_dialect
+
+        encoding = detect_encoding(self.file_path)
+        dialect = self.dialect
+        if dialect == "auto":
+            dialect = self.detected_dialect = sniff_dialect(self.file_path, encoding)
+
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._pending_fks = []      # (table, columns, referenced table) without referenced columns
+        with open(self.file_path, 'r', encoding=encoding) as f:
+            reader = SQLStatementReader(f, backslash_escapes=dialect == "mysql", skip=lambda head: True)
+            for stmt in reader:
+                if _DDL_HEAD_RE.match(stmt.text):
+                    self._parse_statement(stmt.text)
+        self._resolve_pending_fks()
+
+        return [
+            RawTable(
+                name=t["name"],
+                columns=[RawColumn(**c) for c in t["columns"].values()],
+                source_file=self.file_path,
+                raw_content=t["raw"],
+            )
+            for t in self._tables.values()
+        ]
+
+    def _parse_statement(self, sql: str):
+        toks = _tokens(sql)
+        i = 0
+        while i < len(toks) and toks[i].key != 'TABLE':
+            i += 1
+        is_create = bool(toks) and toks[0].key == 'CREATE'
+        i += 1
+        while i < len(toks) and toks[i].key in ('IF', 'NOT', 'EXISTS', 'ONLY'):
+            i += 1
+        name, i = _read_name(toks, i)
+        if name is None:
+            return
+
+        if is_create:
+            if i >= len(toks) or toks[i].key != '(':
+                return      # CREATE TABLE ... AS SELECT / LIKE: no column list to read
+            table = {"name": name, "columns": {}, "raw": sql.strip()}
+            self._tables[name.lower()] = table
+            for element in _split(toks, i + 1, _closing(toks, i)):
+                self._parse_element(table, element)
+            return
+
+        table = self._tables.get(name.lower())
+        if table is None:
+            return
+        for part in _split(toks, i, len(toks)):
+            # 'WITH CHECK ADD ...' (SSDT) / 'ADD ...'; anything else (DROP, ALTER COLUMN, ...) is ignored
+            keys = [t.key for t in part[:3]]
+            if 'ADD' not in keys:
+                continue
+            part = part[keys.index('ADD') + 1:]
+            if part and part[0].key == 'COLUMN':
+                part = part[1:]
+            self._parse_element(table, part)
+
+    def _parse_element(self, table, toks):
+        """One entry of a CREATE TABLE body: a column definition or a table constraint."""
+        if toks[0].key == 'CONSTRAINT':
+            self._parse_constraint(table, toks[2:])
+        elif toks[0].key in ('PRIMARY', 'FOREIGN') or toks[0].key in _IGNORED_ELEMENTS:
+            self._parse_constraint(table, toks)
+        else:
+            self._parse_column(table, toks)
+
+    def _parse_column(self, table, toks):
+        name = _unquote(toks[0].text)
+        i, depth = 1, 0
+        while i < len(toks):
+            key = toks[i].key
+            if depth == 0 and key in _TYPE_END:
+                # 'CHARACTER SET utf8' ends a MySQL type; 'character varying(50)' is one
+                if key != 'CHARACTER' or (i + 1 < len(toks) and toks[i + 1].key == 'SET'):
+                    break
+            depth += (key == '(') - (key == ')')
+            i += 1
+        column = {"name": name, "original_type": _render_type(toks[1:i]), "nullable": True, "pk": False,
+                  "fk": None}
+        table["columns"][name.lower()] = column
+
+        depth = 0
+        while i < len(toks):
+            key = toks[i].key
+            if key == '(':
+                depth += 1
+            elif key == ')':
+                depth -= 1
+            elif depth == 0:
+                if key == 'NOT' and i + 1 < len(toks) and toks[i + 1].key == 'NULL':
+                    column["nullable"] = False
+                    i += 1
+                elif key == 'NULL' and toks[i - 1].key != 'DEFAULT':
+                    column["nullable"] = True
+                elif key == 'PRIMARY' and i + 1 < len(toks) and toks[i + 1].key == 'KEY':
+                    column["pk"] = True
+                    column["nullable"] = False
+                    i += 1
+                elif key == 'REFERENCES':
+                    ref_table, j = _read_name(toks, i + 1)
+                    ref_columns, i = _column_list(toks, j)
+                    self._add_fk(table, [name], ref_table, ref_columns)
+                    continue
+            i += 1
+
+    def _parse_constraint(self, table, toks):
+        """PRIMARY KEY / FOREIGN KEY table constraints; UNIQUE, CHECK, indexes etc. are ignored."""
+        if len(toks) < 2 or toks[1].key != 'KEY':
+            return
+        i = 2
+        while i < len(toks) and toks[i].key != '(':
+            i += 1      # CLUSTERED, NONCLUSTERED, index names, USING ...
+        columns, i = _column_list(toks, i)
+        if toks[0].key == 'PRIMARY':
+            for name in columns:
+                column = table["columns"].get(name.lower())
+                if column is not None:
+                    column["pk"] = True
+                    column["nullable"] = False
+        elif toks[0].key == 'FOREIGN':
+            while i < len(toks) and toks[i].key != 'REFERENCES':
+                i += 1
+            ref_table, i = _read_name(toks, i + 1)
+            ref_columns, _ = _column_list(toks, i)
+            self._add_fk(table, columns, ref_table, ref_columns)
+
+    def _add_fk(self, table, columns, ref_table, ref_columns):
+        if ref_table is None:
+            return
+        if not ref_columns:
+            # 'REFERENCES t' points at t's primary key, which may not be known yet
+            self._pending_fks.append((table, columns, ref_table))
+            return
+        for name, ref_column in zip(columns, ref_columns):
+            column = table["columns"].get(name.lower())
+            if column is not None:
+                column["fk"] = f"{ref_table}.{ref_column}"
+
+    def _resolve_pending_fks(self):
+        for table, columns, ref_table in self._pending_fks:
+            target = self._tables.get(ref_table.lower())
+            if target is None:
+                continue
+            pk = [c["name"] for c in target["columns"].values() if c["pk"]]
+            self._add_fk(table, columns, target["name"], pk)
@@ -0,0 +1,70 @@
+import base64
+import datetime
+import decimal
+import math
+import re
+from typing import Any, Optional
+
+# How DBExtractor picks sample rows: the first rows, random rows
+# (TABLESAMPLE on large PostgreSQL / MSSQL tables, else ORDER BY random),
+# or one row per equal range of a single integer primary key
+SAMPLE_STRATEGIES = ("head", "random", "stratified")
+DEFAULT_SAMPLE_ROWS = 5
+# Longer text values are cut to this many characters, followed by "..."
+SAMPLE_TEXT_CHARS = 200
+# Binary values are returned as the base64 of their first bytes only
+SAMPLE_BINARY_BYTES = 32
+# A random sample of a large table reads about this many rows per sample row (TABLESAMPLE)
+RANDOM_SCAN_FACTOR = 20
+
+# Column types whose values can be large: binary, then text (arrays are neither)
+_BINARY_TYPE_RE = re.compile(r'(?i)blob|binary|bytea|image|\braw\b')
+_TEXT_TYPE_RE = re.compile(r'(?i)text|char|clob|string')
+_TYPE_LENGTH_RE = re.compile(r'\(\s*(\d+)')
+
+
+def wide_kind(type_name: str) -> Optional[str]:
+    """
+    "binary" or "text" for a column type (as the catalog spells it) whose values may be
+    longer than sample_value keeps, so the sample query cuts them; None for any other.
+    """
+    if type_name.endswith("]") or type_name.startswith("_"):
+        return None     # PostgreSQL arrays
+    kind = "binary" if _BINARY_TYPE_RE.search(type_name) else "text" if _TEXT_TYPE_RE.search(type_name) else None
+    declared = _TYPE_LENGTH_RE.search(type_name)
+    limit = SAMPLE_BINARY_BYTES if kind == "binary" else SAMPLE_TEXT_CHARS
+    if kind and declared and int(declared.group(1)) <= limit:
+        return None
+    return kind
+
+
+def sample_value(value: Any, text_chars: int = SAMPLE_TEXT_CHARS, binary_bytes: int = SAMPLE_BINARY_BYTES,
+                 length: Optional[int] = None) -> Any:
+    """
+    A database value as a JSON-safe value of the closest type: numbers and booleans stay
+    numbers and booleans, dates and times become ISO 8601 strings, intervals seconds,
+    binary values {"binary": base64 of the first binary_bytes, "length", "truncated"},
+    and text longer than text_chars is cut. length: bytes of the whole binary value
+    when `value` is only its start (cut in the query).
+    """
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    if isinstance(value, decimal.Decimal):
+        if not value.is_finite():
+            return str(value)
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        length = len(data) if length is None else length
+        return {"binary": base64.b64encode(data[:binary_bytes]).decode('ascii'), "length": length,
+                "truncated": length > binary_bytes}
+    text = value if isinstance(value, str) else str(value)
+    if len(text) > text_chars:
+        return text[:text_chars] + "..."
+    return text
@@ -1,7 +1,6 @@
 import os
 import sqlite3
-import tempfile
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from .base import BaseExtractor
 from .db_extractor import DBExtractor
 
@@ -11,12 +10,51 @@ class SQLFileExtractor(BaseExtractor):
     Strategy: Load .sql into a temporary SQLite DB -> Use DBExtractor.
     """
 
-    def __init__(self, file_path: str):
+    # Files at least this large are streamed statement by statement when streaming=None
+    STREAMING_THRESHOLD = 64 * 1024 * 1024
+
+    def __init__(self, file_path: str, sanitizer_engine: str = "regex", streaming: Optional[bool] = None,
+                 sanitize_workers: Optional[int] = None, sanitize_cache: Optional[str] = None,
+                 dialect: Optional[str] = "auto", sample_rows: Optional[int] = None,
+                 load_profile: str = "scratch", on_progress: Optional[Callable] = None, recover: bool = False):
         """
         Args:
             file_path (str): Path to the .sql file.
+            sanitizer_engine (str): "regex" (rule chain) or "token" (single-pass lexer engine).
+            streaming (bool): Read, sanitize and execute one statement at a time instead of
+                loading the whole file. None = automatic: files of STREAMING_THRESHOLD or more,
+                and MySQL / PostgreSQL dumps (their rows are loaded natively when streamed).
+            sanitize_workers (int): Sanitize the whole-file path on a process pool of this size.
+            sanitize_cache (str): Path of an on-disk SanitizeCache, so re-uploads of an edited
+                dump only sanitize the changed statements.
+            dialect (str): "tsql", "mysql" or "postgres" to apply only that dialect's sanitizer
+                rules, "auto" to detect it from the file head (see self.detected_dialect),
+                None to apply all of them.
+            sample_rows (int): Run all DDL but load only the first N INSERT rows per table;
+                the rest are skipped unsanitized. Enough for schema + sample extraction and far
+                faster on large data dumps. Implies streaming. None = load every row.
+            load_profile (str): SQLite load profile for the temp DB (see sqlite_load.LOAD_PROFILES):
+                "scratch" (no journal/fsync, on tmpfs if it has room for the file, else in the
+                temp dir, single-row INSERTs merged), "memory"
+                (in-memory DB) or "default" (plain on-disk temp file, statements as written).
+            on_progress (callable): function(ProgressEvent) receiving throttled events of the
+                load (bytes of the file) and then of the extraction (tables, see DBExtractor).
+            recover (bool): Skip the statements SQLite rejects instead of failing the load: a
+                failing group is bisected down to them (see quarantine). They are listed in
+                self.quarantined (Quarantined entries with their character offsets). Implies streaming.
         """
         self.file_path = file_path
+        self.sanitizer_engine = sanitizer_engine
+        self.streaming = streaming
+        self.sanitize_workers = sanitize_workers
+        self.sanitize_cache = sanitize_cache
+        self.dialect = dialect
+        self.detected_dialect: Optional[str] = None
+        self.sample_rows = sample_rows
+        self.load_profile = load_profile
+        self.on_progress = on_progress
+        self.recover = recover
+        self.quarantined: List[Any] = []
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"SQL file not found: {file_path}")
         
@@ -26,33 +64,56 @@ class SQLFileExtractor(BaseExtractor):
         """
         Loads SQL into temp DB, extracts data, and cleans up.
         """
-        # 1. Create Temp DB
-        fd, temp_db_path = tempfile.mkstemp(suffix=".db")
-        os.close(fd) # Close file descriptor, we just need the path
-        
+        from tools.db_manager_lib.core.sqlite_load import ScratchDatabase, get_load_profile
+        from ontologymirror.core.progress import ProgressReporter
+        profile = get_load_profile(self.load_profile)
+        reporter = ProgressReporter(self.on_progress, "load", total=os.path.getsize(self.file_path))
+
+        # 1. Create Temp DB (temp dir, tmpfs or memory, per the load profile); tmpfs only
+        # if it has room for the file (a sample_rows load holds little more than its DDL)
+        temp_db = ScratchDatabase(profile.location,
+                                  size_hint=0 if self.sample_rows is not None else reporter.total)
+        db_extractor = None
         try:
             # 2. Load SQL
-            self._load_sql_to_sqlite(self.file_path, temp_db_path)
+            try:
+                self._load_sql_to_sqlite(self.file_path, temp_db, profile, reporter)
+            except Exception as e:
+                reporter.error(str(e), self.file_path)
+                reporter.finish(ok=False)
+                raise
             
             # 3. Extract using DBExtractor
             # We use a connection string for the temp DB
-            conn_str = f"sqlite:///{temp_db_path}"
-            db_extractor = DBExtractor(conn_str, db_type="SQLite")
+            db_extractor = DBExtractor(temp_db.url, db_type="SQLite", on_progress=self.on_progress)
             
             return db_extractor.extract()
             
         finally:
             # 4. Cleanup
-            if os.path.exists(temp_db_path):
-                try:
-                    os.remove(temp_db_path)
-                except Exception as e:
-                    print(f"Warning: Failed to remove temp DB {temp_db_path}: {e}")
+            if db_extractor is not None and db_extractor.engine is not None:
+                db_extractor.engine.dispose()
+            temp_db.close()
 
-    def _load_sql_to_sqlite(self, sql_path: str, db_path: str):
+    def _load_sql_to_sqlite(self, sql_path: str, temp_db, profile, reporter):
         """
-        Executes the SQL script against the SQLite DB.
+        Executes the SQL script against the temp SQLite DB (a ScratchDatabase) using the LoadProfile.
+        reporter is the load's ProgressReporter.
         """
+        from ontologymirror.core.progress import INDEX, LOAD, READ
+        streaming = self.streaming
+        if self.sample_rows is not None or self.recover:
+            streaming = True
+        elif streaming is None:
+            from tools.db_manager_lib.core.dialect import sniff_dialect
+            from tools.db_manager_lib.core.sql_stream import BULK_DIALECTS
+            # MySQL and PostgreSQL rows load natively on the streamed path, whatever the size
+            streaming = (os.path.getsize(sql_path) >= self.STREAMING_THRESHOLD
+                         or (sniff_dialect(sql_path) if self.dialect == "auto" else self.dialect) in BULK_DIALECTS)
+        if streaming:
+            return self._stream_sql_to_sqlite(sql_path, temp_db, profile, reporter)
+
+        reporter.phase(READ, sql_path)
         try:
             # Try UTF-8 first
             with open(sql_path, 'r', encoding='utf-8') as f:
@@ -66,8 +127,18 @@ class SQLFileExtractor(BaseExtractor):
         # --- SANITIZATION ---
         try:
             from tools.db_manager_lib.core.sanitizer import SQLSanitizer
+            from tools.db_manager_lib.core.dialect import detect_dialect
             print(f"Sanitizing SQL script: {sql_path}")
-            sql_script = SQLSanitizer.sanitize(sql_script)
+            dialect = self.dialect
+            if dialect == "auto":
+                dialect = self.detected_dialect = detect_dialect(sql_script)
+                print(f"Detected SQL dialect: {dialect or 'unknown (all rules)'}")
+            cache = self._open_cache()
+            try:
+                sql_script = SQLSanitizer.sanitize(sql_script, engine=self.sanitizer_engine,
+                                                   workers=self.sanitize_workers, cache=cache, dialect=dialect)
+            finally:
+                self._close_cache(cache)
         except ImportError:
             print("Warning: SQLSanitizer not found. Scaling back to raw execution.")
         except Exception as e:
@@ -77,13 +148,78 @@ class SQLFileExtractor(BaseExtractor):
             pass
 
         # Connect and execute
-        conn = sqlite3.connect(db_path)
+        from tools.db_manager_lib.core.sqlite_load import apply_load_profile, finish_load
+        if profile.batch_inserts:
+            from tools.db_manager_lib.core.insert_batch import coalesce_inserts
+            sql_script = coalesce_inserts(sql_script)
+        conn = temp_db.connect()
         try:
+            apply_load_profile(conn, profile)
+            reporter.phase(LOAD, sql_path)
             cursor = conn.cursor()
             cursor.executescript(sql_script)
             conn.commit()
+            reporter.phase(INDEX)
+            finish_load(conn, profile)
+        except sqlite3.Error as e:
+            print(f"SQLite Error during import: {e}")
+            raise e
+        finally:
+            conn.close()
+
+    def _stream_sql_to_sqlite(self, sql_path: str, temp_db, profile, reporter):
+        """
+        Streams the SQL file into the SQLite DB; memory stays bounded by the largest statement.
+        """
+        from tools.db_manager_lib.core.sql_stream import load_sql_stream
+        from tools.db_manager_lib.core.dialect import sniff_dialect
+        from tools.db_manager_lib.core.sqlite_load import apply_load_profile, finish_load
+        from ontologymirror.core.progress import INDEX, LOAD
+        print(f"Streaming SQL script: {sql_path}")
+        dialect = self.dialect
+        if dialect == "auto":
+            dialect = self.detected_dialect = sniff_dialect(sql_path)
+            print(f"Detected SQL dialect: {dialect or 'unknown (all rules)'}")
+
+        conn = temp_db.connect()
+        cache = self._open_cache()
+        indexes = [] if profile.defer_indexes else None
+        self.quarantined = []
+        try:
+            apply_load_profile(conn, profile)
+            reporter.phase(LOAD, sql_path)
+            count = load_sql_stream(conn, sql_path, engine=self.sanitizer_engine, cache=cache, dialect=dialect,
+                                    sample_rows=self.sample_rows, deferred_indexes=indexes,
+                                    batch_inserts=profile.batch_inserts, on_progress=reporter.update,
+                                    on_error=self.quarantined.append if self.recover else None)
+            reporter.phase(INDEX)
+            finish_load(conn, profile, indexes or ())
+            if self.sample_rows is not None:
+                print(f"Loaded {count} statements from {sql_path} (first {self.sample_rows} rows per table)")
+            else:
+                print(f"Loaded {count} statements from {sql_path}")
+            if self.quarantined:
+                from tools.db_manager_lib.core.quarantine import describe
+                print(f"Skipped {len(self.quarantined)} failing statements:")
+                for entry in self.quarantined:
+                    print(f"  {describe(entry)}")
         except sqlite3.Error as e:
             print(f"SQLite Error during import: {e}")
             raise e
         finally:
             conn.close()
+            self._close_cache(cache)
+
+    def _open_cache(self):
+        if not self.sanitize_cache:
+            return None
+        from tools.db_manager_lib.core.sanitizer_cache import SanitizeCache
+        return SanitizeCache(self.sanitize_cache)
+
+    @staticmethod
+    def _close_cache(cache):
+        if cache is None:
+            return
+        stats = cache.stats()
+        print(f"Sanitize cache: {stats['hits']} hits, {stats['misses']} misses")
+        cache.close()
@@ -24,6 +24,15 @@ class MappedTable(BaseModel):
     search_keywords: List[str] = []
     verification_status: str = "AI_GENERATED" # Options: AI_GENERATED, VERIFIED, CORRECTED, FLAGGED
 
+def _column_def(column) -> Dict[str, Any]:
+    """A RawColumn as the prompt shows it: name, type, the column it references and its profile, when known."""
+    column_def = {"name": column.name, "type": column.original_type}
+    if column.fk:
+        column_def["foreign_key"] = column.fk
+    if column.profile:
+        column_def["profile"] = column.profile
+    return column_def
+
 class SemanticMapper:
     """
     Coordinates the semantic mapping process.
@@ -96,7 +105,7 @@ class SemanticMapper:
         # Serialize input data for the prompt
         table_def = {
             "table_name": table.name,
-            "columns": [{"name": c.name, "type": c.original_type} for c in table.columns]
+            "columns": [_column_def(c) for c in table.columns]
         }
         
         user_prompt = f"""
@@ -171,7 +180,7 @@ class SemanticMapper:
             
             batch_context.append({
                 "table_name": table.name,
-                "columns": [{"name": c.name, "type": c.original_type} for c in table.columns],
+                "columns": [_column_def(c) for c in table.columns],
                 "candidate_classes": candidates
             })
 
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from tools.db_manager_lib.core.import_manifest import file_digest
+
+# Suggested chunk size returned by init; chunks may be smaller, never larger than MAX_CHUNK_SIZE
+CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+# Unfinished uploads untouched for this many seconds are removed from the spool
+SESSION_TTL = 24 * 3600
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+UPLOADING = "uploading"
+EXTRACTING = "extracting"   # every byte received: verifying the checksum, then extracting
+DONE = "done"
+FAILED = "failed"
+
+
+class ChunkedUploadError(Exception):
+    """A chunked upload request that cannot be served; status_code is the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _Session:
+    """State of one upload; meta is what is kept in the spool's meta.json."""
+
+    def __init__(self, directory: str, meta: Dict[str, Any]):
+        self.directory = directory
+        self.meta = meta
+        self.data_path = os.path.join(directory, "data")
+        self.received = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        self.touched = os.path.getmtime(self.data_path) if os.path.exists(self.data_path) else time.time()
+        # Running SHA-256 while chunks arrive in order; None once a chunk is re-sent or after a restart
+        self.hasher = hashlib.sha256() if self.received == 0 else None
+        self.lock = threading.Lock()
+        self.future = None
+        self.error: Optional[str] = None
+
+
+class ChunkedUploads:
+    """
+    Resumable uploads of large dumps in chunks, spooled to disk.
+
+    init() opens an upload (file name, total size, SHA-256 of the whole file);
+    write() stores a chunk at a byte offset, which may repeat bytes already received
+    (a retried chunk) but not leave a gap; status() tells how far it got, so a client
+    that lost its connection resumes from `received`. The spool (one directory per
+    upload with meta.json and the data) survives a server restart.
+
+    As soon as the last byte arrives the checksum is verified and
+    extract(path, filename, options) starts in the background; finalize() waits
+    for its result. The spool directory is removed when extract returns (extract
+    may move the file out of it first); the result is kept until discard() or expiry.
+    """
+
+    def __init__(self, spool_dir: str, extract: Callable[[str, str, Dict[str, Any]], Any], workers: int = 2):
+        self.spool_dir = spool_dir
+        self.extract = extract
+        os.makedirs(spool_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, _Session] = {}
+
+    def init(self, filename: str, size: int, sha256: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Opens an upload; options are passed on to extract (extractor, sample_rows, job_id ...)."""
+        sha256 = sha256.lower()
+        if size <= 0:
+            raise ChunkedUploadError(400, "size must be positive")
+        if not _SHA256_RE.match(sha256):
+            raise ChunkedUploadError(400, "sha256 must be 64 hex digits")
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        directory = os.path.join(self.spool_dir, upload_id)
+        os.makedirs(directory)
+        meta = {"upload_id": upload_id, "filename": os.path.basename(filename.replace('\\', '/')), "size": size,
+                "sha256": sha256, "options": options or {}, "created": time.time()}
+        with open(os.path.join(directory, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        open(os.path.join(directory, "data"), 'wb').close()
+        with self._lock:
+            self._sessions[upload_id] = _Session(directory, meta)
+        return dict(self.status(upload_id), chunk_size=CHUNK_SIZE)
+
+    def write(self, upload_id: str, offset: int, data: bytes) -> Dict[str, Any]:
+        """Stores a chunk at `offset`; starts verification and extraction when the file is complete."""
+        session = self._session(upload_id)
+        if len(data) > MAX_CHUNK_SIZE:
+            raise ChunkedUploadError(413, f"Chunks are limited to {MAX_CHUNK_SIZE} bytes")
+        with session.lock:
+            if session.future is not None:
+                raise ChunkedUploadError(409, "Upload already complete")
+            if offset < 0 or offset > session.received:
+                raise ChunkedUploadError(409, f"Expected a chunk at offset <= {session.received}")
+            if offset + len(data) > session.meta["size"]:
+                raise ChunkedUploadError(400, f"Chunk ends past the declared size {session.meta['size']}")
+            with open(session.data_path, 'r+b') as f:
+                f.seek(offset)
+                f.write(data)
+            session.error = None    # sending again after a checksum mismatch
+            if session.hasher is not None:
+                if offset == session.received:
+                    session.hasher.update(data)
+                else:
+                    session.hasher = None
+            session.received = max(session.received, offset + len(data))
+            session.touched = time.time()
+            if session.received == session.meta["size"]:
+                self._start(session)
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """upload_id, filename, size, received and state (UPLOADING / EXTRACTING / DONE / FAILED), error."""
+        session = self._session(upload_id)
+        if session.future is None:
+            state = FAILED if session.error else UPLOADING
+        elif not session.future.done():
+            state = EXTRACTING
+        else:
+            state = FAILED if session.future.exception() is not None else DONE
+        error = session.error
+        if state == FAILED and error is None:
+            error = str(session.future.exception())
+        return {"upload_id": upload_id, "filename": session.meta["filename"], "size": session.meta["size"],
+                "received": session.received, "state": state, "error": error}
+
+    def finalize(self, upload_id: str):
+        """
+        Future of extract()'s result. Starts verification and extraction if the file is
+        complete but they are not running (e.g. after a restart); raises 409 while bytes are
+        missing, 422 if the checksum check already failed and nothing was sent again since.
+        """
+        session = self._session(upload_id)
+        with session.lock:
+            if session.future is None:
+                if session.error is not None:
+                    raise ChunkedUploadError(422, session.error)
+                if session.received < session.meta["size"]:
+                    raise ChunkedUploadError(
+                        409, f"Upload incomplete: {session.received} of {session.meta['size']} bytes")
+                self._start(session)
+            return session.future
+
+    def discard(self, upload_id: str):
+        """Forgets an upload (the result of a finished one, or an abandoned one with its spool)."""
+        with self._lock:
+            session = self._sessions.pop(upload_id, None)
+        directory = session.directory if session is not None else self._directory(upload_id)
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def expire(self, ttl: float = SESSION_TTL):
+        """Forgets uploads untouched for ttl seconds (not while extracting) and removes their spool."""
+        cutoff = time.time() - ttl
+        with self._lock:
+            for upload_id, session in list(self._sessions.items()):
+                if session.touched < cutoff and (session.future is None or session.future.done()):
+                    del self._sessions[upload_id]
+                    shutil.rmtree(session.directory, ignore_errors=True)
+            active = set(self._sessions)
+        # Spools of uploads from before a restart
+        for name in os.listdir(self.spool_dir):
+            data_path = os.path.join(self.spool_dir, name, "data")
+            if name not in active and os.path.exists(data_path) and os.path.getmtime(data_path) < cutoff:
+                shutil.rmtree(os.path.join(self.spool_dir, name), ignore_errors=True)
+
+    def _start(self, session: _Session):
+        """Called with session.lock held and every byte received."""
+        session.error = None
+        session.future = self._pool.submit(self._verify_and_extract, session)
+
+    def _verify_and_extract(self, session: _Session):
+        meta = session.meta
+        digest = session.hasher.hexdigest() if session.hasher is not None else file_digest(session.data_path)
+        if digest != meta["sha256"]:
+            # The bytes on disk are wrong somewhere; the client has to send the file again
+            with session.lock:
+                session.error = f"Checksum mismatch: expected {meta['sha256']}, got {digest}"
+                session.future = None
+                session.received = 0
+                session.hasher = hashlib.sha256()
+                open(session.data_path, 'wb').close()
+            raise ChunkedUploadError(422, session.error)
+        try:
+            return self.extract(session.data_path, meta["filename"], meta["options"])
+        finally:
+            session.touched = time.time()
+            shutil.rmtree(session.directory, ignore_errors=True)
+
+    def _session(self, upload_id: str) -> _Session:
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                # Spooled before a restart
+                directory = self._directory(upload_id)
+                if directory is None:
+                    raise ChunkedUploadError(404, "Unknown upload")
+                with open(os.path.join(directory, "meta.json"), encoding='utf-8') as f:
+                    session = self._sessions[upload_id] = _Session(directory, json.load(f))
+            return session
+
+    def _directory(self, upload_id: str) -> Optional[str]:
+        if not re.match(r'^[0-9a-f]{32}$', upload_id):
+            return None
+        directory = os.path.join(self.spool_dir, upload_id)
+        return directory if os.path.exists(os.path.join(directory, "meta.json")) else None
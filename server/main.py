@@ -1,22 +1,31 @@
+import asyncio
 import os
-import shutil
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
 # Load env vars from .env file
 load_dotenv()
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from ontologymirror.extractors.sql_file_extractor import SQLFileExtractor
+from ontologymirror.extractors.ddl_extractor import DDLExtractor
 from ontologymirror.mappers.semantic_mapper import SemanticMapper, MappedTable, MappedColumn
 from ontologymirror.generators.sql_generator import SqlGenerator
 from ontologymirror.generators.json_generator import JsonGenerator
 from ontologymirror.core.domain import RawTable
 from server.connection_manager import ConnectionManager
+from server.schema_snapshots import SchemaSnapshots, snapshot_diff
+from server.chunked_upload import ChunkedUploads, ChunkedUploadError, MAX_CHUNK_SIZE
 from ontologymirror.extractors.db_extractor import DBExtractor
+from ontologymirror.extractors.sampling import DEFAULT_SAMPLE_ROWS, SAMPLE_STRATEGIES
+from ontologymirror.core.progress import DONE, ProgressBoard, ProgressEvent
+from tools.db_manager_lib.core.sql_archive import SQL_SUFFIXES, dump_suffix, unpack_dump
 
 app = FastAPI(title="OntologyMirror API", version="0.1.0")
 
@@ -33,6 +42,28 @@ app.add_middleware(
 # In a real app, use a database or session cache
 UPLOAD_DIR = "temp_uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Sanitized statement groups from earlier uploads; re-uploading an edited dump reuses them
+SANITIZE_CACHE_PATH = os.path.join(UPLOAD_DIR, ".sanitize_cache.db")
+# Uploads only need the schema plus the sample rows DBExtractor reads back,
+# so by default only this many INSERT rows per table are loaded
+UPLOAD_SAMPLE_ROWS = 5
+# /api/upload ?extractor=: "sqlite" (SQLFileExtractor) or "ddl" (DDLExtractor)
+UPLOAD_EXTRACTORS = ("sqlite", "ddl")
+# Dumps of a multi-file .zip upload extracted at the same time
+UPLOAD_WORKERS = 4
+# Default of the uploads' recover option: statements SQLite rejects are skipped and listed
+# under "skipped" instead of failing the upload. Off unless UPLOAD_RECOVER=1 is set
+UPLOAD_RECOVER = os.getenv("UPLOAD_RECOVER", "").strip().lower() in ("1", "true", "yes", "on")
+# Characters of a skipped statement's text returned in "skipped"
+UPLOAD_SKIPPED_TEXT = 500
+# Tables of a live database inspected and sampled at the same time by /api/connect
+CONNECT_WORKERS = 8
+# Rows per table read by /api/connect?profile=true to profile columns
+CONNECT_PROFILE_ROWS = 10000
+# Most sample rows per table /api/connect returns
+CONNECT_MAX_SAMPLE_ROWS = 100
+# Latest progress event of the uploads / connects started with a job_id (see /api/progress)
+progress_board = ProgressBoard()
 
 class MapRequest(BaseModel):
     tables: List[Dict[str, Any]] # Simplified input for now
@@ -43,6 +74,8 @@ def read_root():
 
 # --- Connection Management ---
 conn_mgr = ConnectionManager()
+# Last extraction of each connection; /api/connect only re-extracts tables whose fingerprint changed
+snapshots = SchemaSnapshots()
 
 class ConnectionData(BaseModel):
     name: str
@@ -52,6 +85,12 @@ class ConnectionData(BaseModel):
 
 class ConnectRequest(BaseModel):
     connection_name: str
+    job_id: Optional[str] = None # client-chosen id to poll /api/progress/{job_id} with
+    refresh: bool = False # re-extract every table, ignoring the connection's snapshot
+    profile: bool = False # profile every column (see DBExtractor), kept in the snapshot too
+    sample_strategy: str = "head" # "head", "random" or "stratified" (see extractors/sampling.py)
+    sample_rows: int = DEFAULT_SAMPLE_ROWS
+    sample_columns: Optional[Dict[str, List[str]]] = None # columns to sample by table name
 
 @app.get("/api/connections")
 def get_connections():
@@ -65,6 +104,7 @@ def save_connection(data: ConnectionData):
 @app.delete("/api/connections/{name}")
 def delete_connection(name: str):
     if conn_mgr.delete_connection(name):
+        snapshots.delete(name)
         return {"status": "deleted", "name": name}
     raise HTTPException(status_code=404, detail="Connection not found")
 
@@ -83,57 +123,244 @@ def connect_db(payload: ConnectRequest):
             
     if not conn_str:
          raise HTTPException(status_code=400, detail="Invalid connection string")
+    if payload.sample_strategy not in SAMPLE_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"sample_strategy must be one of {', '.join(SAMPLE_STRATEGIES)}")
+    if not 0 <= payload.sample_rows <= CONNECT_MAX_SAMPLE_ROWS:
+        raise HTTPException(status_code=400, detail=f"sample_rows must be between 0 and {CONNECT_MAX_SAMPLE_ROWS}")
 
     try:
-        extractor = DBExtractor(conn_str, db_type=conn_data.get("type", "SQLite"))
+        previous = snapshots.load(payload.connection_name, conn_str)
+        extractor = DBExtractor(conn_str, db_type=conn_data.get("type", "SQLite"),
+                                on_progress=progress_board.sink(payload.job_id) if payload.job_id else None,
+                                workers=CONNECT_WORKERS, profile=payload.profile,
+                                profile_budget=CONNECT_PROFILE_ROWS, sample_rows=payload.sample_rows,
+                                sample_strategy=payload.sample_strategy, sample_columns=payload.sample_columns,
+                                snapshot={t["table_name"]: t for t in previous["tables"]}
+                                if previous and not payload.refresh else None)
         raw_tables = extractor.extract()
-        
-        tables_data = []
-        for t in raw_tables:
-            tables_data.append({
-                "name": t.get("table_name", "Unknown"),
-                "columns": t.get("columns", []),
-                "raw_content": None, 
-                "sample_data": t.get("sample_data", [])
-            })
-            
-        return {"connection": payload.connection_name, "tables": tables_data}
+        diff = snapshot_diff(previous, raw_tables)
+        snapshot = snapshots.save(payload.connection_name, conn_str, raw_tables)
+
+        return {"connection": payload.connection_name, "tables": _connect_tables(raw_tables),
+                "snapshot": {"taken_at": snapshot["taken_at"],
+                             "previous_taken_at": previous["taken_at"] if previous else None,
+                             "previous_age": snapshot["taken_at"] - previous["taken_at"] if previous else None,
+                             "diff": diff}}
     except Exception as e:
         print(f"Connection error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/connections/{name}/snapshot")
+def get_connection_snapshot(name: str):
+    """
+    Tables of a connection's last /api/connect, without touching the database, and
+    the snapshot's age in seconds, so clients can show them while a refresh runs.
+    """
+    snapshot = snapshots.load(name)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No snapshot for this connection")
+    return {"connection": name, "tables": _connect_tables(snapshot["tables"]),
+            "snapshot": {"taken_at": snapshot["taken_at"], "age": time.time() - snapshot["taken_at"]}}
+
+def _connect_tables(raw_tables):
+    """DBExtractor tables in the shape /api/connect returns them."""
+    tables_data = []
+    for t in raw_tables:
+        tables_data.append({
+            "name": t.get("table_name", "Unknown"),
+            "columns": t.get("columns", []),
+            "raw_content": None,
+            "sample_columns": t.get("sample_columns"),
+            "sample_data": t.get("sample_data", [])
+        })
+    return tables_data
+
+def _extract_dump(path, extractor, sample_rows, on_progress, recover=UPLOAD_RECOVER):
+    """Runs one uploaded dump through the chosen extractor; returns (extractor, raw tables)."""
+    if extractor == "ddl":
+        dump_extractor = DDLExtractor(path)
+    else:
+        dump_extractor = SQLFileExtractor(path, sanitize_cache=SANITIZE_CACHE_PATH,
+                                          sample_rows=sample_rows if sample_rows > 0 else None,
+                                          on_progress=on_progress, recover=recover)
+    return dump_extractor, dump_extractor.extract()
+
+def _unpack_and_extract(upload, filename, extractor, sample_rows, on_progress, recover=UPLOAD_RECOVER):
+    """
+    Decompresses the upload into UPLOAD_DIR while reading it and extracts each dump
+    as soon as it is written, up to UPLOAD_WORKERS at a time. Returns
+    [(path, extractor, raw tables)] in archive order.
+    """
+    archive = dump_suffix(filename) == ".zip"
+    sink = on_progress
+    if archive and on_progress is not None:
+        # Every dump reports its own DONE; the job is done only when the last one is
+        def sink(event):
+            if event.phase != DONE:
+                on_progress(event)
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        futures = [(path, pool.submit(_extract_dump, path, extractor, sample_rows, sink, recover))
+                   for path in unpack_dump(upload, filename, UPLOAD_DIR)]
+        results = [(path,) + future.result() for path, future in futures]
+    if archive and on_progress is not None:
+        on_progress(ProgressEvent("load", DONE, filename, done=len(results), total=len(results), unit="files"))
+    return results
+
 @app.post("/api/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), sample_rows: int = UPLOAD_SAMPLE_ROWS,
+                      extractor: str = "sqlite", job_id: Optional[str] = None, recover: bool = UPLOAD_RECOVER):
     """
     Uploads a SQL file and extracts tables.
+    The file may be a .sql dump, a .sql.gz / .bz2 compressed one (decompressed while it
+    is read, never stored compressed) or a .zip of dumps, which are extracted in parallel
+    into one table list (in archive order; "files" lists them).
+    sample_rows: INSERT rows loaded per table (all DDL always runs); 0 loads every row.
+    extractor: "sqlite" loads the dump into a temp SQLite DB (schema + sample data);
+        "ddl" parses CREATE/ALTER TABLE directly (schema and FKs only, much faster).
+    job_id: client-chosen id; the load's progress can be polled at /api/progress/{job_id}.
+    recover: statements SQLite rejects are skipped and listed in "skipped" (file, character
+        offsets, error and text), so one bad statement does not fail the upload; default
+        UPLOAD_RECOVER (off). Without it the first rejected statement fails the upload.
     """
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
+    if extractor not in UPLOAD_EXTRACTORS:
+        raise HTTPException(status_code=400, detail=f"Unknown extractor: {extractor}")
+    if dump_suffix(file.filename) is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type; expected {', '.join(SQL_SUFFIXES)}")
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Use new Extractor API
-        extractor = SQLFileExtractor(file_path)
-        raw_tables = extractor.extract()
-        
-        # Convert to JSON-serializable dicts
-        # Convert to JSON-serializable dicts
-        # SQLFileExtractor returns List[Dict] with keys 'table_name', 'columns', 'sample_data'
-        tables_data = []
+        # Off the event loop, so /api/progress can be answered while it runs
+        results = await run_in_threadpool(_unpack_and_extract, file.file, file.filename, extractor, sample_rows,
+                                          progress_board.sink(job_id) if job_id else None, recover)
+        return _upload_response(file.filename, results)
+
+    except Exception as e:
+        print(f"Upload error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _upload_response(filename, results):
+    """/api/upload's answer for the [(path, extractor, raw tables)] of _unpack_and_extract."""
+    # Convert to JSON-serializable dicts
+    # Extractors return List[Dict] with keys 'table_name', 'columns', 'sample_data'
+    tables_data = []
+    for _, _, raw_tables in results:
         for t in raw_tables:
             # t is a dict
             tables_data.append({
                 "name": t.get("table_name", "Unknown"),
                 "columns": t.get("columns", []), # already list of dicts with 'name', 'type'
-                "raw_content": None, 
+                "raw_content": None,
                 "sample_data": t.get("sample_data", [])
             })
-            
-        return {"filename": file.filename, "tables": tables_data}
-        
+
+    # Statements the loads skipped (see SQLFileExtractor's recover), with their character offsets
+    skipped = []
+    for path, dump_extractor, _ in results:
+        for entry in getattr(dump_extractor, "quarantined", ()):
+            skipped.append(dict(entry._asdict(), file=os.path.basename(path), text=entry.text[:UPLOAD_SKIPPED_TEXT]))
+
+    # One dialect when every dump agrees on it
+    dialects = {dump_extractor.detected_dialect for _, dump_extractor, _ in results}
+    return {"filename": filename, "dialect": dialects.pop() if len(dialects) == 1 else None,
+            "files": [os.path.basename(path) for path, _, _ in results], "tables": tables_data,
+            "skipped": skipped}
+
+# --- Chunked (resumable) uploads ---
+
+class ChunkedUploadInit(BaseModel):
+    filename: str
+    size: int # bytes of the whole file
+    sha256: str # hex digest of the whole file, checked before extraction
+    sample_rows: int = UPLOAD_SAMPLE_ROWS
+    extractor: str = "sqlite"
+    job_id: Optional[str] = None
+    recover: bool = UPLOAD_RECOVER # see /api/upload
+
+def _extract_spooled(path, filename, options):
+    """Extracts a verified chunked upload like /api/upload; a plain .sql is moved, not copied, to UPLOAD_DIR."""
+    on_progress = progress_board.sink(options["job_id"]) if options.get("job_id") else None
+    if dump_suffix(filename) == ".sql":
+        file_path = os.path.join(UPLOAD_DIR, filename)
+        os.replace(path, file_path)
+        return [(file_path,) + _extract_dump(file_path, options["extractor"], options["sample_rows"], on_progress,
+                                             options.get("recover", UPLOAD_RECOVER))]
+    with open(path, "rb") as upload:
+        return _unpack_and_extract(upload, filename, options["extractor"], options["sample_rows"], on_progress,
+                                   options.get("recover", UPLOAD_RECOVER))
+
+# Spooled under UPLOAD_DIR, so finished .sql files are moved into it without a copy
+chunked_uploads = ChunkedUploads(os.path.join(UPLOAD_DIR, ".chunks"), _extract_spooled)
+
+@app.post("/api/uploads")
+def init_chunked_upload(payload: ChunkedUploadInit):
+    """
+    Starts a resumable upload: send the file with PUT /api/uploads/{upload_id}?offset=N
+    (raw bytes, chunk_size each), then POST /api/uploads/{upload_id}/finalize.
+    Extraction starts as soon as the last chunk arrives; finalize returns what /api/upload does.
+    """
+    if payload.extractor not in UPLOAD_EXTRACTORS:
+        raise HTTPException(status_code=400, detail=f"Unknown extractor: {payload.extractor}")
+    if dump_suffix(payload.filename) is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type; expected {', '.join(SQL_SUFFIXES)}")
+    try:
+        return chunked_uploads.init(payload.filename, payload.size, payload.sha256,
+                                    {"extractor": payload.extractor, "sample_rows": payload.sample_rows,
+                                     "job_id": payload.job_id, "recover": payload.recover})
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@app.put("/api/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, offset: int, request: Request):
+    """
+    Writes the request body at byte `offset` of the upload. Offsets up to the bytes received
+    so far are accepted (a retried chunk overwrites); answers with the upload's status.
+    """
+    if int(request.headers.get("content-length") or 0) > MAX_CHUNK_SIZE:
+        raise HTTPException(status_code=413, detail=f"Chunks are limited to {MAX_CHUNK_SIZE} bytes")
+    data = await request.body()
+    try:
+        return await run_in_threadpool(chunked_uploads.write, upload_id, offset, data)
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@app.get("/api/uploads/{upload_id}")
+def get_chunked_upload(upload_id: str):
+    """Bytes received (resume from there) and state: uploading, extracting, done or failed."""
+    try:
+        return chunked_uploads.status(upload_id)
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@app.post("/api/uploads/{upload_id}/finalize")
+async def finalize_chunked_upload(upload_id: str):
+    """Waits for the checksum check and extraction of a complete upload; returns its tables."""
+    try:
+        filename = chunked_uploads.status(upload_id)["filename"]
+        results = await asyncio.wrap_future(chunked_uploads.finalize(upload_id))
+    except ChunkedUploadError as e:
+        # A checksum mismatch resets the upload; it can be sent again under the same id
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         print(f"Upload error: {e}")
+        chunked_uploads.discard(upload_id)
         raise HTTPException(status_code=500, detail=str(e))
+    chunked_uploads.discard(upload_id)
+    return _upload_response(filename, results)
+
+@app.delete("/api/uploads/{upload_id}")
+def delete_chunked_upload(upload_id: str):
+    """Abandons an upload and removes its spooled chunks."""
+    chunked_uploads.discard(upload_id)
+    return {"status": "deleted", "upload_id": upload_id}
+
+@app.get("/api/progress/{job_id}")
+def get_progress(job_id: str):
+    """
+    Latest progress event of an upload / connect started with this job_id: phase, file,
+    done / total (bytes or tables), statements per second, ETA; plus the errors so far.
+    """
+    progress = progress_board.get(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return progress
 
 @app.post("/api/map")
 async def map_tables(payload: MapRequest):
@@ -154,7 +381,8 @@ async def map_tables(payload: MapRequest):
     
     all_raw_tables = []
     for t_data in payload.tables:
-        cols = [RawColumn(name=c['name'], original_type=c['type']) for c in t_data.get('columns', [])]
+        cols = [RawColumn(name=c['name'], original_type=c['type'], fk=c.get('foreign_key'), profile=c.get('profile'))
+                for c in t_data.get('columns', [])]
         raw_table = RawTable(
             name=t_data['name'],
             columns=cols,
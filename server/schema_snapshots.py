@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_DIR = os.path.join(os.getcwd(), "schema_snapshots")
+
+
+class SchemaSnapshots:
+    """
+    The last extraction of each saved connection (DBExtractor output, with table
+    fingerprints), one JSON file per connection name, so a reconnect re-extracts
+    only the tables that changed. A snapshot is only used with the connection string
+    it was taken from; only a digest of that string is kept (it may hold a password).
+    """
+
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self, name: str, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        {"connection", "taken_at", "tables"} of a connection, or None if it has none
+        (or one taken from another connection string than `source`, when given).
+        """
+        try:
+            with open(self._path(name), "r", encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if source is not None and snapshot.get("source") != _source_digest(source):
+            return None
+        return snapshot
+
+    def save(self, name: str, source: str, tables: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Replaces the snapshot of a connection with freshly extracted tables; returns it."""
+        snapshot = {"connection": name, "source": _source_digest(source), "taken_at": time.time(), "tables": tables}
+        path = self._path(name)
+        with self._lock:
+            with open(path + ".tmp", "w", encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, default=str)
+            os.replace(path + ".tmp", path)
+        return snapshot
+
+    def delete(self, name: str) -> bool:
+        """Forgets the snapshot of a connection."""
+        try:
+            os.remove(self._path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _path(self, name: str) -> str:
+        # Connection names are free text; the file is named after their digest
+        return os.path.join(self.directory, hashlib.sha1(name.encode("utf-8")).hexdigest() + ".json")
+
+
+def snapshot_diff(previous: Optional[Dict[str, Any]], tables: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    What changed since a snapshot, by table fingerprint: "added", "removed" and
+    "changed" table names and the number of "unchanged" tables (everything is
+    "added" without a snapshot).
+    """
+    before = {t["table_name"]: t.get("fingerprint") for t in previous["tables"]} if previous else {}
+    after = {t["table_name"]: t.get("fingerprint") for t in tables}
+    return {
+        "added": [name for name in after if name not in before],
+        "removed": [name for name in before if name not in after],
+        "changed": [name for name, digest in after.items() if name in before and before[name] != digest],
+        "unchanged": sum(1 for name, digest in after.items() if name in before and before[name] == digest),
+    }
+
+
+def _source_digest(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
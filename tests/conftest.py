@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Add project root to sys.path so 'from tools...' / 'from ontologymirror...' imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
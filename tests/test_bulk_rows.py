@@ -0,0 +1,51 @@
+import pytest
+
+from tools.db_manager_lib.core.bulk_rows import parse_copy, parse_insert
+
+
+def _rows(text, **kwargs):
+    bulk = parse_insert(text, **kwargs)
+    return None if bulk is None else list(bulk)
+
+
+def test_plain_literals():
+    bulk = parse_insert("INSERT INTO `db`.`t` (`a`, b) VALUES (1, -2.5, 'x''y'), (NULL, TRUE, 1e3);")
+    assert (bulk.table, bulk.columns, bulk.count) == ("t", ("a", "b"), 2)
+    assert list(bulk) == [(1, -2.5, "x'y"), (None, 1, 1000.0)]
+
+
+def test_hex_literals():
+    assert _rows("INSERT INTO t VALUES (0xABCD, X'00ff');") == [(b'\xab\xcd', b'\x00\xff')]
+    # An odd number of digits is left-padded, as MySQL does
+    assert _rows("INSERT INTO t VALUES (0xABC);") == [(b'\x0a\xbc',)]
+    assert _rows("INSERT INTO t VALUES (X'ABC');") is None
+
+
+def test_integer_beyond_64_bits_is_real():
+    assert _rows("INSERT INTO t VALUES (99999999999999999999);") == [(1e20,)]
+
+
+def test_mysql_backslash_escapes():
+    assert _rows(r"INSERT INTO t VALUES ('Bob\'s\n', 'a\%');", backslash_escapes=True) == [("Bob's\n", "a\\%")]
+    # Without backslash escapes the same text is not one string
+    assert _rows(r"INSERT INTO t VALUES ('Bob\'s');") is None
+
+
+@pytest.mark.parametrize("text", [
+    "INSERT INTO t VALUES (CAST('1' AS INTEGER));",
+    "INSERT INTO t SELECT * FROM u;",
+    "INSERT INTO t VALUES (1) ON DUPLICATE KEY UPDATE a = 1;",
+    "INSERT INTO t VALUES (1), 2;",
+    "INSERT INTO t VALUES (1) (2);",
+    "INSERT INTO t VALUES (1",
+    "INSERT INTO t VALUES ;",
+    "UPDATE t SET a = 1;",
+])
+def test_not_plain_rows(text):
+    assert parse_insert(text) is None
+
+
+def test_copy_block():
+    bulk = parse_copy("COPY public.t (a, b) FROM stdin;\n1\t\\N\n2\tx\\ty\n\\.\n")
+    assert (bulk.table, bulk.columns) == ("t", ("a", "b"))
+    assert list(bulk) == [("1", None), ("2", "x\ty")]
@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+import pytest
+
+from server.chunked_upload import DONE, EXTRACTING, FAILED, UPLOADING, ChunkedUploadError, ChunkedUploads
+
+DATA = b"CREATE TABLE t (id int);\nINSERT INTO t VALUES (1);\n"
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    extracted = []
+
+    def extract(path, filename, options):
+        with open(path, 'rb') as f:
+            extracted.append((filename, f.read(), options))
+        return len(extracted)
+
+    uploads = ChunkedUploads(str(tmp_path / "spool"), extract)
+    uploads.extracted = extracted
+    return uploads
+
+
+def _init(uploads, sha256=None):
+    return uploads.init("dump.sql", len(DATA), sha256 or hashlib.sha256(DATA).hexdigest(), {"job_id": "j"})["upload_id"]
+
+
+def test_chunks_with_a_retry(uploads):
+    upload_id = _init(uploads)
+    uploads.write(upload_id, 0, DATA[:20])
+    uploads.write(upload_id, 10, DATA[10:30])      # retried, overlapping chunk: hashed from disk at the end
+    uploads.write(upload_id, 30, DATA[30:])
+    assert uploads.finalize(upload_id).result(timeout=10) == 1
+    assert uploads.extracted == [("dump.sql", DATA, {"job_id": "j"})]
+    assert uploads.status(upload_id)["state"] == DONE
+
+
+@pytest.mark.parametrize("in_order", (True, False))
+def test_hash_mismatch(uploads, in_order):
+    upload_id = _init(uploads)
+    corrupt = DATA[:-2] + b"X\n"
+    if in_order:
+        uploads.write(upload_id, 0, corrupt)
+    else:
+        uploads.write(upload_id, 0, corrupt[:30])
+        uploads.write(upload_id, 20, corrupt[20:])
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.finalize(upload_id).result(timeout=10)
+    assert excinfo.value.status_code == 422
+    assert "Checksum mismatch" in excinfo.value.detail
+    status = uploads.status(upload_id)
+    assert (status["state"], status["received"]) == (FAILED, 0)
+    assert uploads.extracted == []
+
+    # The client sends the file again from the start
+    uploads.write(upload_id, 0, DATA)
+    assert uploads.finalize(upload_id).result(timeout=10) == 1
+    assert uploads.extracted == [("dump.sql", DATA, {"job_id": "j"})]
+
+
+def test_finalize_after_the_check_failed(uploads):
+    upload_id = _init(uploads)
+    uploads.write(upload_id, 0, DATA[:-2] + b"X\n")
+    while uploads.status(upload_id)["state"] == EXTRACTING:
+        time.sleep(0.01)
+    # The mismatch is reported even though the check ended before finalize was called
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.finalize(upload_id)
+    assert excinfo.value.status_code == 422
+    uploads.write(upload_id, 0, DATA[:10])
+    assert uploads.status(upload_id)["state"] == UPLOADING
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.finalize(upload_id)
+    assert excinfo.value.status_code == 409
+
+
+def test_gaps_and_oversized_chunks_are_refused(uploads):
+    upload_id = _init(uploads)
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.write(upload_id, 5, DATA[5:10])
+    assert excinfo.value.status_code == 409
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.write(upload_id, 0, DATA + b"extra")
+    assert excinfo.value.status_code == 400
+    with pytest.raises(ChunkedUploadError) as excinfo:
+        uploads.finalize(upload_id)
+    assert excinfo.value.status_code == 409
+    assert uploads.status(upload_id)["state"] == UPLOADING
+
+
+def test_upload_resumes_after_restart(uploads):
+    upload_id = _init(uploads)
+    uploads.write(upload_id, 0, DATA[:25])
+    restarted = ChunkedUploads(uploads.spool_dir, uploads.extract)
+    assert restarted.status(upload_id)["received"] == 25
+    restarted.write(upload_id, 25, DATA[25:])
+    assert restarted.finalize(upload_id).result(timeout=10) == 1
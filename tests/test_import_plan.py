@@ -0,0 +1,82 @@
+import sqlite3
+
+from tools.db_manager_lib.core.import_plan import plan_import, scan_file
+from tools.db_manager_lib.core.importer import ImportManager
+
+HEAD = "-- MySQL dump 10.13\n"
+SCHEMA = (HEAD +
+          "CREATE TABLE `a` (`id` int PRIMARY KEY);\n"
+          "CREATE TABLE `b` (`id` int, `a_id` int REFERENCES `a` (`id`));\n"
+          "CREATE TABLE `c` (`id` int, `name` varchar(10));\n")
+DATA = (HEAD +
+        "".join(f"INSERT INTO `a` VALUES ({i});\n" for i in range(1, 7)) +
+        "".join(f"INSERT INTO `b` VALUES ({i},{i});\n" for i in range(1, 4)) +
+        "INSERT INTO `c` VALUES (1,'x'),(2,'y');\n")
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_scan_file(tmp_path):
+    scan = scan_file(_write(tmp_path, "data.sql", DATA))
+    assert scan.dialect == "mysql"
+    assert scan.inserts == {"a": 6, "b": 3, "c": 1}
+    assert scan.creates == [] and scan.ordered is None
+    scan = scan_file(_write(tmp_path, "schema.sql", SCHEMA))
+    assert scan.creates == ["a", "b", "c"]
+    assert scan.references == set()     # a is created in the same file
+
+    scan = scan_file(_write(tmp_path, "select.sql", HEAD + "INSERT INTO `c` SELECT * FROM `a`;\n"))
+    assert scan.ordered.startswith("INSERT ... SELECT")
+
+
+def test_plan_orders_schema_first_and_splits_tables(tmp_path):
+    data, schema = _write(tmp_path, "data.sql", DATA), _write(tmp_path, "schema.sql", SCHEMA)
+    plan = plan_import([data, schema])
+    assert plan.files == [schema, data]
+    assert plan.shardable and plan.reason is None
+    assert plan.data_tables() == {"a": 6, "b": 3, "c": 1}
+    # Largest table first, each to the lightest shard
+    assert plan.split(2) == [["a"], ["b", "c"]]
+    assert plan.split(5) == [["a"], ["b"], ["c"]]
+
+
+def test_alter_after_data_is_not_shardable(tmp_path):
+    schema = _write(tmp_path, "schema.sql", SCHEMA)
+    data = _write(tmp_path, "data.sql", DATA + "ALTER TABLE `c` ADD COLUMN `extra` int;\n")
+    plan = plan_import([schema, data])
+    assert not plan.shardable
+    assert "ALTER / DROP after data" in plan.reason
+
+
+def _import(tmp_path, name, files, shard_workers):
+    db_path = tmp_path / f"{name}.db"
+    log = []
+    manager = ImportManager(str(tmp_path), streaming=True, pipeline_workers=0, shard_workers=shard_workers)
+    manager.SHARD_THRESHOLD = 0
+    manager._worker(files, name, str(db_path), "append", log.append)
+    conn = sqlite3.connect(db_path)
+    try:
+        return log, {table: conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall() for table in "abc"}
+    finally:
+        conn.close()
+
+
+def test_sharded_load_equals_serial(tmp_path):
+    files = [_write(tmp_path, "data.sql", DATA), _write(tmp_path, "schema.sql", SCHEMA)]
+    log, sharded = _import(tmp_path, "sharded", files, shard_workers=2)
+    assert any(line.startswith("Merged 2 shards") for line in log)
+    _, serial = _import(tmp_path, "serial", files, shard_workers=0)
+    assert sharded == serial
+    assert [row[0] for row in sharded["a"]] == [1, 2, 3, 4, 5, 6]
+
+
+def test_shard_count_stays_within_the_attach_limit(tmp_path):
+    manager = ImportManager(str(tmp_path), shard_workers=32)
+    conn = sqlite3.connect(":memory:")
+    assert manager._shard_count(conn, {}, manager.SHARD_THRESHOLD) == ImportManager.MAX_SHARDS
+    manager.shard_workers = 1
+    assert manager._shard_count(conn, {}, manager.SHARD_THRESHOLD) == 0
@@ -0,0 +1,91 @@
+import functools
+import sqlite3
+
+from ontologymirror.extractors.db_extractor import DBExtractor
+from tools.connectors.sqlite import SQLiteConnector
+from tools.db_manager_lib.core import importer, sql_stream
+from tools.db_manager_lib.core.import_manifest import LOADED, PARTIAL, ImportManifest
+from tools.db_manager_lib.core.importer import ImportManager
+
+DUMP = ("-- MySQL dump 10.13\n"
+        "CREATE TABLE `t` (`id` int);\n"
+        "INSERT INTO `t` VALUES (1),(2);\n"
+        "INSERT INTO `t` VALUES (3),(4);\n"
+        "INSERT INTO `later` VALUES (1);\n"
+        "INSERT INTO `t` VALUES (5);\n")
+
+
+def _import(tmp_path, files, db_path, **kwargs):
+    log = []
+    manager = ImportManager(str(tmp_path), streaming=True, pipeline_workers=0, **kwargs)
+    manager._worker([str(f) for f in files], "test", str(db_path), "append", log.append)
+    return log
+
+
+def _manifest(db_path, path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return ImportManifest(conn).entry(str(path))
+    finally:
+        conn.close()
+
+
+def test_resume_from_manifest(tmp_path, monkeypatch):
+    # Small groups, so the file commits checkpoints before the statement that fails
+    monkeypatch.setattr(importer, "load_sql_stream", functools.partial(sql_stream.load_sql_stream, flush_size=16))
+    dump, db_path = tmp_path / "dump.sql", tmp_path / "target.db"
+    dump.write_text(DUMP, encoding="utf-8")
+
+    _import(tmp_path, [dump], db_path)
+    entry = _manifest(db_path, dump)
+    assert entry["status"] == PARTIAL and entry["checkpoint"] > 0
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE later (id int)")
+    conn.commit()
+    conn.close()
+    log = _import(tmp_path, [dump], db_path)
+    assert any(line.startswith("Resuming dump.sql") for line in log)
+    assert _manifest(db_path, dump)["status"] == LOADED
+    conn = sqlite3.connect(db_path)
+    assert [row[0] for row in conn.execute("SELECT id FROM t ORDER BY id")] == [1, 2, 3, 4, 5]
+    conn.close()
+
+    # Loaded and unchanged: skipped
+    log = _import(tmp_path, [dump], db_path)
+    assert any(line.startswith("Skipping") for line in log)
+
+
+def test_changed_file_is_loaded_again(tmp_path):
+    dump, db_path = tmp_path / "dump.sql", tmp_path / "target.db"
+    dump.write_text("CREATE TABLE `t` (`id` int);\nINSERT INTO `t` VALUES (1);\n", encoding="utf-8")
+    _import(tmp_path, [dump], db_path)
+    dump.write_text("CREATE TABLE `u` (`id` int);\nINSERT INTO `u` VALUES (1);\n", encoding="utf-8")
+    log = _import(tmp_path, [dump], db_path)
+    assert not any(line.startswith("Skipping") for line in log)
+    assert _manifest(db_path, dump)["status"] == LOADED
+
+
+def test_import_tables_are_not_extracted(tmp_path):
+    dump, db_path = tmp_path / "dump.sql", tmp_path / "target.db"
+    dump.write_text("-- MySQL dump 10.13\nCREATE TABLE `t` (`id` int);\nINSERT INTO `missing` VALUES (1);\n",
+                    encoding="utf-8")
+    _import(tmp_path, [dump], db_path, recover=True)
+    conn = sqlite3.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert {"_import_manifest", "_import_quarantine"} <= names
+
+    extractor = DBExtractor(f"sqlite:///{db_path}", db_type="SQLite")
+    try:
+        assert [t["table_name"] for t in extractor.extract()] == ["t"]
+    finally:
+        extractor.engine.dispose()
+
+    connector = SQLiteConnector(f"sqlite:///{db_path}")
+    connector.connect()
+    try:
+        assert connector.get_tables() == ["t"]
+        assert [name for _, name in connector.get_catalog()] == ["t"]
+    finally:
+        connector.engine.dispose()
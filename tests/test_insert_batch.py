@@ -0,0 +1,52 @@
+import sqlite3
+
+from tools.db_manager_lib.core.insert_batch import coalesce_inserts, count_statements
+
+SCHEMA = "CREATE TABLE t (id int, name text);\nCREATE TABLE u (id int);\n"
+
+
+def _rows(sql):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA + sql)
+    return [conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall() for table in ("t", "u")]
+
+
+def test_runs_are_merged():
+    sql = "".join(f"INSERT INTO t VALUES ({i}, 'n;{i}');\n" for i in range(5))
+    merged = coalesce_inserts(sql)
+    assert count_statements(merged) == 1
+    assert _rows(merged) == _rows(sql)
+
+
+def test_a_run_ends_at_another_table_or_statement():
+    sql = ("INSERT INTO t VALUES (1, 'a');\nINSERT INTO t VALUES (2, 'b');\n"
+           "INSERT INTO u VALUES (1);\nINSERT INTO u VALUES (2);\n"
+           "INSERT INTO t (id) VALUES (3);\n"
+           "UPDATE t SET name = 'c' WHERE id = 3;\n"
+           "INSERT INTO t VALUES (4, 'd');\n")
+    merged = coalesce_inserts(sql)
+    assert count_statements(merged) == 5
+    assert _rows(merged) == _rows(sql)
+
+
+def test_batch_size():
+    sql = "".join(f"INSERT INTO u VALUES ({i});\n" for i in range(100))
+    merged = coalesce_inserts(sql, batch_size=40)
+    assert 1 < count_statements(merged) < 100
+    assert _rows(merged) == _rows(sql)
+
+
+def test_inserts_that_are_not_merged():
+    sql = ("INSERT INTO u VALUES (1);\n"
+           "INSERT INTO u VALUES ((SELECT count(*) FROM u));\n"
+           "INSERT INTO u VALUES (3) RETURNING id;\n"
+           "INSERT INTO u VALUES (4 /* four */);\n")
+    merged = coalesce_inserts(sql)
+    assert count_statements(merged) == 4
+    assert _rows(merged) == _rows(sql) == [[], [(1,), (1,), (3,), (4,)]]
+
+
+def test_multi_row_scripts_are_left_alone():
+    rows = ",".join(f"({i})" for i in range(1000))
+    sql = f"INSERT INTO u VALUES {rows};\nINSERT INTO u VALUES {rows};\n"
+    assert coalesce_inserts(sql) is sql
@@ -0,0 +1,59 @@
+import sqlite3
+
+from ontologymirror.extractors.sql_file_extractor import SQLFileExtractor
+from tools.db_manager_lib.core.quarantine import isolate
+
+HEADER = "-- MySQL dump 10.13\n/*!40101 SET NAMES utf8mb4 */;\nCREATE TABLE `t` (`id` int NOT NULL, PRIMARY KEY (`id`));\n"
+
+
+def _recover(tmp_path, body):
+    path = tmp_path / "dump.sql"
+    path.write_text(HEADER + body, encoding="utf-8")
+    extractor = SQLFileExtractor(str(path), dialect="auto", load_profile="default", recover=True)
+    tables = {t["table_name"]: t for t in extractor.extract()}
+    return extractor.quarantined, tables
+
+
+def _values(ids):
+    return ",".join(f"({i})" for i in ids)
+
+
+def test_whole_statement_failure_is_quarantined_once(tmp_path):
+    quarantined, tables = _recover(tmp_path, f"INSERT INTO `missing` VALUES {_values(range(100))};\n"
+                                             f"INSERT INTO `t` VALUES {_values(range(3))};\n")
+    assert len(quarantined) == 1
+    assert quarantined[0].row is None
+    assert "no such table" in quarantined[0].error
+    assert quarantined[0].text.strip().startswith("INSERT INTO `missing`")
+    assert len(tables["t"]["sample_data"]) == 3
+
+
+def test_bad_rows_are_quarantined_alone(tmp_path):
+    # Duplicate keys in both halves: constraint errors are bisected down to the rows
+    ids = [1, 2, 1, 3, 4, 5, 4, 6]
+    quarantined, tables = _recover(tmp_path, f"INSERT INTO `t` VALUES {_values(ids)};\n")
+    assert [q.row for q in quarantined] == [2, 6]
+    assert all("UNIQUE" in q.error for q in quarantined)
+    assert [row[0] for row in tables["t"]["sample_data"]] == [1, 2, 3, 4, 5]
+
+
+class _Unit:
+    def __init__(self, sql, parts=None):
+        self.sql = sql
+        self._parts = parts
+
+    def run(self, conn):
+        conn.execute(self.sql)
+
+    def parts(self):
+        return self._parts
+
+
+def test_isolate_keeps_good_units():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a)")
+    conn.execute("BEGIN")
+    units = [_Unit(f"INSERT INTO t VALUES ({i})") for i in range(7)] + [_Unit("INSERT INTO nope VALUES (1)")]
+    failed = isolate(conn, units, sqlite3.OperationalError("no such table: nope"))
+    assert [unit.sql for unit, _ in failed] == ["INSERT INTO nope VALUES (1)"]
+    assert conn.execute("SELECT count(*) FROM t").fetchone()[0] == 7
@@ -0,0 +1,59 @@
+import base64
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ontologymirror.extractors.db_extractor import DBExtractor
+from ontologymirror.extractors.sampling import SAMPLE_BINARY_BYTES, SAMPLE_TEXT_CHARS, wide_kind
+
+
+def test_wide_kind():
+    assert wide_kind("text") == "text"
+    assert wide_kind("nvarchar(max)") == "text"
+    assert wide_kind("character varying") == "text"
+    assert wide_kind("varchar(50)") is None
+    assert wide_kind("bytea") == "binary"
+    assert wide_kind("BLOB") == "binary"
+    assert wide_kind("binary(16)") is None
+    assert wide_kind("text[]") is None
+    assert wide_kind("integer") is None
+
+
+def _extract(tmp_path, **kwargs):
+    path = tmp_path / "wide.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, title VARCHAR(20), body TEXT, data BLOB)")
+    conn.execute("INSERT INTO docs VALUES (1, 'one', ?, ?)", ("x" * 5000, bytes(range(256)) * 40))
+    conn.execute("INSERT INTO docs VALUES (2, 'two', 'short', x'0102')")
+    conn.commit()
+    conn.close()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        tables = DBExtractor(f"sqlite:///{path}", **kwargs).extract()
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    return {t["table_name"]: t for t in tables}["docs"], statements
+
+
+def test_wide_values_are_cut_in_the_query(tmp_path):
+    table, statements = _extract(tmp_path)
+    assert any(f'SUBSTR(body, 1, {SAMPLE_TEXT_CHARS + 1})' in s and 'LENGTH(data)' in s for s in statements)
+    assert [row[:2] for row in table["sample_data"]] == [(1, "one"), (2, "two")]
+    (_, _, body, data), (_, _, short, small) = table["sample_data"]
+    assert body == "x" * SAMPLE_TEXT_CHARS + "..."
+    assert data["length"] == 256 * 40 and data["truncated"]
+    assert len(data["binary"]) == len(base64.b64encode(bytes(SAMPLE_BINARY_BYTES)))
+    assert short == "short"
+    assert small == {"binary": "AQI=", "length": 2, "truncated": False}
+
+
+def test_sample_columns_keep_their_order(tmp_path):
+    table, _ = _extract(tmp_path, sample_columns={"docs": ["data", "id"]})
+    assert [row[1] for row in table["sample_data"]] == [1, 2]
+    assert table["sample_data"][0][0]["truncated"]
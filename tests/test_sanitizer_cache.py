@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from conftest import DATA_DIR
+from tools.db_manager_lib.core.sanitizer import SQLSanitizer
+from tools.db_manager_lib.core.sanitizer_cache import SanitizeCache
+
+DIALECTS = (None,) + tuple(SQLSanitizer.DIALECT_FAMILIES)
+
+
+@pytest.mark.parametrize("engine", SQLSanitizer.ENGINES)
+@pytest.mark.parametrize("name", ("pg_dump.sql", "mysql_dump.sql"))
+def test_cached_equals_uncached_for_each_dialect(tmp_path, engine, name):
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        script = f.read()
+    # One cache for every dialect: entries of one must never be served for another
+    cache = SanitizeCache(str(tmp_path / "cache.db"))
+    try:
+        for _ in range(2):      # misses, then hits
+            for dialect in DIALECTS:
+                expected = SQLSanitizer.sanitize(script, engine=engine, dialect=dialect)
+                assert SQLSanitizer.sanitize(script, engine=engine, dialect=dialect, cache=cache) == expected
+    finally:
+        cache.close()
@@ -0,0 +1,40 @@
+"""The token engine and the parallel sanitizer give what the serial regex chain gives."""
+import glob
+import os
+
+import pytest
+
+from conftest import DATA_DIR
+from tools.db_manager_lib.core.sanitizer import SQLSanitizer
+from tools.db_manager_lib.core.sanitizer_parallel import ParallelSanitizer
+
+# Sample uploads kept in the repository (T-SQL dumps), and the real-shaped dumps under tests/data
+UPLOADS = sorted(glob.glob(os.path.join(os.path.dirname(DATA_DIR), os.pardir, "temp_uploads", "*.sql")))
+DUMPS = sorted(glob.glob(os.path.join(DATA_DIR, "*.sql")))
+
+
+def _read(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def test_corpus_is_there():
+    assert UPLOADS and DUMPS
+
+
+@pytest.mark.parametrize("path", UPLOADS, ids=os.path.basename)
+@pytest.mark.parametrize("dialect", (None, "auto"))
+def test_token_matches_regex(path, dialect):
+    script = _read(path)
+    assert SQLSanitizer.sanitize(script, engine="token", dialect=dialect) == \
+        SQLSanitizer.sanitize(script, dialect=dialect)
+
+
+@pytest.mark.parametrize("path", UPLOADS + DUMPS, ids=os.path.basename)
+@pytest.mark.parametrize("dialect", (None, "tsql", "mysql", "postgres"))
+def test_parallel_matches_serial(path, dialect):
+    script = _read(path)
+    serial = SQLSanitizer.sanitize(script, dialect=dialect)
+    # Small pieces, so statements and GO batches are cut at many places
+    for piece_size in (64, 1024):
+        assert ParallelSanitizer.sanitize(script, workers=2, piece_size=piece_size, dialect=dialect) == serial
@@ -0,0 +1,35 @@
+import os
+from collections import namedtuple
+
+from tools.db_manager_lib.core import sqlite_load
+from tools.db_manager_lib.core.sqlite_load import ScratchDatabase
+
+_Usage = namedtuple("_Usage", "total used free")
+
+
+def _scratch(monkeypatch, tmp_path, free, size_hint):
+    monkeypatch.setattr(sqlite_load, "TMPFS_DIR", str(tmp_path))
+    monkeypatch.setattr(sqlite_load.shutil, "disk_usage", lambda path: _Usage(free, 0, free))
+    db = ScratchDatabase("tmpfs", size_hint=size_hint)
+    try:
+        return db.location, os.path.dirname(db.path)
+    finally:
+        db.close()
+
+
+def test_tmpfs_with_room(monkeypatch, tmp_path):
+    assert _scratch(monkeypatch, tmp_path, free=1 << 30, size_hint=1 << 20) == ("tmpfs", str(tmp_path))
+
+
+def test_tmpfs_too_small_falls_back_to_disk(monkeypatch, tmp_path):
+    # Docker's default /dev/shm against a 100 MB dump
+    location, directory = _scratch(monkeypatch, tmp_path, free=64 << 20, size_hint=100 << 20)
+    assert location == "disk"
+    assert directory != str(tmp_path)
+
+
+def test_missing_tmpfs_falls_back_to_disk(monkeypatch, tmp_path):
+    monkeypatch.setattr(sqlite_load, "TMPFS_DIR", str(tmp_path / "missing"))
+    db = ScratchDatabase("tmpfs")
+    db.close()
+    assert db.location == "disk"
@@ -0,0 +1,132 @@
+"""
+Benchmark for the balanced-parenthesis rewriters of the sanitizer:
+CHECK-constraint removal (SchemaSanitizerRules.remove_check_with_pattern)
+and CONVERT -> CAST (TSQLSanitizerRules._replace_convert).
+
+Builds a synthetic T-SQL dump with N constraints and N CONVERT calls and
+times the current single-pass rewriters against the previous quadratic
+implementations (kept below as reference). The legacy versions only run up
+to --legacy-max constraints, as they take hours at 100k.
+
+    python tools/benchmarks/bench_sanitizer_parens.py --sizes 1000 10000 100000
+"""
+import argparse
+import re
+import sys
+import os
+import time
+# Add project root to sys.path so 'from tools...' imports work
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tools.db_manager_lib.core.sanitizer_schema import SchemaSanitizerRules
+from tools.db_manager_lib.core.sanitizer_tsql import TSQLSanitizerRules
+
+
+def legacy_remove_check_with_pattern(script, pattern_str):
+    check_indices = [m.start() for m in re.finditer(r'(?i)\bCHECK\s*\(', script)]
+    for start_pos in reversed(check_indices):
+        open_paren_idx = script.find('(', start_pos)
+        if open_paren_idx == -1: continue
+        depth = 1
+        current = open_paren_idx + 1
+        end_pos = -1
+        while current < len(script):
+            char = script[current]
+            if char == '(': depth += 1
+            elif char == ')': depth -= 1
+            if depth == 0:
+                end_pos = current + 1
+                break
+            current += 1
+        if end_pos != -1:
+            block = script[start_pos:end_pos]
+            if re.search(pattern_str, block, re.IGNORECASE):
+                prefix_remove_start = start_pos
+                pre_chunk = script[:start_pos]
+                constraint_match = re.search(r'(?i)CONSTRAINT\s+[\w\[\]"\'`]+\s*$', pre_chunk)
+                if constraint_match: prefix_remove_start = constraint_match.start()
+                script = script[:prefix_remove_start] + script[end_pos:]
+    return re.sub(r'(?i)\bAS\s+\(.*?\)(?=\s*,|\s*$)', '', script, flags=re.MULTILINE)
+
+
+def legacy_replace_convert(script):
+    pattern = re.compile(r'(?i)\bCONVERT\s*\(')
+    for _ in range(400):
+        match = pattern.search(script)
+        if not match: break
+        start = match.end()
+        depth = 1
+        current = start
+        comma_indices = []
+        while current < len(script) and depth > 0:
+            char = script[current]
+            if char == '(': depth += 1
+            elif char == ')': depth -= 1
+            elif char == ',' and depth == 1:
+                comma_indices.append(current)
+            if depth == 0: break
+            current += 1
+        if depth != 0: break
+        end = current
+        if len(comma_indices) >= 1:
+            target_type = script[start:comma_indices[0]].strip()
+            expr_end = comma_indices[1] if len(comma_indices) > 1 else end
+            expr = script[comma_indices[0]+1:expr_end].strip()
+            if target_type.lower() == 'xml': target_type = 'TEXT'
+            script = script[:match.start()] + f"CAST({expr} AS {target_type})" + script[end+1:]
+        else:
+            break
+    return script
+
+
+def synthetic_dump(constraints):
+    """One table per 10 constraints; half of the CHECKs use [FM]-style patterns SQLite cannot run."""
+    parts = []
+    for t in range(0, constraints, 10):
+        cols = []
+        for c in range(t, min(t + 10, constraints)):
+            if c % 2:
+                check = f"CONSTRAINT [CK_{c}] CHECK ([code{c}] LIKE '[A-Z][FM]%')"
+            else:
+                check = f"CHECK ([qty{c}] > (0) AND [qty{c}] < ({c + 1}))"
+            cols.append(f"    [col{c}] nvarchar(20) NULL {check}")
+        parts.append(f"CREATE TABLE [dbo].[T{t}] (\n" + ",\n".join(cols) + "\n);")
+        values = ", ".join(f"CONVERT(int, '{c}')" for c in range(t, min(t + 10, constraints)))
+        parts.append(f"INSERT INTO [dbo].[T{t}] VALUES ({values});")
+    return "\n".join(parts)
+
+
+def _time(func, script):
+    start = time.perf_counter()
+    result = func(script)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--legacy-max', type=int, default=5000,
+                        help="largest size the quadratic implementations are run on")
+    args = parser.parse_args()
+
+    pattern = SchemaSanitizerRules.CHECK_PATTERNS[0]
+    print(f"{'constraints':>11} {'MB':>6} {'check ms':>10} {'legacy ms':>10} {'convert ms':>11} {'legacy ms':>10} {'legacy CASTs':>13}")
+    for n in args.sizes:
+        script = synthetic_dump(n)
+        check_s, checked = _time(lambda s: SchemaSanitizerRules.remove_check_with_pattern(s, pattern), script)
+        convert_s, converted = _time(TSQLSanitizerRules._replace_convert, script)
+        legacy_check = legacy_convert = legacy_casts = '-'
+        if n <= args.legacy_max:
+            seconds, legacy_checked = _time(lambda s: legacy_remove_check_with_pattern(s, pattern), script)
+            assert legacy_checked == checked, "CHECK removal differs from the legacy implementation"
+            legacy_check = f"{seconds * 1000:.0f}"
+            seconds, legacy_converted = _time(legacy_replace_convert, script)
+            legacy_convert = f"{seconds * 1000:.0f}"
+            legacy_casts = f"{legacy_converted.count('CAST(')}/{n}"
+        assert converted.count('CAST(') == n
+        print(f"{n:>11} {len(script) / 1e6:>6.1f} {check_s * 1000:>10.0f} {legacy_check:>10} "
+              f"{convert_s * 1000:>11.0f} {legacy_convert:>10} {legacy_casts:>13}")
+
+
+if __name__ == "__main__":
+    main()
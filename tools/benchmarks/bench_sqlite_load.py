@@ -0,0 +1,121 @@
+"""
+Benchmark for the SQLite load profiles (tools/db_manager_lib/core/sqlite_load.py).
+
+Generates a synthetic dump (see synthetic_dump.py), sanitizes it once, then
+times only the SQLite side of loading it under each profile, in two modes:
+
+    whole   one executescript for the file (ImportManager / SQLFileExtractor whole-file
+            path): pragmas and final pragmas only, indexes are built in place
+    stream  one transaction per ~1 MB of statements (load_sql_stream); profiles with
+            defer_indexes build the CREATE INDEX statements at the end. load_sql_stream
+            picks those out while reading anyway, so that is not timed
+
+Profiles with batch_inserts merge single-row INSERTs (timed, as the loaders
+do it on the fly). "default" is the behaviour before load profiles (plain
+on-disk DB). Each
+database is created where the profile puts it (--dir for the on-disk ones).
+
+    python tools/benchmarks/bench_sqlite_load.py --dialect postgres --rows 200000 --indexes 6
+"""
+import argparse
+import io
+import os
+import re
+import sys
+import time
+
+# Add project root to sys.path so 'from tools...' imports work
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tools.benchmarks.synthetic_dump import DIALECTS, DumpSpec, generate
+from tools.db_manager_lib.core.insert_batch import coalesce_inserts
+from tools.db_manager_lib.core.sanitizer import SQLSanitizer
+from tools.db_manager_lib.core.sql_stream import DEFAULT_FLUSH_SIZE, SQLStatementReader
+from tools.db_manager_lib.core.sqlite_load import (LOAD_PROFILES, ScratchDatabase, apply_load_profile,
+                                                   finish_load)
+
+MODES = ("whole", "stream")
+
+_CREATE_INDEX_RE = re.compile(r'(?is)\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b')
+
+
+def _groups(sql, flush_size, defer_indexes):
+    """
+    Statement runs of about flush_size characters as load_sql_stream executes them,
+    plus the CREATE INDEX statements it would defer. Returns (groups, indexes).
+    """
+    groups, indexes = [], []
+    group, size = [], 0
+    for stmt in SQLStatementReader(io.StringIO(sql)):
+        if defer_indexes and _CREATE_INDEX_RE.match(stmt.text):
+            indexes.append(stmt.text.strip())
+            continue
+        group.append(stmt.text)
+        size += len(stmt.text)
+        if size >= flush_size:
+            groups.append(''.join(group))
+            group, size = [], 0
+    if group:
+        groups.append(''.join(group))
+    return groups, indexes
+
+
+def load(sql, profile, mode, directory, flush_size):
+    """Loads sanitized SQL into a new database under `profile`; returns seconds."""
+    db = ScratchDatabase(profile.location, directory, size_hint=len(sql))
+    if mode == "stream":
+        groups, indexes = _groups(sql, flush_size, profile.defer_indexes)
+    else:
+        groups, indexes = [sql], []
+    try:
+        start = time.perf_counter()
+        conn = db.connect()
+        apply_load_profile(conn, profile)
+        for group in groups:
+            if profile.batch_inserts:
+                group = coalesce_inserts(group)
+            conn.executescript(f"BEGIN;\n{group}\nCOMMIT;")
+        finish_load(conn, profile, indexes)
+        conn.close()
+        return time.perf_counter() - start
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite load profile benchmark")
+    parser.add_argument('--dialect', choices=DIALECTS, default="postgres")
+    parser.add_argument('--tables', type=int, default=10)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--indexes', type=int, default=6, help="secondary indexes per table")
+    parser.add_argument('--profiles', nargs='+', choices=list(LOAD_PROFILES), default=list(LOAD_PROFILES))
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--dir', default=os.getcwd(), help="directory for the on-disk databases")
+    parser.add_argument('--flush-size', type=int, default=DEFAULT_FLUSH_SIZE)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per profile; the fastest is reported")
+    args = parser.parse_args()
+
+    spec = DumpSpec(args.dialect, args.tables, args.columns, args.rows, constraints=0, converts=0,
+                    indexes=args.indexes)
+    out = io.StringIO()
+    stats = generate(spec, out)
+    sql = SQLSanitizer.sanitize(out.getvalue(), dialect=args.dialect)
+    print(f"{args.dialect}: {stats['rows']} rows, {len(sql) / 1e6:.1f} MB sanitized, "
+          f"{len(_CREATE_INDEX_RE.findall(sql))} indexes", file=sys.stderr)
+
+    print(f"{'profile':<9} {'mode':<7} {'location':<8} {'seconds':>8} {'rows/s':>10} {'vs default':>10}")
+    for mode in args.modes:
+        baseline = None
+        for name in args.profiles:
+            profile = LOAD_PROFILES[name]
+            seconds = min(load(sql, profile, mode, args.dir, args.flush_size) for _ in range(args.repeat))
+            if name == "default":
+                baseline = seconds
+            ratio = f"{baseline / seconds:.2f}x" if baseline else "-"
+            print(f"{name:<9} {mode:<7} {profile.location:<8} {seconds:>8.3f} {stats['rows'] / seconds:>10.0f} "
+                  f"{ratio:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Sanitizer / import throughput benchmarks.
+
+Generates synthetic dumps (see synthetic_dump.py) and times the phases
+separately, each in a fresh process so peak RSS is per phase:
+
+    sanitize  SQLSanitizer.sanitize on the file contents
+    extract   SQLFileExtractor.extract (load into a temp SQLite DB + schema/sample extraction)
+    ddl       DDLExtractor.extract (parse CREATE/ALTER TABLE only, no load)
+    import    ImportManager import of the file into a new SQLite DB
+
+Results are written as JSON (one record per dialect/phase: seconds, MB/s,
+statements/s, peak RSS) so runs can be compared between releases:
+
+    python tools/benchmarks/run.py --rows 1000 -o bench.json
+    python tools/benchmarks/run.py --rows 1000 --compare bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:     # Windows: peak RSS is not reported
+    resource = None
+
+# Add project root to sys.path so 'from tools...' imports work
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(ROOT)
+
+from tools.benchmarks.synthetic_dump import DIALECTS, DumpSpec, write_dump
+
+PHASES = ("sanitize", "extract", "ddl", "import")
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak     # bytes on macOS, KB elsewhere
+
+
+def _run_sanitize(path, engine):
+    from tools.db_manager_lib.core.sanitizer import SQLSanitizer
+    with open(path, 'r', encoding='utf-8') as f:
+        script = f.read()
+    setup_rss = _peak_rss_kb()
+    start = time.perf_counter()
+    SQLSanitizer.sanitize(script, engine=engine, dialect="auto")
+    return time.perf_counter() - start, setup_rss
+
+
+def _run_extract(path, engine):
+    from ontologymirror.extractors.sql_file_extractor import SQLFileExtractor
+    setup_rss = _peak_rss_kb()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")     # SQLAlchemy reflection warnings on MySQL types
+        SQLFileExtractor(path, sanitizer_engine=engine).extract()
+    return time.perf_counter() - start, setup_rss
+
+
+def _run_ddl(path, engine):
+    from ontologymirror.extractors.ddl_extractor import DDLExtractor
+    setup_rss = _peak_rss_kb()
+    start = time.perf_counter()
+    DDLExtractor(path).extract()
+    return time.perf_counter() - start, setup_rss
+
+
+def _run_import(path, engine):
+    from tools.db_manager_lib.core.importer import ImportManager
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path = os.path.join(work_dir, "bench.db")
+        log = []
+        manager = ImportManager(work_dir, sanitizer_engine=engine)
+        setup_rss = _peak_rss_kb()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager._worker([path], "bench", db_path, "new", log.append)
+        elapsed = time.perf_counter() - start
+    if not any(line.startswith("成功匯入資料庫") for line in log):
+        raise RuntimeError(log[-1] if log else "import failed")
+    return elapsed, setup_rss
+
+
+_RUNNERS = {"sanitize": _run_sanitize, "extract": _run_extract, "ddl": _run_ddl, "import": _run_import}
+
+
+def _measure(phase, path, engine):
+    """Runs in a fresh worker process. Returns (seconds, setup RSS KB, peak RSS KB)."""
+    seconds, setup_rss = _RUNNERS[phase](path, engine)
+    return seconds, setup_rss, _peak_rss_kb()
+
+
+def run_phase(phase, path, engine, repeat):
+    """Best of `repeat` runs, each in its own process; peak RSS is the largest seen."""
+    best = None
+    peak = setup = None
+    ctx = multiprocessing.get_context("spawn")
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            seconds, setup_rss, peak_rss = pool.submit(_measure, phase, path, engine).result()
+        best = seconds if best is None else min(best, seconds)
+        if peak_rss is not None:
+            peak = max(peak or 0, peak_rss)
+            setup = max(setup or 0, setup_rss)
+    return best, setup, peak
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as dump_dir:
+        for dialect in args.dialects:
+            spec = DumpSpec(dialect, args.tables, args.columns, args.rows, args.constraints, args.converts,
+                            seed=args.seed)
+            path = os.path.join(dump_dir, f"bench_{dialect}.sql")
+            stats = write_dump(spec, path)
+            mb = stats["bytes"] / 1e6
+            for phase in args.phases:
+                record = {"dialect": dialect, "phase": phase, "engine": args.engine, "bytes": stats["bytes"],
+                          "statements": stats["statements"], "rows": stats["rows"]}
+                try:
+                    seconds, setup_rss, peak_rss = run_phase(phase, path, args.engine, args.repeat)
+                except Exception as e:
+                    record["error"] = str(e)
+                    print(f"{dialect:<9} {phase:<9} ERROR {e}", file=sys.stderr)
+                else:
+                    record.update(seconds=round(seconds, 4),
+                                  mb_per_s=round(mb / seconds, 3) if seconds else None,
+                                  statements_per_s=round(stats["statements"] / seconds, 1) if seconds else None,
+                                  setup_rss_kb=setup_rss, peak_rss_kb=peak_rss)
+                    print(f"{dialect:<9} {phase:<9} {seconds:>8.3f} s {record['mb_per_s']:>9.2f} MB/s "
+                          f"{record['statements_per_s']:>11.0f} stmt/s  peak {peak_rss or '-'} KB",
+                          file=sys.stderr)
+                results.append(record)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "spec": {"tables": args.tables, "columns": args.columns, "rows": args.rows,
+                     "constraints": args.constraints, "converts": args.converts, "seed": args.seed},
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Lists results whose MB/s dropped more than `tolerance` (a fraction) below the baseline."""
+    old = {(r["dialect"], r["phase"], r["engine"]): r for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        before = old.get((r["dialect"], r["phase"], r["engine"]))
+        if not before or not before.get("mb_per_s") or not r.get("mb_per_s"):
+            continue
+        change = r["mb_per_s"] / before["mb_per_s"] - 1
+        r["baseline_mb_per_s"] = before["mb_per_s"]
+        r["change"] = round(change, 3)
+        if change < -tolerance:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sanitizer / import throughput benchmarks")
+    parser.add_argument('--dialects', nargs='+', choices=DIALECTS, default=list(DIALECTS))
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=list(PHASES))
+    parser.add_argument('--engine', choices=("regex", "token"), default="regex")
+    parser.add_argument('--tables', type=int, default=10)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--constraints', type=int, default=40)
+    parser.add_argument('--converts', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help="runs per phase; the fastest is reported")
+    parser.add_argument('-o', '--output', help="write the JSON report here (default: stdout)")
+    parser.add_argument('--compare', help="baseline JSON report to compare MB/s against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="allowed MB/s drop against the baseline before failing (fraction)")
+    args = parser.parse_args()
+
+    report = run(args)
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['dialect']}/{r['phase']}: {r['mb_per_s']} MB/s vs "
+                  f"{r['baseline_mb_per_s']} MB/s ({r['change']:+.0%})", file=sys.stderr)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    errors = [r for r in report["results"] if "error" in r]
+    sys.exit(1 if regressions or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
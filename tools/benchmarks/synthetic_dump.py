@@ -0,0 +1,277 @@
+"""
+Synthetic SQL dump generator for the sanitizer / import benchmarks.
+
+MSSQL dumps follow the SSDT scripts in temp_uploads/ (Customers.sql, City.sql):
+bracketed [Schema].[Table] names, NVARCHAR/DATETIME2/[sys].[geography] columns,
+DEFAULT and CHECK constraints, CREATE NONCLUSTERED INDEX, sp_addextendedproperty
+and GO batches, followed by INSERT rows with N'...' literals and CONVERT calls.
+MySQL dumps follow mysqldump (backticks, ENGINE=, LOCK TABLES, multi-row INSERT)
+and Postgres dumps follow pg_dump --inserts (or plain pg_dump with COPY blocks, --copy):
+SET / set_config preamble, public.-qualified names, OWNER TO, serial sequences,
+and keys and indexes added after the data with ALTER TABLE ONLY / USING btree.
+
+    python tools/benchmarks/synthetic_dump.py --dialect tsql --tables 20 --rows 5000 -o big.sql
+"""
+import argparse
+import random
+import sys
+
+DIALECTS = ("tsql", "mysql", "postgres")
+
+# (T-SQL type, MySQL type, Postgres type, value kind)
+_COLUMN_TYPES = (
+    ("INT", "int(11)", "integer", "int"),
+    ("NVARCHAR (50)", "varchar(50)", "character varying(50)", "text"),
+    ("DECIMAL (18, 2)", "decimal(18,2)", "numeric(18,2)", "decimal"),
+    ("DATETIME2 (7)", "datetime", "timestamp without time zone", "date"),
+    ("BIT", "tinyint(1)", "boolean", "bit"),
+    ("NVARCHAR (20)", "varchar(20)", "character varying(20)", "code"),
+)
+_WORDS = ("North", "South", "Harbor", "Lake", "Ridge", "Valley", "Forest", "River", "Bay", "Hill")
+
+
+class DumpSpec:
+    """
+    Size of a synthetic dump. constraints/converts are totals spread over the tables;
+    indexes is the number of secondary indexes per table.
+    """
+
+    def __init__(self, dialect="tsql", tables=10, columns=12, rows=1000, constraints=20, converts=200,
+                 rows_per_insert=None, seed=0, indexes=1, copy=False):
+        if dialect not in DIALECTS:
+            raise ValueError(f"Unknown dialect: {dialect}")
+        self.dialect = dialect
+        self.tables = tables
+        self.columns = max(columns, 2)
+        self.rows = rows
+        self.constraints = constraints
+        self.converts = converts
+        # mysqldump packs many rows per INSERT; the others write one per statement
+        self.rows_per_insert = rows_per_insert or (50 if dialect == "mysql" else 1)
+        self.seed = seed
+        self.indexes = min(indexes, self.columns - 1)
+        # Postgres only: rows as COPY ... FROM stdin blocks (no CONVERT calls then)
+        self.copy = copy and dialect == "postgres"
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _spread(total, parts, index):
+    """Share of `total` for part `index` when split as evenly as possible."""
+    return total // parts + (1 if index < total % parts else 0)
+
+
+def _column_type(c):
+    return _COLUMN_TYPES[0] if c == 0 else _COLUMN_TYPES[1 + (c - 1) % (len(_COLUMN_TYPES) - 1)]
+
+
+def _column_names(spec, t, rnd):
+    return [f"Table{t}ID"] + [f"{rnd.choice(_WORDS)}Col{c}" for c in range(1, spec.columns)]
+
+
+def _value(kind, rnd, row, dialect, convert):
+    if kind == "int":
+        value = str(rnd.randint(0, 100000))
+        if convert:
+            return f"CONVERT(INT, '{value}')" if dialect == "tsql" else f"CAST('{value}' AS INTEGER)"
+        return value
+    if kind == "decimal":
+        return f"{rnd.randint(0, 99999)}.{rnd.randint(0, 99):02d}"
+    if kind == "date":
+        return f"'20{rnd.randint(10, 24)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 00:00:00'"
+    if kind == "bit":
+        return str(rnd.randint(0, 1)) if dialect != "postgres" else rnd.choice(("true", "false"))
+    text = f"{rnd.choice(_WORDS)} {row} O''Neil" if kind == "text" else f"{rnd.choice('FM')}{row % 1000:03d}"
+    return f"N'{text}'" if dialect == "tsql" else f"'{text}'"
+
+
+def _create_table(spec, t, names, constraints):
+    d = spec.dialect
+    lines = []
+    for c, name in enumerate(names):
+        ctype = _column_type(c)
+        if d == "tsql":
+            if c == 0:
+                lines.append(f"    [{name}] {ctype[0]} CONSTRAINT [DF_Bench_T{t}_{name}] "
+                             f"DEFAULT (NEXT VALUE FOR [Sequences].[T{t}ID]) NOT NULL")
+            else:
+                lines.append(f"    [{name}] {ctype[0]} NULL")
+        elif d == "mysql":
+            suffix = " NOT NULL AUTO_INCREMENT" if c == 0 else " DEFAULT NULL"
+            lines.append(f"  `{name}` {ctype[1]}{suffix}")
+        else:
+            lines.append(f"    {name.lower()} {ctype[2]}{' NOT NULL' if c == 0 else ''}")
+    # Column-level CHECKs, spread round-robin over the columns; half of the T-SQL ones
+    # use LIKE '[FM]%' patterns that the sanitizer has to remove
+    for k in range(constraints):
+        c = k % len(names)
+        if d == "tsql":
+            body = f"[{names[c]}] LIKE '[FM]%'" if k % 2 else f"[{names[0]}] > ({-1 - k})"
+            lines[c] += f" CONSTRAINT [CK_Bench_T{t}_{k}] CHECK ({body})"
+        elif d == "mysql":
+            lines[c] += f" CHECK (`{names[0]}` > {-1 - k})"
+        else:
+            lines[c] += f" CONSTRAINT ck_bench_t{t}_{k} CHECK ({names[0].lower()} > {-1 - k})"
+
+    indexed = names[1:1 + spec.indexes]
+    if d == "tsql":
+        lines.append(f"    CONSTRAINT [PK_Bench_T{t}] PRIMARY KEY CLUSTERED ([{names[0]}] ASC)")
+        body = ",\n".join(lines)
+        return [f"CREATE TABLE [Bench].[T{t}] (\n{body}\n);\n"] + [
+            f"CREATE NONCLUSTERED INDEX [IX_Bench_T{t}_{name}]\n    ON [Bench].[T{t}]([{name}] ASC);\n"
+            for name in indexed
+        ] + [
+            f"EXECUTE sp_addextendedproperty @name = N'Description', @value = 'Synthetic table {t}', "
+            f"@level0type = N'SCHEMA', @level0name = N'Bench', @level1type = N'TABLE', @level1name = N'T{t}';\n",
+        ]
+    if d == "mysql":
+        lines.append(f"  PRIMARY KEY (`{names[0]}`)")
+        lines.extend(f"  KEY `IX_T{t}_{name}` (`{name}`)" for name in indexed)
+        body = ",\n".join(lines)
+        return [
+            f"DROP TABLE IF EXISTS `T{t}`;\n",
+            f"/*!40101 SET @saved_cs_client     = @@character_set_client */;\n"
+            f"CREATE TABLE `T{t}` (\n{body}\n) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4;\n",
+        ]
+    body = ",\n".join(lines)
+    key = names[0].lower()
+    return [
+        f"CREATE TABLE public.t{t} (\n{body}\n);\n",
+        f"ALTER TABLE public.t{t} OWNER TO bench;\n",
+        f"CREATE SEQUENCE public.t{t}_{key}_seq\n    AS integer\n    START WITH 1\n    INCREMENT BY 1\n"
+        f"    NO MINVALUE\n    NO MAXVALUE\n    CACHE 1;\n",
+        f"ALTER SEQUENCE public.t{t}_{key}_seq OWNED BY public.t{t}.{key};\n",
+        f"ALTER TABLE ONLY public.t{t} ALTER COLUMN {key} SET DEFAULT "
+        f"nextval('public.t{t}_{key}_seq'::regclass);\n",
+    ]
+
+
+def _postgres_keys(spec, t, names):
+    """What pg_dump writes after the data of a table: sequence value, primary key, indexes."""
+    key = names[0].lower()
+    return [
+        f"SELECT pg_catalog.setval('public.t{t}_{key}_seq', {spec.rows}, true);\n",
+        f"ALTER TABLE ONLY public.t{t}\n    ADD CONSTRAINT t{t}_pkey PRIMARY KEY ({key});\n",
+    ] + [
+        f"CREATE INDEX ix_t{t}_{name.lower()} ON public.t{t} USING btree ({name.lower()});\n"
+        for name in names[1:1 + spec.indexes]
+    ]
+
+
+def _insert(spec, t, names, rows):
+    d = spec.dialect
+    if d == "tsql":
+        return f"INSERT INTO [Bench].[T{t}] ([{'], ['.join(names)}]) VALUES " + ", ".join(rows) + ";\n"
+    if d == "mysql":
+        return f"INSERT INTO `T{t}` VALUES " + ",".join(rows) + ";\n"
+    return f"INSERT INTO public.t{t} ({', '.join(n.lower() for n in names)}) VALUES " + ", ".join(rows) + ";\n"
+
+
+def _copy_text(value):
+    """A generated SQL literal as a COPY text field."""
+    return value[1:-1].replace("''", "'") if value.startswith("'") else value
+
+
+def generate(spec, out):
+    """
+    Writes a dump for `spec` to the text file object `out`.
+    Returns {"statements", "rows", "bytes"} for the generated script.
+    """
+    rnd = random.Random(spec.seed)
+    d = spec.dialect
+    stats = {"statements": 0, "rows": 0, "bytes": 0}
+
+    def emit(text, statements=1):
+        out.write(text)
+        stats["statements"] += statements
+        stats["bytes"] += len(text.encode('utf-8'))
+
+    if d == "mysql":
+        emit("-- MySQL dump 10.13  Distrib 8.0.36, for Linux (x86_64)\n--\n-- Host: localhost    Database: bench\n"
+             "/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;\n/*!40101 SET NAMES utf8mb4 */;\n", 0)
+    elif d == "postgres":
+        emit("--\n-- PostgreSQL database dump\n--\n\n-- Dumped from database version 15.4\n\n", 0)
+        for line in ("SET statement_timeout = 0;\n", "SET client_encoding = 'UTF8';\n",
+                     "SET standard_conforming_strings = on;\n",
+                     "SELECT pg_catalog.set_config('search_path', '', false);\n",
+                     "SET default_tablespace = '';\n", "SET default_table_access_method = heap;\n"):
+            emit(line)
+
+    converts_left = spec.converts
+    rows_left = spec.rows
+    for t in range(spec.tables):
+        names = _column_names(spec, t, rnd)
+        kinds = [_column_type(c)[3] for c in range(len(names))]
+        for stmt in _create_table(spec, t, names, _spread(spec.constraints, spec.tables, t)):
+            emit(stmt + ("GO\n" if d == "tsql" else ""))
+
+        table_rows = _spread(spec.rows, spec.tables, t)
+        table_converts = _spread(spec.converts, spec.tables, t)
+        if d == "mysql" and table_rows:
+            emit(f"LOCK TABLES `T{t}` WRITE;\n")
+        if spec.copy:
+            emit(f"COPY public.t{t} ({', '.join(n.lower() for n in names)}) FROM stdin;\n")
+        batch = []
+        for r in range(table_rows):
+            row_id = spec.rows - rows_left + 1
+            rows_left -= 1
+            values = [str(row_id)]
+            for c, kind in enumerate(kinds[1:], start=1):
+                # The first non-key column carries the table's share of CONVERT calls
+                if c == 1 and table_converts > 0 and converts_left > 0 and not spec.copy:
+                    values.append(_value("int", rnd, r, d, True))
+                    table_converts -= 1
+                    converts_left -= 1
+                else:
+                    values.append(_value(kind, rnd, r, d, False))
+            stats["rows"] += 1
+            if spec.copy:
+                emit("\t".join(_copy_text(v) for v in values) + "\n", 0)
+                continue
+            batch.append("(" + ", ".join(values) + ")")
+            if len(batch) == spec.rows_per_insert:
+                emit(_insert(spec, t, names, batch))
+                batch = []
+        if spec.copy:
+            emit("\\.\n\n", 0)
+        elif batch:
+            emit(_insert(spec, t, names, batch))
+        if d == "mysql" and table_rows:
+            emit("UNLOCK TABLES;\n")
+        if d == "tsql" and table_rows:
+            emit("GO\n", 0)
+        if d == "postgres":
+            for stmt in _postgres_keys(spec, t, names):
+                emit(stmt)
+    return stats
+
+
+def write_dump(spec, path):
+    """generate() into a file; returns the stats."""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        return generate(spec, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic SQL dump")
+    parser.add_argument('--dialect', choices=DIALECTS, default="tsql")
+    parser.add_argument('--tables', type=int, default=10)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--constraints', type=int, default=20)
+    parser.add_argument('--converts', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--indexes', type=int, default=1, help="secondary indexes per table")
+    parser.add_argument('--copy', action='store_true', help="postgres: rows as COPY blocks instead of INSERTs")
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args()
+    spec = DumpSpec(args.dialect, args.tables, args.columns, args.rows, args.constraints, args.converts,
+                    seed=args.seed, indexes=args.indexes, copy=args.copy)
+    stats = write_dump(spec, args.output)
+    print(f"Wrote {args.output}: {stats['statements']} statements, {stats['rows']} rows, "
+          f"{stats['bytes'] / 1e6:.1f} MB", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
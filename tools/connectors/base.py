@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from sqlalchemy import create_engine, inspect, text
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from ontologymirror.extractors.catalog import is_import_table, read_catalog
 
 class BaseConnector(ABC):
     """
@@ -9,11 +11,14 @@ class BaseConnector(ABC):
     def __init__(self, connection_string: str):
         self.connection_string = connection_string
         self.engine = None
+        self._catalog = None
+        self._catalog_read = False
 
     def connect(self):
         """Create SQLAlchemy Engine"""
         try:
             self.engine = create_engine(self.connection_string)
+            self._catalog_read = False
             # Test connection
             with self.engine.connect() as conn:
                 pass
@@ -22,16 +27,38 @@ class BaseConnector(ABC):
             raise e
 
     def get_tables(self) -> List[str]:
-        """List all tables"""
+        """List all tables (but the importer's own, see catalog.IMPORT_TABLE_PREFIX)"""
         if not self.engine:
             raise Exception("Not connected")
         inspector = inspect(self.engine)
-        return inspector.get_table_names()
+        return [t for t in inspector.get_table_names() if not is_import_table(t)]
+
+    def get_catalog(self, refresh: bool = False) -> Optional[Dict[Tuple[str, str], Dict[str, Any]]]:
+        """
+        Tables of the default schema with columns, keys, indexes and row estimates, read
+        in a few catalog queries (see catalog.read_catalog) and kept until refresh or
+        connect(). None if the dialect has no catalog queries.
+        """
+        if not self.engine:
+            raise Exception("Not connected")
+        if not self._catalog_read or refresh:
+            with self.engine.connect() as conn:
+                catalog = read_catalog(conn, [conn.dialect.default_schema_name])
+            if catalog is not None:
+                catalog = {key: entry for key, entry in catalog.items() if not is_import_table(key[1])}
+            self._catalog = catalog
+            self._catalog_read = True
+        return self._catalog
 
     def get_columns(self, table_name: str) -> List[Dict[str, Any]]:
         """Get column info"""
         if not self.engine:
             raise Exception("Not connected")
+        catalog = self.get_catalog()
+        if catalog is not None:
+            entry = catalog.get((self.engine.dialect.default_schema_name, table_name))
+            if entry is not None:
+                return [{"name": col["name"], "type": col["type"]} for col in entry["columns"]]
         inspector = inspect(self.engine)
         columns = inspector.get_columns(table_name)
         # Simplify for display
@@ -0,0 +1,249 @@
+import functools
+import itertools
+import re
+
+# Whitespace and comments before a statement's first word (as sql_stream's _LEADING)
+_LEADING = r'(?:\s|--[^\n]*(?=\n|\Z)|/\*(?:[^*]|\*(?!/))*(?:\*/|\Z))*'
+_NAME_PART = r'(?:"[^"]*(?:""[^"]*)*"|`[^`]*`|\[[^\]]*\]|[\w$]+)'
+_NAME = rf'({_NAME_PART}(?:\s*\.\s*{_NAME_PART})*)'
+_COLUMNS = rf'(?:\(\s*({_NAME_PART}(?:\s*,\s*{_NAME_PART})*)\s*\)\s*)?'
+
+# pg_dump's data blocks: "COPY name (columns) FROM stdin;" then tab-separated lines up to "\."
+_COPY_RE = re.compile(r'(?is)' + _LEADING + r'COPY\s+' + _NAME + r'\s*' + _COLUMNS
+                      + r'FROM\s+stdin\s*;[ \t\r]*(?:\n|\Z)')
+_COPY_END_RE = re.compile(r'(?m)^\\\.[ \t\r]*\n?\Z')
+_COPY_ESCAPE_RE = re.compile(r'\\(?:([0-7]{1,3})|x([0-9A-Fa-f]{1,2})|(.))', re.DOTALL)
+_COPY_ESCAPES = {'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v'}
+
+_INSERT_RE = re.compile(r'(?is)' + _LEADING + r'INSERT\s+INTO\s+' + _NAME + r'\s*' + _COLUMNS
+                        + r'VALUES\s*')
+# One token of a VALUES list: a row's '(' (with the ',' before it), a literal with the
+# ',' or ')' after it, the closing ';', or anything else (the statement is not plain rows).
+# Captured groups are never empty when they match, so findall's '' means "not this one".
+_TOKEN_TEMPLATE = r"""
+    \s*(?:
+        (,?\s*\()
+      | (?:
+            ({string})
+          | (-?\d+)(?![\w.])
+          | (-?(?:\d+\.\d*|\.\d+|\d+(?=[eE]))(?:[eE][+-]?\d+)?)(?![\w.])
+          | (NULL|TRUE|FALSE)\b
+          | 0x([0-9A-Fa-f]+)\b
+          | X'([0-9A-Fa-f]*)'
+        )\s*([,)])
+      | (;)
+      | (\S)
+    )
+"""
+_TOKEN_RE = re.compile(_TOKEN_TEMPLATE.format(string=r"'[^']*(?:''[^']*)*'"), re.VERBOSE | re.IGNORECASE)
+_TOKEN_RE_BACKSLASH = re.compile(_TOKEN_TEMPLATE.format(string=r"'[^'\\]*(?:(?:''|\\.)[^'\\]*)*'"),
+                                 re.VERBOSE | re.IGNORECASE | re.DOTALL)
+_MYSQL_ESCAPE_RE = re.compile(r"\\(.)|''", re.DOTALL)
+# What mysql makes of a backslash escape in a string (\% and \_ keep their backslash)
+_MYSQL_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a', '%': '\\%', '_': '\\_'}
+_KEYWORDS = {'NULL': None, 'TRUE': 1, 'FALSE': 0}
+# Integers beyond SQLite's 64 bits are REAL, as when SQLite parses the literal
+_MIN_INT, _MAX_INT = -(1 << 63), (1 << 63) - 1
+
+
+class BulkRows:
+    """
+    Rows of one INSERT ... VALUES or COPY data block, parsed into Python values
+    to be loaded with executemany instead of sanitized and parsed by SQLite.
+
+    table: unqualified, unquoted name (SQLite has no schemas to put it in);
+    columns: tuple of names, or None when the statement has no column list; rows: iterable
+    of tuples that can be iterated again (parsed lazily for COPY, so a large block is never
+    held as tuples at once); count: number of rows when known up front (INSERT), else None.
+    Iterating a BulkRows yields its rows up to the limit, if one was set.
+    """
+
+    __slots__ = ('table', 'columns', 'rows', 'count', 'stop')
+
+    def __init__(self, table, columns, rows, count=None):
+        self.table = table
+        self.columns = columns
+        self.rows = rows
+        self.count = count
+        self.stop = None
+
+    def __iter__(self):
+        return itertools.islice(self.rows, self.stop)
+
+    def limit(self, n):
+        """Keeps only the first n rows."""
+        n = max(n, 0)
+        self.stop = n if self.stop is None else min(self.stop, n)
+        if self.count is not None:
+            self.count = min(self.count, n)
+
+    def load(self, conn):
+        """Inserts the rows with executemany in the connection's current transaction; returns the row count."""
+        rows = iter(self)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        width = len(self.columns) if self.columns is not None else len(first)
+        columns = f" ({', '.join(_quote(c) for c in self.columns)})" if self.columns is not None else ''
+        cursor = conn.executemany(
+            f"INSERT INTO {_quote(self.table)}{columns} VALUES ({', '.join('?' * width)})",
+            itertools.chain((first,), rows),
+        )
+        return cursor.rowcount
+
+
+def load_rows(conn, bulks):
+    """
+    Loads BulkRows in order in the connection's current transaction; consecutive
+    ones into the same table and columns share one executemany (pg_dump --inserts
+    writes one row per statement). Returns the number of rows inserted.
+    """
+    count = 0
+    for (table, _), run in itertools.groupby(bulks, key=_target):
+        run = list(run)
+        if len(run) > 1:
+            run = [BulkRows(table, run[0].columns, itertools.chain.from_iterable(run))]
+        count += run[0].load(conn)
+    return count
+
+
+def _target(bulk):
+    return bulk.table, bulk.columns
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+@functools.lru_cache(maxsize=256)
+def _unquote(name):
+    """Last part of a possibly qualified name, without its quotes."""
+    last = re.split(r'\s*\.\s*(?=[^.]*$)', name)[-1].strip()
+    if len(last) > 1 and (last[0], last[-1]) in (('"', '"'), ('`', '`'), ('[', ']')):
+        inner = last[1:-1]
+        return inner.replace(last[-1] * 2, last[-1]) if last[0] != '[' else inner
+    return last
+
+
+@functools.lru_cache(maxsize=256)
+def _column_names(text):
+    """Column list of a statement as a tuple (dumps repeat the same list statement after statement)."""
+    if text is None:
+        return None
+    return tuple(_unquote(part) for part in re.findall(_NAME_PART, text))
+
+
+def parse_copy(text):
+    """
+    BulkRows of a "COPY ... FROM stdin;" statement with its data block (as
+    SQLStatementReader yields it), or None if it is not one or uses options
+    (CSV / binary formats, custom delimiters). Fields follow COPY's text format:
+    tab-separated, \\N is NULL, backslash escapes (\\t, \\n, octal, \\x..) decoded.
+    """
+    m = _COPY_RE.match(text)
+    if m is None:
+        return None
+    data = text[m.end():]
+    end = _COPY_END_RE.search(data)
+    if end is not None:
+        data = data[:end.start()]
+    return BulkRows(_unquote(m.group(1)), _column_names(m.group(2)), _CopyData(data))
+
+
+class _CopyData:
+    """The data lines of a COPY block, parsed into tuples on every iteration."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __iter__(self):
+        return _copy_rows(self.data)
+
+
+def _copy_rows(data):
+    if not data:
+        return
+    if data.endswith('\n'):
+        data = data[:-1]
+    for line in data.split('\n'):
+        if line.endswith('\r'):
+            line = line[:-1]
+        yield tuple(
+            None if field == '\\N' else _COPY_ESCAPE_RE.sub(_copy_unescape, field) if '\\' in field else field
+            for field in line.split('\t')
+        )
+
+
+def _copy_unescape(m):
+    if m.group(1) is not None:
+        return chr(int(m.group(1), 8))
+    if m.group(2) is not None:
+        return chr(int(m.group(2), 16))
+    return _COPY_ESCAPES.get(m.group(3), m.group(3))
+
+
+def parse_insert(text, backslash_escapes=False):
+    """
+    BulkRows of an INSERT ... VALUES statement whose values are all plain literals
+    (strings, numbers, NULL, TRUE / FALSE, hex), e.g. mysqldump's extended INSERTs;
+    None for anything else (expressions, casts, INSERT ... SELECT, ON DUPLICATE KEY ...),
+    which is left to the sanitizer. backslash_escapes: strings use MySQL's escapes.
+    """
+    m = _INSERT_RE.match(text)
+    if m is None:
+        return None
+    token_re = _TOKEN_RE_BACKSLASH if backslash_escapes else _TOKEN_RE
+    rows = []
+    row = None      # values of the row being read
+    for opening, string, integer, real, keyword, hex_value, x_value, separator, end, other in \
+            token_re.findall(text, m.end()):
+        if separator:
+            if row is None:
+                return None
+            if string:
+                value = string[1:-1]
+                if backslash_escapes:
+                    if '\\' in value or "''" in value:
+                        value = _MYSQL_ESCAPE_RE.sub(_mysql_unescape, value)
+                elif "''" in value:
+                    value = value.replace("''", "'")
+            elif integer:
+                value = int(integer)
+                if not _MIN_INT <= value <= _MAX_INT:
+                    value = float(value)
+            elif real:
+                value = float(real)
+            elif keyword:
+                value = _KEYWORDS[keyword.upper()]
+            elif hex_value:
+                # MySQL reads an odd number of digits as if left-padded with a 0 (0xABC = 0x0ABC)
+                value = bytes.fromhex(hex_value.zfill(len(hex_value) + len(hex_value) % 2))
+            elif len(x_value) % 2:
+                return None     # X'ABC' is an error in SQLite too; left to it to report
+            else:
+                value = bytes.fromhex(x_value)
+            row.append(value)
+            if separator == ')':
+                rows.append(tuple(row))
+                row = None
+        elif opening:
+            # Rows are separated by ',' and only by ','
+            if row is not None or (opening[0] == ',') != bool(rows):
+                return None
+            row = []
+        elif end and row is None and rows:
+            break
+        else:
+            return None
+    if row is not None or not rows:
+        return None
+    return BulkRows(_unquote(m.group(1)), _column_names(m.group(2)), rows, len(rows))
+
+
+def _mysql_unescape(m):
+    c = m.group(1)
+    if c is None:
+        return "'"
+    return _MYSQL_ESCAPES.get(c, c)
@@ -0,0 +1,72 @@
+import re
+
+# Characters read from the head of a file to guess its dialect
+SAMPLE_SIZE = 64 * 1024
+
+# Dialects the detector can report; None means "no clear winner" (all rule families run)
+DIALECTS = ("tsql", "mysql", "postgres")
+
+# (weight, pattern) per dialect; a marker counts at most _MAX_HITS times
+_MARKERS = {
+    "tsql": (
+        (3, re.compile(r'(?im)^\s*GO\s*;?\s*$')),
+        (3, re.compile(r'(?i)\bSET\s+(?:ANSI_NULLS|QUOTED_IDENTIFIER|IDENTITY_INSERT|NOCOUNT)\b')),
+        (2, re.compile(r'(?i)\[dbo\]\.')),
+        (1, re.compile(r'(?i)\b(?:NVARCHAR|UNIQUEIDENTIFIER|DATETIME2|NONCLUSTERED|CLUSTERED)\b')),
+        (1, re.compile(r'(?i)\bIDENTITY\s*\(')),
+        (1, re.compile(r"(?<![\w'])N'")),
+    ),
+    "mysql": (
+        (5, re.compile(r'(?im)^--\s*(?:MySQL|MariaDB) dump')),
+        (3, re.compile(r'(?i)\bENGINE\s*=')),
+        (3, re.compile(r'/\*!\d{5}')),
+        (2, re.compile(r'(?i)\b(?:UN)?LOCK\s+TABLES\b')),
+        (1, re.compile(r'(?i)\bAUTO_INCREMENT\b')),
+        (1, re.compile(r'`\w+`')),
+    ),
+    "postgres": (
+        (5, re.compile(r'(?im)^--\s*PostgreSQL database dump')),
+        (3, re.compile(r'(?i)\bSET\s+search_path\b')),
+        (3, re.compile(r'(?i)\bCOPY\s+[^;\n]+\bFROM\s+stdin\b')),
+        (2, re.compile(r'(?i)\bpg_catalog\.')),
+        (2, re.compile(r'(?i)\bOWNER\s+TO\b')),
+        (1, re.compile(r'::\w+')),
+        (1, re.compile(r'(?i)\b(?:BIG)?SERIAL\b')),
+    ),
+}
+_MAX_HITS = 5
+
+
+def dialect_scores(text):
+    """Marker score per dialect for a piece of SQL (usually the head of a file)."""
+    scores = {}
+    for dialect, markers in _MARKERS.items():
+        score = 0
+        for weight, pattern in markers:
+            hits = 0
+            for _ in pattern.finditer(text):
+                hits += 1
+                if hits == _MAX_HITS:
+                    break
+            score += weight * hits
+        scores[dialect] = score
+    return scores
+
+
+def detect_dialect(text, sample_size=SAMPLE_SIZE):
+    """
+    Guesses the dialect of a dump from its first `sample_size` characters:
+    "tsql", "mysql", "postgres", or None when no dialect clearly wins.
+    """
+    scores = dialect_scores(text[:sample_size])
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    best, best_score = ranked[0]
+    if best_score == 0 or best_score == ranked[1][1]:
+        return None
+    return best
+
+
+def sniff_dialect(path, encoding='utf-8', sample_size=SAMPLE_SIZE):
+    """detect_dialect() on the head of a file; only `sample_size` characters are read."""
+    with open(path, 'r', encoding=encoding, errors='replace') as f:
+        return detect_dialect(f.read(sample_size), sample_size)
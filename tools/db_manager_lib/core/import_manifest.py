@@ -0,0 +1,68 @@
+import hashlib
+import os
+import time
+
+# Table in the imported database that records what was loaded from where
+# (named with catalog.IMPORT_TABLE_PREFIX, so listings leave it out)
+MANIFEST_TABLE = "_import_manifest"
+HASH_CHUNK_SIZE = 1 << 20
+
+LOADED = "loaded"
+FAILED = "failed"       # nothing of the file was committed
+PARTIAL = "partial"     # failed after committing part of the file (see checkpoint)
+
+
+def file_digest(path, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 hex digest of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return digest.hexdigest()
+            digest.update(chunk)
+
+
+class ImportManifest:
+    """
+    Per-file record of the imports into a database, kept in the database itself
+    (MANIFEST_TABLE) so a re-run can tell which files are already loaded.
+
+    One row per source file (by absolute path): content hash, size, statements,
+    load duration, status (LOADED / FAILED / PARTIAL) and the error of the last
+    attempt. checkpoint is the character offset up to which a streamed file is
+    committed; a PARTIAL file with an unchanged hash resumes from there.
+    Writes go through the import's own connection and are not committed here,
+    so they land in the same transaction as the data they describe.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} ("
+            " path TEXT PRIMARY KEY, name TEXT NOT NULL, sha256 TEXT NOT NULL, size INTEGER NOT NULL,"
+            " status TEXT NOT NULL, statements INTEGER, duration REAL, checkpoint INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT, updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def entry(self, path):
+        """The manifest row of a file as a dict, or None."""
+        cursor = self.conn.execute(f"SELECT * FROM {MANIFEST_TABLE} WHERE path = ?", (os.path.abspath(path),))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip((d[0] for d in cursor.description), row))
+
+    def record(self, path, sha256, size, status, statements=None, duration=None, checkpoint=0, error=None):
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {MANIFEST_TABLE} "
+            "(path, name, sha256, size, status, statements, duration, checkpoint, error, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(path), os.path.basename(path), sha256, size, status, statements, duration, checkpoint,
+             error, time.time()),
+        )
+
+    def checkpoint(self, path, sha256, size, offset, statements):
+        """Marks a streamed file as committed up to `offset` characters (PARTIAL until it completes)."""
+        self.record(path, sha256, size, PARTIAL, statements=statements, checkpoint=offset)
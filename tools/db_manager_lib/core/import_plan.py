@@ -0,0 +1,214 @@
+import heapq
+import re
+
+from .sql_stream import SQLStatementReader, detect_encoding, _INSERT_HEAD_RE, _LEADING, _NAME_PART
+from .dialect import sniff_dialect
+from .sanitizer_tsql import TSQLSanitizerRules
+
+# First words of statements that may run before all data, wherever they appear in the dump
+_ANYWHERE = frozenset((
+    'CREATE', 'SET', 'USE', 'LOCK', 'UNLOCK', 'GRANT', 'REVOKE', 'COMMENT', 'PRAGMA', 'SELECT', 'PRINT',
+    'BEGIN', 'COMMIT', 'ROLLBACK', 'START', 'END', 'SAVE', 'GO',
+))
+# First words of statements that may run before all data if no data comes before them,
+# unless they only touch constraints and the like (see _RESHAPING_RE)
+_BEFORE_DATA = frozenset(('ALTER', 'DROP'))
+
+_FIRST_WORD_RE = re.compile(_LEADING + r'([A-Za-z_]+)')
+_NAME = rf'({_NAME_PART}(?:\s*\.\s*{_NAME_PART})*)'
+_CREATE_TABLE_RE = re.compile(
+    r'(?is)' + _LEADING + r'CREATE\s+(?:(?:GLOBAL|LOCAL)\s+)?(?:(?:TEMPORARY|TEMP|UNLOGGED)\s+)?TABLE\s+'
+    r'(?:IF\s+NOT\s+EXISTS\s+)?' + _NAME
+)
+_DROP_TABLE_RE = re.compile(r'(?is)' + _LEADING + r'DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?' + _NAME)
+_ALTER_TABLE_RE = re.compile(r'(?is)' + _LEADING + r'ALTER\s+TABLE\s+(?:ONLY\s+)?(?:IF\s+EXISTS\s+)?' + _NAME)
+# What follows an INSERT's table name: only VALUES rows can be loaded apart from the rest
+# (not INSERT ... SELECT / EXEC / DEFAULT VALUES)
+_VALUES_RE = re.compile(r'(?is)\s*(?:\([^()]*\)\s*)?VALUES?\b')
+_REFERENCES_RE = re.compile(r'(?i)\bREFERENCES\s+' + _NAME)
+# ALTER / DROP that change a table's columns or drop it; constraint, owner, sequence and
+# default changes only touch the schema and may run before the data like the rest of the DDL
+_RESHAPING_RE = re.compile(
+    r'(?is)' + _LEADING + r'(?:DROP\b|ALTER\b.*?(?:\bADD\s+(?!CONSTRAINT\b|PRIMARY\b|FOREIGN\b|UNIQUE\b|CHECK\b'
+    r'|INDEX\b|KEY\b|DEFAULT\b)|\bDROP\s+(?!CONSTRAINT\b|INDEX\b|KEY\b|DEFAULT\b|PRIMARY\b|FOREIGN\b)|\bRENAME\b))'
+)
+# Statements that read or react to table contents, so they must run where they are in the dump
+_ORDERED_CREATE_RE = re.compile(r'(?is)' + _LEADING + r'CREATE\s+(?:OR\s+REPLACE\s+)?(?:\w+\s+)*?(?:TRIGGER\b|'
+                                r'TABLE\b[^(;]*?\bAS\s+SELECT\b)')
+
+
+def table_key(name):
+    """Unqualified, unquoted, lower-cased table name, as RowSampler.table_of returns it."""
+    last = re.split(r'\s*\.\s*', name)[-1]
+    return last.strip('[]"`').lower()
+
+
+class FileScan:
+    """What one dump file creates, references and inserts into (see scan_file)."""
+
+    def __init__(self, path, dialect):
+        self.path = path
+        self.dialect = dialect
+        self.creates = []           # tables, in order
+        self.references = set()     # tables referenced by FOREIGN KEYs of the tables it creates or alters
+        self.inserts = {}           # table -> INSERT statements
+        self.ordered = None         # why its statements cannot be split into DDL and per-table data, or None
+        self.alters = False         # has ALTER / DROP statements that reshape or drop tables
+        self.alters_after_data = False
+        self.drops = set()          # tables dropped before this file creates or fills them (mysqldump)
+
+
+def scan_file(path, dialect="auto"):
+    """
+    Reads a dump without sanitizing or executing it: tables created, FOREIGN KEY
+    references and INSERT statements per table. INSERTs are passed over on their
+    head (one regex pass, as with RowSampler); the rest is only split into statements.
+    dialect: as for the sanitizer ("auto" sniffs it from the file head, None = all rules).
+    """
+    encoding = detect_encoding(path)
+    if dialect == "auto":
+        dialect = sniff_dialect(path, encoding)
+    scan = FileScan(path, dialect)
+
+    def skip(head):
+        m = _INSERT_HEAD_RE.match(head)
+        if m is None or not _VALUES_RE.match(head, m.end()):
+            scan.ordered = scan.ordered or "INSERT ... SELECT or an INSERT without a table name"
+        else:
+            table = table_key(m.group(1))
+            scan.inserts[table] = scan.inserts.get(table, 0) + 1
+        return True
+
+    # The T-SQL rules drop whole statements (IF, EXEC, ALTER TABLE ...); those never run anywhere
+    tsql_rules = dialect in ("tsql", None)
+    with open(path, 'r', encoding=encoding) as f:
+        # Split as load_sql_stream splits it, so the plan sees the statements the loader will
+        for stmt in SQLStatementReader(f, backslash_escapes=dialect == "mysql", skip=skip):
+            if tsql_rules and TSQLSanitizerRules.should_skip_batch(stmt.text):
+                continue
+            m = _FIRST_WORD_RE.match(stmt.text)
+            word = m.group(1).upper() if m else ''
+            m = _CREATE_TABLE_RE.match(stmt.text) or _ALTER_TABLE_RE.match(stmt.text)
+            if m is not None:
+                if word == 'CREATE':
+                    scan.creates.append(table_key(m.group(1)))
+                scan.references.update(table_key(r) for r in _REFERENCES_RE.findall(stmt.text))
+            if scan.ordered is not None:
+                continue
+            if word == 'INSERT':
+                scan.ordered = "an INSERT the reader could not pass over on its head"
+            elif word == 'CREATE' and _ORDERED_CREATE_RE.match(stmt.text):
+                scan.ordered = "CREATE TRIGGER / CREATE TABLE ... AS SELECT"
+            elif word in _BEFORE_DATA:
+                if not _RESHAPING_RE.match(stmt.text):
+                    continue
+                m = _DROP_TABLE_RE.match(stmt.text)
+                if m is not None and table_key(m.group(1)) not in scan.creates + list(scan.inserts):
+                    scan.drops.add(table_key(m.group(1)))
+                    continue
+                scan.alters = True
+                scan.alters_after_data = scan.alters_after_data or bool(scan.inserts)
+            elif word and word not in _ANYWHERE:
+                scan.ordered = f"{word} statements"
+    scan.references.difference_update(scan.creates)
+    return scan
+
+
+class ImportPlan:
+    """
+    Load order of a set of dump files and, when the data can be split by table,
+    an assignment of tables to shards.
+
+    files: the files, schema first: a file comes after the files creating the tables
+    it references (FOREIGN KEY) or inserts into; otherwise the given order is kept.
+    scans: FileScan per file. shardable: every file is DDL plus plain INSERTs, so all
+    non-INSERT statements can run first and each table's rows can be loaded on their
+    own; reason says why not otherwise. shards: lists of tables, balanced by INSERT count.
+    """
+
+    def __init__(self, files, scans, shardable, reason=None):
+        self.files = files
+        self.scans = scans
+        self.shardable = shardable
+        self.reason = reason
+        self.shards = []
+
+    def data_tables(self):
+        """INSERT statements per table over all files."""
+        counts = {}
+        for scan in self.scans.values():
+            for table, n in scan.inserts.items():
+                counts[table] = counts.get(table, 0) + n
+        return counts
+
+    def split(self, shards):
+        """Assigns the tables with data to at most `shards` shards (largest first, to the lightest shard)."""
+        tables = sorted(self.data_tables().items(), key=lambda item: (-item[1], item[0]))
+        loads = [(0, i, []) for i in range(min(shards, len(tables)))]
+        heapq.heapify(loads)
+        for table, n in tables:
+            load, i, members = heapq.heappop(loads)
+            members.append(table)
+            heapq.heappush(loads, (load + n, i, members))
+        self.shards = [members for _, _, members in sorted(loads, key=lambda item: item[1])]
+        return self.shards
+
+
+def plan_import(files, dialect="auto"):
+    """
+    Scans the files (see scan_file) and orders them schema first; returns an ImportPlan.
+    dialect: as for scan_file, for every file.
+    """
+    scans = {path: scan_file(path, dialect) for path in files}
+    position = {path: i for i, path in enumerate(files)}
+    creator = {}
+    for path in files:
+        for table in scans[path].creates:
+            creator.setdefault(table, path)
+
+    # A file depends on the files creating the tables it references or inserts into
+    needs = {path: set() for path in files}
+    for path in files:
+        scan = scans[path]
+        for table in scan.references | set(scan.inserts):
+            other = creator.get(table)
+            if other is not None and other != path:
+                needs[path].add(other)
+    users = {path: [] for path in files}
+    for path, deps in needs.items():
+        for dep in deps:
+            users[dep].append(path)
+
+    # Kahn's algorithm, the earliest given file first; on a cycle the earliest waiting file goes
+    waiting = {path: len(deps) for path, deps in needs.items()}
+    ready = [position[p] for p in files if not waiting[p]]
+    heapq.heapify(ready)
+    ordered, done = [], set()
+    while len(ordered) < len(files):
+        if not ready:
+            ready = [min(position[p] for p in files if p not in done)]
+        path = files[heapq.heappop(ready)]
+        if path in done:
+            continue
+        ordered.append(path)
+        done.add(path)
+        for user in users[path]:
+            waiting[user] -= 1
+            if not waiting[user] and user not in done:
+                heapq.heappush(ready, position[user])
+
+    reason = None
+    data_seen = False
+    tables_seen = set()
+    for path in ordered:
+        scan = scans[path]
+        if scan.ordered is not None:
+            reason = f"{path}: {scan.ordered}"
+        elif scan.alters_after_data or (data_seen and scan.alters) or scan.drops & tables_seen:
+            reason = f"{path}: ALTER / DROP after data"
+        if reason is not None:
+            break
+        data_seen = data_seen or bool(scan.inserts)
+        tables_seen.update(scan.creates, scan.inserts)
+    return ImportPlan(ordered, scans, reason is None, reason)
+
@@ -1,74 +1,658 @@
+import gzip
 import os
 import sqlite3
 import re
 import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tools.db_manager_lib.core.sanitizer import SQLSanitizer
+from tools.db_manager_lib.core.sanitizer_rules import RuleProfile
+from tools.db_manager_lib.core.sanitizer_cache import SanitizeCache
+from tools.db_manager_lib.core.sql_stream import BULK_DIALECTS, RowSampler, load_sql_stream
+from tools.db_manager_lib.core.insert_batch import coalesce_inserts, count_statements
+from tools.db_manager_lib.core.import_manifest import FAILED, LOADED, PARTIAL, ImportManifest, file_digest
+from tools.db_manager_lib.core.import_plan import plan_import
+from tools.db_manager_lib.core.quarantine import QUARANTINE_TABLE, ImportQuarantine, describe
+from tools.db_manager_lib.core.sqlite_load import ScratchDatabase, apply_load_profile, finish_load, get_load_profile
+from tools.db_manager_lib.core.dialect import detect_dialect, sniff_dialect
+from ontologymirror.core.progress import INDEX, LOAD, MERGE, READ, SKIP, ProgressReporter
+from ontologymirror.extractors.catalog import is_import_table
+
+# gzip level of the debug dumps: fast, they are only read when something went wrong
+DEBUG_DUMP_LEVEL = 1
+
+# Transaction control in a sanitized script; such a file cannot run inside one transaction of ours
+_TXN_CONTROL_RE = re.compile(
+    r'(?im)^\s*(?:BEGIN(?:\s+(?:DEFERRED|IMMEDIATE|EXCLUSIVE))?(?:\s+TRAN(?:SACTION)?)?\s*;'
+    r'|COMMIT\b|ROLLBACK\b|END\s+TRAN(?:SACTION)?\b|START\s+TRANSACTION\b|SAVEPOINT\b|RELEASE\b)'
+)
+
+
+class PreparedFile:
+    """A whole-file import read and sanitized ahead of execution (see prepare_file)."""
+
+    def __init__(self, sql_script, dialect, statements=None, profile=None, cache_stats=None):
+        self.sql_script = sql_script
+        self.dialect = dialect
+        self.statements = statements
+        self.profile = profile
+        self.cache_stats = cache_stats
+
+
+def prepare_file(sql_file, engine="regex", dialect="auto", profiling=False, workers=None, cache=None,
+                 debug_path=None, batch_inserts=False):
+    """
+    Reads and sanitizes one file for a whole-file import; runs in an ImportManager
+    pipeline worker process or inline. cache is a SanitizeCache or, in a worker, the
+    path of one (opened and closed here). The sanitized SQL goes to debug_path
+    (gzip) when given, before batch_inserts merges its INSERTs. Returns a PreparedFile.
+    """
+    try:
+        with open(sql_file, 'r', encoding='utf-8') as f: sql_script = f.read()
+    except UnicodeDecodeError:
+        with open(sql_file, 'r', encoding='latin-1') as f: sql_script = f.read()
+
+    if dialect == "auto":
+        dialect = detect_dialect(sql_script)
+    profile = RuleProfile() if profiling else None
+    own_cache = isinstance(cache, str)
+    if own_cache:
+        cache = SanitizeCache(cache)
+    try:
+        sql_script = SQLSanitizer.sanitize(sql_script, engine=engine, profile=profile, workers=workers,
+                                           cache=cache, dialect=dialect)
+        cache_stats = cache.stats() if own_cache else None
+    finally:
+        if own_cache:
+            cache.close()
+
+    if debug_path:
+        try:
+            with gzip.open(debug_path, 'wt', encoding='utf-8', compresslevel=DEBUG_DUMP_LEVEL) as f:
+                f.write(sql_script)
+        except OSError:
+            pass
+    statements = count_statements(sql_script)
+    if batch_inserts:
+        sql_script = coalesce_inserts(sql_script)
+    return PreparedFile(sql_script, dialect, statements, profile, cache_stats)
+
+
+def _quote_name(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def load_shard(db_path, files, tables, engine="regex", batch_inserts=True):
+    """
+    Loads one shard of a sharded import (see ImportManager._load_sharded); runs in a
+    worker process. files are (path, dialect) pairs in load order: their DDL runs in
+    full, but of the INSERTs only those into `tables` (names as RowSampler.table_of
+    gives them). CREATE INDEX statements are not run in the scratch database at
+    db_path but returned. Returns (statements loaded, sanitized CREATE INDEX statements).
+    """
+    tables = frozenset(tables)
+    indexes = []
+    conn = sqlite3.connect(db_path)
+    try:
+        apply_load_profile(conn, "scratch")
+        conn.create_function("REGEXP", 2, lambda x, y: 1 if re.search(x, y) else 0)
+        count = 0
+        for sql_file, dialect in files:
+            count += load_sql_stream(conn, sql_file, engine=engine, dialect=dialect, deferred_indexes=indexes,
+                                     batch_inserts=batch_inserts,
+                                     skip=lambda head: RowSampler.table_of(head) not in tables)
+        return count, indexes
+    finally:
+        conn.close()
+
 
 class ImportManager:
-    def __init__(self, current_dir):
+    # Files at least this large are streamed statement by statement when streaming=None;
+    # so are MySQL and PostgreSQL dumps of any size, whose rows the stream loads natively
+    STREAMING_THRESHOLD = 64 * 1024 * 1024
+    # Default size of the sanitize pipeline's process pool, and of the sharded load's
+    PIPELINE_WORKERS = 4
+    # Imports at least this large (all files together) are sharded when the plan allows it
+    SHARD_THRESHOLD = 32 * 1024 * 1024
+    # Most shards of a sharded load: the merge ATTACHes them all at once, and SQLite allows
+    # 10 attached databases by default (SQLITE_MAX_ATTACHED)
+    MAX_SHARDS = 10
+    # Skipped statements listed in the log per file with recover=True (all are in QUARANTINE_TABLE)
+    QUARANTINE_LOG_LINES = 20
+
+    def __init__(self, current_dir, sanitizer_engine="regex", streaming=None, profile_rules=False, sanitize_workers=None,
+                 sanitize_cache=None, dialect="auto", load_profile="bulk", pipeline_workers=None, debug_dump=False,
+                 resume=True, plan=True, shard_workers=None, recover=False):
         self.current_dir = current_dir
+        # "regex" or "token" (see SQLSanitizer.ENGINES)
+        self.sanitizer_engine = sanitizer_engine
+        # True / False, or None to decide per file by size and dialect
+        self.streaming = streaming
+        # Record per-rule sanitizer timing; reports land in self.profiles and the log callback
+        self.profile_rules = profile_rules
+        self.profiles = {}
+        # Process pool size for the regex chain on whole-file imports run one at a time (None = serial)
+        self.sanitize_workers = sanitize_workers
+        # Path of an on-disk SanitizeCache; re-imports only sanitize changed statements (None = off)
+        self.sanitize_cache = sanitize_cache
+        # "auto" detects each file's dialect and applies only its rule families; None applies all
+        self.dialect = dialect
+        self.dialects = {}
+        # SQLite load profile (see sqlite_load.LOAD_PROFILES): "bulk" loads without fsync, merges
+        # single-row INSERTs, defers indexes of streamed files to the end of the import and leaves
+        # the DB in WAL; "default" keeps SQLite's own settings and executes statements as written
+        self.load_profile = get_load_profile(load_profile)
+        # Worker processes that read and sanitize the next whole-file imports while the current
+        # one executes; at most this many files are held sanitized ahead. None = min(cpu count,
+        # PIPELINE_WORKERS); 0 or 1 = one file at a time
+        self.pipeline_workers = pipeline_workers
+        # Write the sanitized SQL of every file to data/debug_<n>_<file>.sql.gz
+        self.debug_dump = debug_dump
+        # Skip files the target DB's manifest (see import_manifest) lists as loaded with the same
+        # content and resume partly loaded streamed files; False loads every file again
+        self.resume = resume
+        # Order the files schema first (see import_plan): a file is loaded after the files creating
+        # the tables it references or inserts into; False keeps the given order
+        self.plan = plan
+        # Worker processes of a sharded load: when the plan shows plain DDL + INSERT dumps of at least
+        # SHARD_THRESHOLD bytes, each loads its share of the tables into a scratch DB and the target
+        # merges them. None = min(cpu count, PIPELINE_WORKERS); 0 or 1 = never shard; at most MAX_SHARDS
+        self.shard_workers = shard_workers
+        # Skip statements that fail instead of failing the file: a failing group of a streamed file is
+        # bisected down to them (see quarantine), whole files and sharded loads that fail are streamed
+        # again that way. What was skipped is logged and kept in the target's QUARANTINE_TABLE
+        self.recover = recover
 
-    def run_import_thread(self, sorted_files, conn_name, db_path, mode, callback_log=None):
+    def run_import_thread(self, sorted_files, conn_name, db_path, mode, callback_log=None, on_progress=None):
         """
         Runs the import process in a background thread.
         callback_log: function(msg) to print status back to main thread/UI.
+        on_progress: function(ProgressEvent), called from the import thread a few times per
+        second at most (see progress.ProgressReporter); bytes are those of the files to load.
         """
-        threading.Thread(target=self._worker, args=(sorted_files, conn_name, db_path, mode, callback_log), daemon=True).start()
+        threading.Thread(target=self._worker, args=(sorted_files, conn_name, db_path, mode, callback_log, on_progress),
+                         daemon=True).start()
 
-    def _worker(self, sorted_files, conn_name, db_path, mode, callback_log):
+    def _worker(self, sorted_files, conn_name, db_path, mode, callback_log, on_progress=None):
+        pool = None
+        reporter = ProgressReporter(on_progress, "import")
         try:
             conn = sqlite3.connect(db_path)
             conn.execute("PRAGMA foreign_keys = OFF;")
-            
+            apply_load_profile(conn, self.load_profile)
+            deferred_indexes = [] if self.load_profile.defer_indexes else None
+
             # Custom REGEXP for compatibility
             conn.create_function("REGEXP", 2, lambda x, y: 1 if re.search(x, y) else 0)
-            
-            cursor = conn.cursor()
+
             total_files = len(sorted_files)
-            
+            cache = SanitizeCache(self.sanitize_cache) if self.sanitize_cache else None
+
+            # Files the manifest lists as loaded with the same content are skipped on re-runs
+            manifest = ImportManifest(conn)
+            sources = {}    # file index -> (sha256, size, manifest entry) of the files to load
             for idx, sql_file in enumerate(sorted_files):
+                digest, size = file_digest(sql_file), os.path.getsize(sql_file)
+                entry = manifest.entry(sql_file) if self.resume else None
+                if entry is not None and entry["status"] == LOADED and entry["sha256"] == digest:
+                    continue
+                sources[idx] = (digest, size, entry)
+            reporter.total = sum(size for _, size, _ in sources.values())
+            done = items = 0     # bytes and statements of the files loaded so far
+
+            # Schema first (see import_plan); a large import of plain DDL + INSERT dumps is sharded
+            order = list(range(total_files))
+            shards = self._shard_count(conn, sources, reporter.total)
+            if sources and (shards or (self.plan and len(sources) > 1)):
+                given = [sorted_files[idx] for idx in sources]
+                import_plan = plan_import(given, self.dialect)
+                position = {sql_file: idx for idx, sql_file in enumerate(sorted_files)}
+                order = [idx for idx in order if idx not in sources] + [position[f] for f in import_plan.files]
+                if import_plan.files != given and callback_log:
+                    names = ", ".join(os.path.basename(f) for f in import_plan.files)
+                    callback_log(f"Load order (schema first): {names}")
+                if shards and len(import_plan.data_tables()) > 1:
+                    if not import_plan.shardable:
+                        if callback_log:
+                            callback_log(f"Loading file by file: {import_plan.reason}")
+                    elif self._load_sharded(conn, import_plan, shards, db_path, manifest,
+                                            {sorted_files[idx]: sources[idx] for idx in sources},
+                                            deferred_indexes, reporter, callback_log):
+                        order = [idx for idx in order if idx not in sources]
+                    elif self.recover:
+                        # Nothing was committed; load file by file, skipping what fails
+                        if callback_log:
+                            callback_log("Loading file by file to isolate the failing statements")
+                        sources = {idx: (digest, size, None) for idx, (digest, size, _) in sources.items()}
+                    else:
+                        reporter.finish(ok=False)
+                        return
+
+            # Whole-file imports are read and sanitized ahead on a process pool; this thread
+            # is the only SQLite writer and executes them in order
+            whole_files = [idx for idx in order if idx in sources and not self._is_streamed(sorted_files[idx])]
+            workers = self._pipeline_size(len(whole_files))
+            if workers > 1:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            upcoming = iter(whole_files)
+            pending = {}    # file index -> Future[PreparedFile], at most `workers` of them
+
+            def fill_pipeline():
+                while pool is not None and len(pending) < workers:
+                    next_idx = next(upcoming, None)
+                    if next_idx is None:
+                        return
+                    pending[next_idx] = pool.submit(prepare_file, *self._prepare_args(sorted_files[next_idx],
+                                                                                      next_idx, self.sanitize_cache))
+
+            for n, idx in enumerate(order):
+                sql_file = sorted_files[idx]
+                if idx not in sources:
+                    reporter.phase(SKIP, sql_file)
+                    if callback_log:
+                        callback_log(f"Skipping {n+1}/{total_files}: {sql_file} (already loaded, unchanged)")
+                    continue
                 if callback_log:
-                    callback_log(f"Processing {idx+1}/{total_files}: {sql_file}")
-                
-                # Read SQL
-                try:
-                    with open(sql_file, 'r', encoding='utf-8') as f: sql_script = f.read()
-                except UnicodeDecodeError:
-                    with open(sql_file, 'r', encoding='latin-1') as f: sql_script = f.read()
-                
-                # Sanitize
-                sql_script = SQLSanitizer.sanitize(sql_script)
-
-                # DEBUG: Write sanitized file
-                debug_name = f"debug_{idx}_{os.path.basename(sql_file)}.sql"
-                debug_dump_path = os.path.join(self.current_dir, "..", "data", debug_name)
-                try:
-                    with open(debug_dump_path, 'w', encoding='utf-8') as f:
-                        f.write(sql_script)
-                except: pass
-
-                # Execute
-                try:
-                    cursor.execute("BEGIN TRANSACTION")
-                    cursor.executescript(sql_script)
-                    conn.commit()
-                except Exception as e:
-                    conn.rollback()
-                    err_msg = f"Error executing {sql_file}: {e}"
-                    print(err_msg)
+                    callback_log(f"Processing {n+1}/{total_files}: {sql_file}")
+                fill_pipeline()
+
+                if self._is_streamed(sql_file):
+                    profile = RuleProfile() if self.profile_rules else None
+                    dialect = self._resolve_dialect(sql_file, None, callback_log)
+                    reporter.phase(LOAD, sql_file)
+                    count = self._stream_file(conn, idx, sql_file, callback_log, profile, cache, dialect,
+                                              deferred_indexes, manifest, sources[idx], reporter, done, items)
+                    self._report_profile(sql_file, profile, callback_log)
+                    self._report_cache(cache, callback_log)
+                    if count is None:
+                        # Files already loaded are skipped on the next run, so their indexes are built now
+                        self._finish_load(conn, deferred_indexes, callback_log, reporter)
+                        reporter.finish(ok=False)
+                        return
+                    done, items = done + sources[idx][1], items + count
+                    reporter.update(done, items)
+                    continue
+
+                # Read and sanitize (in a pipeline worker when there is one)
+                reporter.phase(READ, sql_file)
+                started = time.perf_counter()
+                if idx in pending:
+                    prepared = pending.pop(idx).result()
+                    fill_pipeline()
+                    self._report_cache_stats(prepared.cache_stats, callback_log)
+                else:
+                    prepared = prepare_file(*self._prepare_args(sql_file, idx, cache, self.sanitize_workers))
+                    self._report_cache(cache, callback_log)
+                self._note_dialect(sql_file, prepared.dialect, callback_log)
+                self._report_profile(sql_file, prepared.profile, callback_log)
+
+                reporter.phase(LOAD, sql_file)
+                loaded = self._execute_file(conn, sql_file, prepared, manifest, sources[idx], started, callback_log,
+                                            reporter)
+                statements = prepared.statements
+                if loaded is None and self.recover:
+                    # The file was rolled back whole; stream it again, skipping what fails
                     if callback_log:
-                        # Translate common errors
-                        if "near" in str(e):
-                            err_msg += f"\n在處理檔案 '{os.path.basename(sql_file)}' 時發生錯誤:\n{e}\n\n除錯檔案已儲存至 data/ 目錄。"
-                        elif "duplicate column" in str(e):
-                            err_msg += f"\n在處理檔案 '{os.path.basename(sql_file)}' 時發生錯誤:\n{e}\n\n除錯檔案已儲存至 data/ 目錄。"
-                        callback_log(err_msg)
-                    return 
+                        callback_log(f"Streaming {os.path.basename(sql_file)} to isolate the failing statements")
+                    digest, size, _ = sources[idx]
+                    statements = self._stream_file(conn, idx, sql_file, callback_log, None, cache, prepared.dialect,
+                                                   deferred_indexes, manifest, (digest, size, None), reporter, done,
+                                                   items)
+                    loaded = statements is not None
+                if not loaded:
+                    self._finish_load(conn, deferred_indexes, callback_log, reporter)
+                    reporter.finish(ok=False)
+                    return
+                done, items = done + sources[idx][1], items + statements
+                reporter.update(done, items)
 
+            if not self._finish_load(conn, deferred_indexes, callback_log, reporter):
+                reporter.finish(ok=False)
+                return
             conn.close()
+            if cache:
+                cache.close()
+            reporter.finish(message=f"成功匯入資料庫: {conn_name}")
             if callback_log:
                 callback_log(f"成功匯入資料庫: {conn_name}")
-                
+
         except Exception as e:
+            reporter.error(str(e))
+            reporter.finish(ok=False)
             if callback_log:
                 callback_log(f"Critical Error: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _execute_file(self, conn, sql_file, prepared, manifest, source, started, callback_log, reporter=None):
+        """
+        Executes a prepared whole file and records it in the manifest. The file and its
+        manifest row commit together, so a failed file leaves nothing behind, unless the
+        script has transaction control of its own (then it runs as written and a failure
+        is recorded as PARTIAL). Returns True if the file loaded, None if it failed and
+        nothing of it was committed, or False if it failed after committing part of it.
+        """
+        digest, size, _ = source
+        atomic = _TXN_CONTROL_RE.search(prepared.sql_script) is None
+        try:
+            if atomic:
+                conn.executescript(f"BEGIN;\n{prepared.sql_script}\n")
+            else:
+                conn.execute("BEGIN TRANSACTION")
+                conn.executescript(prepared.sql_script)
+            ImportQuarantine(conn).clear(sql_file)
+            manifest.record(sql_file, digest, size, LOADED, prepared.statements, time.perf_counter() - started)
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            manifest.record(sql_file, digest, size, FAILED if atomic else PARTIAL, prepared.statements,
+                            time.perf_counter() - started, error=str(e))
+            conn.commit()
+            if reporter is not None:
+                reporter.error(str(e), sql_file)
+            err_msg = f"Error executing {sql_file}: {e}"
+            print(err_msg)
+            if callback_log:
+                # Translate common errors
+                if "near" in str(e) or "duplicate column" in str(e):
+                    err_msg += f"\n在處理檔案 '{os.path.basename(sql_file)}' 時發生錯誤:\n{e}"
+                    if self.debug_dump:
+                        err_msg += "\n\n除錯檔案已儲存至 data/ 目錄。"
+                callback_log(err_msg)
+            return None if atomic else False
+
+    def _shard_count(self, conn, sources, total_size):
+        """
+        Worker processes for a sharded load of these files, or 0. Only imports of
+        SHARD_THRESHOLD bytes into a database without tables are sharded.
+        """
+        if self.debug_dump or self.profile_rules or total_size < self.SHARD_THRESHOLD:
+            return 0
+        if any(entry is not None for _, _, entry in sources.values()):
+            return 0    # resuming: files are loaded one by one, as the manifest records them
+        tables = sum(1 for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                                   "AND name NOT LIKE 'sqlite_%'") if not is_import_table(name))
+        if tables:
+            return 0
+        workers = self.shard_workers
+        if workers is None:
+            workers = min(os.cpu_count() or 1, self.PIPELINE_WORKERS)
+        return min(workers, self.MAX_SHARDS) if workers > 1 else 0
+
+    def _load_sharded(self, conn, plan, shards, db_path, manifest, sources, deferred_indexes, reporter,
+                      callback_log):
+        """
+        Loads a shardable ImportPlan on `shards` worker processes. The tables with data
+        are split between them (ImportPlan.split); each runs the DDL and its tables'
+        INSERTs into a scratch DB next to db_path (load_shard). The target then ATTACHes
+        the shards and, in one transaction, creates the tables and views as the first
+        shard has them, copies every table over with INSERT ... SELECT and records the
+        files in the manifest. The dump's DDL never runs in the target itself: with the
+        shards attached, an unqualified DROP TABLE could hit a shard's table.
+        sources maps each file to its (sha256, size, entry).
+        Returns False if the import failed; nothing is committed then.
+        """
+        started = time.perf_counter()
+        groups = plan.split(shards)
+        directory = os.path.dirname(os.path.abspath(db_path))
+        scratch = [ScratchDatabase("disk", directory) for _ in groups]
+        attached = 0
+        if callback_log:
+            callback_log(f"Loading {sum(map(len, groups))} tables on {len(groups)} shards")
+        for sql_file in plan.files:
+            self._note_dialect(sql_file, plan.scans[sql_file].dialect, callback_log)
+        reporter.phase(LOAD, message=f"{len(groups)} shards")
+        pool = ProcessPoolExecutor(max_workers=len(groups))
+        try:
+            futures = {}
+            for i, (db, tables) in enumerate(zip(scratch, groups)):
+                # The first shard runs every file, so its schema is complete; the others stop
+                # after the last file with rows for their tables
+                last = len(plan.files) - 1 if i == 0 else max(
+                    n for n, f in enumerate(plan.files) if not plan.scans[f].inserts.keys().isdisjoint(tables))
+                files = [(f, plan.scans[f].dialect) for f in plan.files[:last + 1]]
+                futures[pool.submit(load_shard, db.path, files, tables, self.sanitizer_engine,
+                                    self.load_profile.batch_inserts)] = i
+            statements = 0
+            indexes = []
+            for n, future in enumerate(as_completed(futures), 1):
+                count, shard_indexes = future.result()
+                statements += count
+                if futures[future] == 0:
+                    indexes = shard_indexes
+                reporter.update(reporter.total * n // len(futures), statements)
+
+            reporter.phase(MERGE)
+            for i, db in enumerate(scratch):
+                conn.execute(f"ATTACH DATABASE ? AS shard{i}", (db.path,))
+                attached += 1
+            conn.execute("BEGIN")
+            for (sql,) in conn.execute("SELECT sql FROM shard0.sqlite_master WHERE type IN ('table', 'view') "
+                                       "AND name NOT LIKE 'sqlite_%' ORDER BY rowid").fetchall():
+                conn.execute(sql)
+            for i in range(len(scratch)):
+                for table in self._shard_tables(conn, f"shard{i}"):
+                    columns = ", ".join(map(_quote_name, self._copied_columns(conn, f"shard{i}", table)))
+                    conn.execute(f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM shard{i}.{table}")
+            if deferred_indexes is not None:
+                deferred_indexes.extend(indexes)
+            else:
+                for sql in indexes:
+                    conn.execute(sql)
+            duration = time.perf_counter() - started
+            for sql_file in plan.files:
+                digest, size, _ = sources[sql_file]
+                manifest.record(sql_file, digest, size, LOADED, duration=duration)
+            conn.commit()
+            if callback_log:
+                callback_log(f"Merged {len(scratch)} shards ({statements} statements loaded)")
+            return True
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for sql_file in plan.files:
+                digest, size, _ = sources[sql_file]
+                manifest.record(sql_file, digest, size, FAILED, duration=time.perf_counter() - started, error=str(e))
+            conn.commit()
+            reporter.error(str(e))
+            err_msg = f"Error in sharded import: {e}"
+            print(err_msg)
+            if callback_log:
+                callback_log(err_msg)
+            return False
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            for i in range(attached):
+                conn.execute(f"DETACH DATABASE shard{i}")
+            for db in scratch:
+                db.close()
+
+    @staticmethod
+    def _shard_tables(conn, schema):
+        """Quoted names of the tables of an attached shard that have rows."""
+        tables = [_quote_name(row[0]) for row in conn.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        return [table for table in tables if conn.execute(f"SELECT 1 FROM {schema}.{table} LIMIT 1").fetchone()]
+
+    @staticmethod
+    def _copied_columns(conn, schema, table):
+        """Columns INSERT ... SELECT can copy: all but generated ones (table_xinfo hidden = 0)."""
+        return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({table})") if row[6] == 0]
+
+    def _finish_load(self, conn, deferred_indexes, callback_log, reporter=None):
+        """Builds the deferred indexes and runs the load profile's final pragmas. Returns False on failure."""
+        if deferred_indexes:
+            if reporter is not None:
+                reporter.phase(INDEX, message=f"{len(deferred_indexes)} indexes")
+            if callback_log:
+                callback_log(f"Building {len(deferred_indexes)} deferred indexes")
+        try:
+            finish_load(conn, self.load_profile, deferred_indexes or ())
+            return True
+        except sqlite3.Error as e:
+            if reporter is not None:
+                reporter.error(str(e))
+            if callback_log:
+                callback_log(f"Error building indexes: {e}")
+            return False
+
+    def _is_streamed(self, sql_file):
+        if self.streaming is None:
+            if os.path.getsize(sql_file) >= self.STREAMING_THRESHOLD:
+                return True
+            dialect = sniff_dialect(sql_file) if self.dialect == "auto" else self.dialect
+            return dialect in BULK_DIALECTS
+        return self.streaming
+
+    def _pipeline_size(self, whole_files):
+        """Pipeline worker processes for an import with this many whole-file imports (<= 1: no pool)."""
+        if whole_files < 2:
+            return 0
+        workers = self.pipeline_workers
+        if workers is None:
+            workers = min(os.cpu_count() or 1, self.PIPELINE_WORKERS)
+        return min(workers, whole_files)
+
+    def _prepare_args(self, sql_file, idx, cache, workers=None):
+        """Positional arguments of prepare_file for one file."""
+        debug_path = self._debug_dump_path(idx, sql_file) if self.debug_dump else None
+        return (sql_file, self.sanitizer_engine, self.dialect, self.profile_rules, workers, cache, debug_path,
+                self.load_profile.batch_inserts)
+
+    def _debug_dump_path(self, idx, sql_file):
+        debug_name = f"debug_{idx}_{os.path.basename(sql_file)}.sql.gz"
+        return os.path.join(self.current_dir, "..", "data", debug_name)
+
+    def _resolve_dialect(self, sql_file, sql_script, callback_log):
+        """The dialect to sanitize a file with; detected ones are kept in self.dialects."""
+        if self.dialect != "auto":
+            return self.dialect
+        if sql_script is None:
+            dialect = sniff_dialect(sql_file)
+        else:
+            dialect = detect_dialect(sql_script)
+        self._note_dialect(sql_file, dialect, callback_log)
+        return dialect
+
+    def _note_dialect(self, sql_file, dialect, callback_log):
+        if self.dialect != "auto":
+            return
+        self.dialects[sql_file] = dialect
+        if callback_log:
+            callback_log(f"Detected SQL dialect: {dialect or 'unknown (all rules)'}")
+
+    def _report_profile(self, sql_file, profile, callback_log):
+        if profile is None:
+            return
+        self.profiles[sql_file] = profile
+        if callback_log:
+            callback_log(f"Sanitizer rule profile for {os.path.basename(sql_file)}:\n{profile.format(limit=15)}")
+
+    def _report_cache(self, cache, callback_log):
+        if cache is None:
+            return
+        self._report_cache_stats(cache.stats(), callback_log)
+        cache.hits = cache.misses = 0
+
+    @staticmethod
+    def _report_cache_stats(stats, callback_log):
+        if stats is None:
+            return
+        if callback_log:
+            callback_log(f"Sanitize cache: {stats['hits']} hits, {stats['misses']} misses "
+                         f"({stats['entries']} entries, {stats['bytes'] // 1024} KB)")
+
+    def _stream_file(self, conn, idx, sql_file, callback_log, profile=None, cache=None, dialect=None,
+                     deferred_indexes=None, manifest=None, source=None, reporter=None, done=0, items=0):
+        """
+        Streams one file into the DB (read, sanitize and execute statement by statement).
+        The debug dump, if enabled, is written as it goes. Returns the number of statements
+        loaded, or None if the import failed.
+        CREATE INDEX statements go to deferred_indexes when it is a list.
+        With a manifest, every committed group also commits a checkpoint; a PARTIAL file
+        whose content is unchanged resumes from its last checkpoint. source is the
+        file's (sha256, size, manifest entry). reporter gets updates after each group,
+        counted on from the bytes and statements (done, items) of the files before this one.
+        With self.recover, statements that fail are skipped and recorded in QUARANTINE_TABLE.
+        """
+        digest, size, entry = source if source is not None else (None, None, None)
+        resume_at = statements = 0
+        if manifest is not None and entry is not None and entry["status"] == PARTIAL and entry["sha256"] == digest:
+            resume_at, statements = entry["checkpoint"], entry["statements"] or 0
+            if callback_log:
+                callback_log(f"Resuming {os.path.basename(sql_file)} at character {resume_at}")
+        # What is committed so far: a failure drops the deferred indexes read after it
+        committed = {"offset": resume_at, "statements": statements,
+                     "indexes": len(deferred_indexes) if deferred_indexes is not None else 0}
+
+        def on_progress(read, count):
+            reporter.update(done + read, items + statements + count)
+
+        def on_commit(end, count):
+            manifest.checkpoint(sql_file, digest, size, end, statements + count)
+            committed.update(offset=end, statements=statements + count,
+                             indexes=len(deferred_indexes) if deferred_indexes is not None else 0)
+
+        # Entries of an earlier run past the resume point are found again if still failing
+        quarantine = ImportQuarantine(conn)
+        quarantine.clear(sql_file, resume_at)
+        conn.commit()
+        skipped = []
+
+        def on_error(entry):
+            quarantine.record(sql_file, entry)
+            skipped.append(entry)
+
+        debug_file = None
+        if self.debug_dump:
+            try:
+                debug_file = gzip.open(self._debug_dump_path(idx, sql_file), 'wt', encoding='utf-8',
+                                       compresslevel=DEBUG_DUMP_LEVEL)
+            except OSError:
+                debug_file = None
+
+        started = time.perf_counter()
+        try:
+            count = load_sql_stream(conn, sql_file, engine=self.sanitizer_engine,
+                                    on_sql=debug_file.write if debug_file else None, profile=profile,
+                                    cache=cache, dialect=dialect, deferred_indexes=deferred_indexes,
+                                    batch_inserts=self.load_profile.batch_inserts, resume_at=resume_at,
+                                    on_commit=on_commit if manifest is not None else None,
+                                    on_progress=on_progress if reporter is not None else None,
+                                    on_error=on_error if self.recover else None)
+            error = f"{len(skipped)} failing statements skipped (see {QUARANTINE_TABLE})" if skipped else None
+            if manifest is not None:
+                manifest.record(sql_file, digest, size, LOADED, statements + count, time.perf_counter() - started,
+                                error=error)
+                conn.commit()
+            if callback_log:
+                callback_log(f"Streamed {count} statements from {os.path.basename(sql_file)}")
+                if skipped:
+                    lines = [describe(entry) for entry in skipped[:self.QUARANTINE_LOG_LINES]]
+                    if len(skipped) > len(lines):
+                        lines.append(f"... {len(skipped) - len(lines)} more")
+                    callback_log(f"{os.path.basename(sql_file)}: {error}:\n" + "\n".join(lines))
+            return statements + count
+        except Exception as e:
+            if deferred_indexes is not None:
+                del deferred_indexes[committed["indexes"]:]
+            if manifest is not None:
+                status = PARTIAL if committed["offset"] else FAILED
+                manifest.record(sql_file, digest, size, status, committed["statements"],
+                                time.perf_counter() - started, committed["offset"], str(e))
+                conn.commit()
+            if reporter is not None:
+                reporter.error(str(e), sql_file)
+            err_msg = f"Error executing {sql_file}: {e}"
+            print(err_msg)
+            if callback_log:
+                err_msg += f"\n在處理檔案 '{os.path.basename(sql_file)}' 時發生錯誤:\n{e}"
+                if debug_file:
+                    err_msg += "\n\n除錯檔案已儲存至 data/ 目錄。"
+                callback_log(err_msg)
+            return None
+        finally:
+            if debug_file:
+                debug_file.close()
@@ -0,0 +1,118 @@
+import re
+import sqlite3
+
+# Characters of VALUES rows merged into one INSERT statement
+DEFAULT_BATCH_SIZE = 1 << 16
+# Scripts averaging more characters per ';' already use multi-row INSERTs (mysqldump's
+# extended inserts); merging those gains nothing, so they are returned as they are
+MULTI_ROW_STATEMENT_SIZE = 2048
+
+# Whitespace, comments and empty statements between two statements
+_GAP_RE = re.compile(r'(?:\s|;|--[^\n]*(?=\n|\Z)|/\*(?:[^*]|\*(?!/))*\*/)*')
+
+# Runs to the first ';' outside strings, identifiers and comments (same idea as sql_stream's skip tail)
+_TAIL_RE = re.compile(r"""
+    (?: [^'"`\[;/-]+
+      | '[^']*(?:''[^']*)*' | "[^"]*(?:""[^"]*)*" | `[^`]*` | \[[^\]]*\]
+      | --[^\n]* | /\*.*?\*/
+      | [/-]
+    )*
+""", re.DOTALL | re.VERBOSE)
+
+_NAME = r'(?:"[^"]*(?:""[^"]*)*"|`[^`]*`|\[[^\]]*\]|[\w$]+)'
+_STRING = r"'[^']*(?:''[^']*)*'"
+_PLAIN = r"[^'\"`\[();/-]*"
+
+
+def _nested_values(depth):
+    """A tuple body: literals, operators and calls nested up to `depth` parentheses, no ';' or comments."""
+    body = _PLAIN + rf"(?:(?:{_STRING}|-(?!-)|/(?!\*)){_PLAIN})*"
+    for _ in range(depth):
+        body = _PLAIN + rf"(?:(?:{_STRING}|-(?!-)|/(?!\*)|\({body}\)){_PLAIN})*"
+    return body
+
+
+_TUPLE = rf"\({_nested_values(2)}\)"
+_HEAD_RE = re.compile(
+    rf'(?:INSERT(?:\s+OR\s+[A-Za-z]+)?|REPLACE)\s+INTO\s+{_NAME}(?:\s*\.\s*{_NAME})?\s*'
+    rf'(?:\(\s*{_NAME}(?:\s*,\s*{_NAME})*\s*\)\s*)?VALUES',
+    re.IGNORECASE
+)
+# The rows of a plain INSERT ... VALUES: nothing after them (no upsert / RETURNING clause)
+_ROWS_RE = re.compile(rf'\s*({_TUPLE}(?:\s*,\s*{_TUPLE})*)\s*(?:;|\Z)')
+
+
+def coalesce_inserts(sql, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Rewrites runs of consecutive INSERT ... VALUES statements into the same
+    table with the same column list as multi-row INSERTs of about
+    `batch_size` characters of rows each, so SQLite parses and plans one
+    statement per batch instead of one per row. Every other statement (and
+    any INSERT with a trailing clause, comments or quoted identifiers inside
+    its rows, or a subquery) is passed through unchanged and ends the run.
+    """
+    if len(sql) > MULTI_ROW_STATEMENT_SIZE * (sql.count(';') + 1):
+        return sql
+    out = []
+    pos = 0
+    head = None     # head of the INSERT being extended
+    size = 0
+    while pos < len(sql):
+        start = _GAP_RE.match(sql, pos).end()
+        if start == len(sql):
+            out.append(sql[pos:])
+            break
+        # Dumps repeat the same head row after row; only a new one goes through _HEAD_RE
+        same_head = head is not None and sql.startswith(head, start)
+        if same_head:
+            head_end = start + len(head)
+        else:
+            m = _HEAD_RE.match(sql, start)
+            head_end = m.end() if m is not None else None
+        rows = _ROWS_RE.match(sql, head_end) if head_end is not None else None
+        # Scalar subqueries may read rows inserted by earlier statements, so those are never merged
+        if rows is not None and 'SELECT' not in rows.group(1).upper():
+            if same_head and size < batch_size:
+                out.append(',\n')
+                size += len(rows.group(1))
+            else:
+                if head is not None:
+                    out.append(';\n')
+                out.append(sql[pos:rows.start(1)])
+                head = sql[start:head_end]
+                size = len(rows.group(1))
+            out.append(rows.group(1))
+            pos = rows.end()
+            continue
+
+        if head is not None:
+            out.append(';\n')
+            head = None
+        end = _statement_end(sql, start)
+        out.append(sql[pos:end])
+        pos = end
+    if head is not None:
+        out.append(';\n')
+    return ''.join(out)
+
+
+def _statement_end(sql, start):
+    """End of the statement at `start`: the first ';' that completes it (CREATE TRIGGER bodies contain some)."""
+    at = start
+    while True:
+        at = _TAIL_RE.match(sql, at).end()
+        if at >= len(sql) or sql[at] != ';':
+            return len(sql)     # last statement without ';', or an unterminated literal
+        at += 1
+        if sqlite3.complete_statement(sql[start:at]):
+            return at
+
+
+def count_statements(sql):
+    """Number of statements in a script; empty ones (';' alone) are not counted."""
+    count = 0
+    pos = _GAP_RE.match(sql).end()
+    while pos < len(sql):
+        pos = _GAP_RE.match(sql, _statement_end(sql, pos)).end()
+        count += 1
+    return count
@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import time
+from typing import NamedTuple, Optional
+
+# Table in the imported database listing what a recovering import skipped
+# (named with catalog.IMPORT_TABLE_PREFIX, so listings leave it out)
+QUARANTINE_TABLE = "_import_quarantine"
+
+
+class Quarantined(NamedTuple):
+    """A statement (or one parsed row of it) that failed on its own and was skipped."""
+    start: int                  # character offsets of the statement in the source file
+    end: int
+    text: str                   # the statement as written, or the values of the row
+    error: str
+    row: Optional[int] = None   # index of the row in the statement, for parsed rows (see bulk_rows)
+
+
+def split_statements(sql):
+    """Single statements of a SQLite script, split where sqlite3.complete_statement says one ends."""
+    statements = []
+    start = pos = 0
+    while True:
+        pos = sql.find(';', pos) + 1
+        if not pos:
+            break
+        if sqlite3.complete_statement(sql[start:pos]):
+            statements.append(sql[start:pos])
+            start = pos
+    if sql[start:].strip():
+        statements.append(sql[start:])
+    return statements
+
+
+def isolate(conn, units, error):
+    """
+    Runs units that failed together with `error` again in the connection's current
+    transaction, bisecting them until the failing ones are found; the rest stay applied.
+
+    units: objects with run(conn), executing them, and parts(), a list of at least two
+    smaller units that run the same, or None for a unit that cannot be split.
+    Each attempt runs in a SAVEPOINT and is rolled back alone when it fails, so a bad
+    statement costs about log2(len(units)) attempts. A unit whose two parts both fail
+    with the same error, other than a constraint error (missing table, wrong column
+    list), fails as a whole and is not split further. Returns [(unit, error)] of the
+    units that failed on their own, in order. Raises the error if SQLite rolled
+    back the whole transaction (disk full, I/O errors), as nothing can be isolated then.
+    """
+    failed = []
+    _bisect(conn, units, error, failed)
+    return failed
+
+
+def _bisect(conn, units, error, failed):
+    whole = None
+    if len(units) == 1:
+        parts = units[0].parts()
+        if parts is None:
+            failed.append((units[0], error))
+            return
+        whole, units = units[0], parts
+    middle = len(units) // 2
+    first, second = units[:middle], units[middle:]
+    first_error = _attempt(conn, first)
+    if first_error is not None and whole is not None and not isinstance(first_error, sqlite3.IntegrityError):
+        # Errors that do not depend on the rows fail every part alike: check the other
+        # part before bisecting down to single rows
+        second_error = _attempt(conn, second)
+        if second_error is not None and str(second_error) == str(first_error):
+            failed.append((whole, first_error))
+            return
+        _bisect(conn, first, first_error, failed)
+        if second_error is not None:
+            _bisect(conn, second, second_error, failed)
+        return
+    if first_error is not None:
+        _bisect(conn, first, first_error, failed)
+    second_error = _attempt(conn, second)
+    if second_error is not None:
+        _bisect(conn, second, second_error, failed)
+
+
+def _attempt(conn, units):
+    """Runs units in a savepoint; returns the error it was rolled back for, or None."""
+    conn.execute("SAVEPOINT isolate")
+    try:
+        for unit in units:
+            unit.run(conn)
+    except sqlite3.Error as e:
+        if not conn.in_transaction:
+            raise
+        conn.execute("ROLLBACK TO isolate")
+        conn.execute("RELEASE isolate")
+        return e
+    conn.execute("RELEASE isolate")
+    return None
+
+
+class ImportQuarantine:
+    """
+    The statements a recovering import skipped, kept in the database itself
+    (QUARANTINE_TABLE) next to the manifest: one row per Quarantined, with the
+    source file (by absolute path), so the dump can be fixed where it broke.
+    The table is created with the first entry; writes are not committed here,
+    so entries land in the same transaction as the data loaded around them.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._created = False
+
+    def record(self, path, entry):
+        if not self._created:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} ("
+                " path TEXT NOT NULL, name TEXT NOT NULL, start INTEGER NOT NULL, \"end\" INTEGER NOT NULL,"
+                " row INTEGER, error TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._created = True
+        self.conn.execute(
+            f"INSERT INTO {QUARANTINE_TABLE} (path, name, start, \"end\", row, error, text, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(path), os.path.basename(path), entry.start, entry.end, entry.row, entry.error,
+             entry.text, time.time()),
+        )
+
+    def clear(self, path, start=0):
+        """Forgets the entries of a file from character `start` on (a re-import loads them again)."""
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                             (QUARANTINE_TABLE,)).fetchone() is None:
+            return
+        self.conn.execute(f"DELETE FROM {QUARANTINE_TABLE} WHERE path = ? AND start >= ?",
+                          (os.path.abspath(path), start))
+
+    def entries(self, path):
+        """Quarantined entries of a file, in file order."""
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                             (QUARANTINE_TABLE,)).fetchone() is None:
+            return []
+        return [Quarantined(*row) for row in self.conn.execute(
+            f"SELECT start, \"end\", text, error, row FROM {QUARANTINE_TABLE} WHERE path = ? "
+            "ORDER BY start, row", (os.path.abspath(path),))]
+
+
+def describe(entry, limit=200):
+    """One line about a Quarantined entry for logs: where, why and the start of the text."""
+    text = ' '.join(entry.text.split())
+    if len(text) > limit:
+        text = text[:limit] + '...'
+    where = f"characters {entry.start}-{entry.end}"
+    if entry.row is not None:
+        where += f", row {entry.row + 1}"
+    return f"{where}: {entry.error}: {text}"
@@ -1,40 +1,142 @@
+import hashlib
 import re
+import time
 # No change needed for relative imports: from .sanitizer_tsql import ...
 # But verify content first.
 from .sanitizer_tsql import TSQLSanitizerRules
 from .sanitizer_schema import SchemaSanitizerRules
+from .sanitizer_postgres import PostgresSanitizerRules
+from .sanitizer_token import TokenSanitizer
+from .sanitizer_rules import Rule, RuleProfile, run_rules
+from .dialect import detect_dialect
 
 class SQLSanitizer:
-    @staticmethod
-    def sanitize(sql_script):
-        # 1. T-SQL / MSSQL Specifics
-        sql_script = TSQLSanitizerRules.apply(sql_script)
+    # "regex": the original rule chain (one full-string pass per rule)
+    # "token": single-pass rewriter over a quote/comment-aware token stream
+    ENGINES = ("regex", "token")
+
+    # Bump when rule behaviour changes in code the fingerprint below cannot see
+    # (FuncRule bodies, the token engine); regex rule edits are picked up automatically.
+    RULESET_VERSION = 3
 
+    # Rule families (rule-name prefixes) each dialect needs, see detect_dialect();
+    # a dialect of None runs every family
+    DIALECT_FAMILIES = {
+        "tsql": ("tsql", "inline", "schema"),
+        "mysql": ("inline", "mysql", "schema"),
+        "postgres": ("postgres", "inline", "schema"),
+    }
+    # Dialects whose dumps the token engine cannot take as they are: the postgres
+    # rules run before it (its T-SQL batch skipping would drop a GO-less pg_dump whole)
+    TOKEN_PREPASS_DIALECTS = ("postgres", None)
+    # Syntax cleanup that applies to any dialect
+    SHARED_RULES = (
+        'tsql.comma_semicolon', 'tsql.comma_paren', 'tsql.comma_newline_semicolon',
+        'tsql.comma_newline_paren', 'tsql.empty_lines',
+    )
+
+    # Rules run between the T-SQL and schema stages; names are what RuleProfile reports
+    RULES = (
         # 2. Handle INSERT INTO
         # FIX: T-SQL allows INSERT "Table", SQLite requires INSERT INTO "Table"
-        sql_script = re.sub(r'(?i)(?<=^)\s*INSERT\s+(?!INTO\b)\s*("[\w\s]+"|\[[\w\s]+\]|[\w]+)', r'INSERT INTO \1', sql_script, flags=re.MULTILINE)
-        sql_script = re.sub(r'(?i)\bINSERT\s+(?!INTO\b)\s*("[\w\s]+"|\[[\w\s]+\]|[\w]+)', r'INSERT INTO \1', sql_script)
+        Rule('inline.insert_into_line_start', r'(?i)(?<=^)\s*INSERT\s+(?!INTO\b)\s*("[\w\s]+"|\[[\w\s]+\]|[\w]+)', r'INSERT INTO \1', re.MULTILINE),
+        Rule('inline.insert_into', r'(?i)\bINSERT\s+(?!INTO\b)\s*("[\w\s]+"|\[[\w\s]+\]|[\w]+)', r'INSERT INTO \1'),
         # Semicolon insertion
-        sql_script = re.sub(r'(?i)([^;])(\s*[\r\n]+\s*)(INSERT\s+INTO\b)', r'\1\2; \3', sql_script)
+        Rule('inline.insert_semicolon', r'(?i)([^;])(\s*[\r\n]+\s*)(INSERT\s+INTO\b)', r'\1\2; \3'),
 
         # 3. Special Literals
         # Hex
-        def replace_hex(m): return f"X'{m.group(1)}'"
-        sql_script = re.sub(r'\b0x([0-9A-Fa-f]+)\b', replace_hex, sql_script)
+        Rule('inline.hex_literal', r'\b0x([0-9A-Fa-f]+)\b', lambda m: f"X'{m.group(1)}'"),
         # Unicode N'...'
-        sql_script = re.sub(r"N'([^']*)'", r"'\1'", sql_script)
-        sql_script = re.sub(r"(?<![a-zA-Z0-9_])N(')", r"\1", sql_script)
+        Rule('inline.unicode_literal', r"N'([^']*)'", r"'\1'"),
+        Rule('inline.unicode_prefix', r"(?<![a-zA-Z0-9_])N(')", r"\1"),
         # IDENTITY
-        sql_script = re.sub(r'(?i)\bIDENTITY\s*\(\s*\d+\s*,\s*\d+\s*\)', '', sql_script) 
-        sql_script = re.sub(r'(?i)\bIDENTITY\b', '', sql_script)
+        Rule('inline.identity_seed', r'(?i)\bIDENTITY\s*\(\s*\d+\s*,\s*\d+\s*\)', ''),
+        Rule('inline.identity', r'(?i)\bIDENTITY\b', ''),
 
         # 4. MySQL Basics
-        sql_script = re.sub(r'(?i)^\s*(CREATE|DROP)\s+DATABASE\s+.*?;', '', sql_script, flags=re.MULTILINE)
-        sql_script = re.sub(r'(?i)^\s*USE\s+.*?;', '', sql_script, flags=re.MULTILINE)
-        sql_script = re.sub(r'(?i)^\s*(LOCK|UNLOCK)\s+TABLES.*?;', '', sql_script, flags=re.MULTILINE)
-        sql_script = re.sub(r'(?m)^\s*#.*$', '', sql_script)
+        Rule('mysql.create_drop_database', r'(?i)^\s*(CREATE|DROP)\s+DATABASE\s+.*?;', '', re.MULTILINE),
+        Rule('mysql.use', r'(?i)^\s*USE\s+.*?;', '', re.MULTILINE),
+        Rule('mysql.lock_tables', r'(?i)^\s*(LOCK|UNLOCK)\s+TABLES.*?;', '', re.MULTILINE),
+        Rule('mysql.hash_comments', r'(?m)^\s*#.*$', ''),
+    )
+
+    @staticmethod
+    def sanitize(sql_script, engine="regex", profile=None, workers=None, cache=None, dialect=None):
+        """
+        Rewrites a dump into SQLite-compatible SQL.
+        dialect: "tsql", "mysql" or "postgres" applies only that dialect's rule families
+        (see DIALECT_FAMILIES); "auto" detects it from the head of the script; None runs
+        every family. The token engine handles the other dialects in one pass; for "postgres"
+        and None the postgres rules (PostgresSanitizerRules) run before it.
+        profile: optional RuleProfile; when given, per-rule time and hit counts are recorded in it
+        (the token engine is a single pass and is recorded as one entry).
+        workers: run the regex chain on a process pool of this size (see ParallelSanitizer);
+        None or 1 = serial. The token engine is linear and always runs serially.
+        cache: optional SanitizeCache; unchanged statement groups are served from it (see CachedSanitizer).
+        """
+        if dialect == "auto":
+            dialect = detect_dialect(sql_script)
+        elif dialect is not None and dialect not in SQLSanitizer.DIALECT_FAMILIES:
+            raise ValueError(f"Unknown SQL dialect: {dialect}")
+
+        if cache is not None:
+            from .sanitizer_cache import CachedSanitizer
+            if engine not in SQLSanitizer.ENGINES:
+                raise ValueError(f"Unknown sanitizer engine: {engine}")
+            return CachedSanitizer.sanitize(sql_script, cache, engine=engine, workers=workers, profile=profile,
+                                            dialect=dialect)
+
+        if engine == "token":
+            if dialect in SQLSanitizer.TOKEN_PREPASS_DIALECTS:
+                sql_script = PostgresSanitizerRules.apply(sql_script, profile)
+            if profile is None:
+                return TokenSanitizer.sanitize(sql_script)
+            start = time.perf_counter()
+            result = TokenSanitizer.sanitize(sql_script)
+            profile.record('token', time.perf_counter() - start, 1, 0)
+            return result
+        if engine != "regex":
+            raise ValueError(f"Unknown sanitizer engine: {engine}")
 
-        # 5. Schema & DDL
-        sql_script = SchemaSanitizerRules.apply(sql_script)
+        if workers is not None and workers != 1:
+            from .sanitizer_parallel import ParallelSanitizer
+            return ParallelSanitizer.sanitize(sql_script, workers=workers, profile=profile, dialect=dialect)
 
-        return sql_script
+        # 1. T-SQL / MSSQL Specifics, 2.-4. Inline rewrites, 5. Schema & DDL
+        return run_rules(sql_script, SQLSanitizer.rules(dialect), profile)
+
+    @staticmethod
+    def rules(dialect=None):
+        """The regex rule chain, in order, restricted to the families of `dialect`."""
+        rules = (PostgresSanitizerRules.RULES + TSQLSanitizerRules.RULES + SQLSanitizer.RULES
+                 + SchemaSanitizerRules.RULES)
+        families = SQLSanitizer.DIALECT_FAMILIES.get(dialect)
+        if families is None:
+            return rules
+        return tuple(rule for rule in rules
+                     if rule.name.split('.', 1)[0] in families or rule.name in SQLSanitizer.SHARED_RULES)
+
+    @staticmethod
+    def ruleset_version(engine="regex", dialect=None):
+        """Fingerprint of the rule set an engine applies; part of every SanitizeCache key."""
+        parts = [str(SQLSanitizer.RULESET_VERSION), engine]
+        if engine == "regex":
+            rules = SQLSanitizer.rules(dialect)
+        else:
+            rules = PostgresSanitizerRules.RULES if dialect in SQLSanitizer.TOKEN_PREPASS_DIALECTS else ()
+        if rules:
+            if dialect is not None:
+                parts.append(dialect)
+            for rule in rules:
+                parts.append(rule.name)
+                regex = getattr(rule, 'regex', None)
+                if regex is not None:
+                    parts.append(f"{regex.pattern}\0{regex.flags}\0{rule.repl if isinstance(rule.repl, str) else ''}")
+        return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def profile(sql_script, engine="regex", dialect=None):
+        """Sanitizes with profiling on. Returns (sanitized_sql, RuleProfile)."""
+        profile = RuleProfile()
+        return SQLSanitizer.sanitize(sql_script, engine=engine, profile=profile, dialect=dialect), profile
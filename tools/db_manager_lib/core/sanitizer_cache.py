@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+from .sanitizer_parallel import (
+    DEFAULT_PIECE_SIZE, batch_script, serial_rules, split_pieces, sanitize_pieces,
+)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class SanitizeCache:
+    """
+    On-disk cache of sanitized SQL, keyed by the hash of the input text, the
+    engine and the sanitizer rule-set version (SQLSanitizer.ruleset_version),
+    so editing any rule invalidates old entries automatically.
+
+    Stored in a small SQLite file. When the stored values exceed `max_bytes`
+    the least recently used entries are evicted. hits/misses count lookups
+    since the cache was opened.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}
+        self._versions = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, unsafe INTEGER NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used)")
+        self.conn.commit()
+
+    def key(self, text, engine="regex", dialect=None):
+        version = self._versions.get((engine, dialect))
+        if version is None:
+            from .sanitizer import SQLSanitizer
+            version = self._versions[engine, dialect] = SQLSanitizer.ruleset_version(engine, dialect)
+        digest = hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+        return f"{version}:{digest}"
+
+    def get(self, key):
+        """Returns (value, unsafe) or None."""
+        row = self.conn.execute("SELECT value, unsafe FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time()
+        return row[0], bool(row[1])
+
+    def put(self, key, value, unsafe=False):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, unsafe, size, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, value, int(unsafe), len(value), time.time()),
+        )
+
+    def commit(self):
+        """Writes recency updates and evicts least recently used entries over the size cap."""
+        if self._touched:
+            self.conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()],
+            )
+            self._touched = {}
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            doomed = []
+            for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+                doomed.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self.conn.commit()
+
+    def stats(self):
+        entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+class CachedSanitizer:
+    """
+    Sanitizes through a SanitizeCache, so re-sanitizing an edited dump only
+    runs the rules on the statements that changed.
+
+    Regex engine: the script is batched and cut into content-defined groups
+    of statements (split_pieces(content_defined=True)); each group is looked
+    up by its hash and only missing groups are sanitized (on a process pool
+    when workers > 1). This is the same piecewise scheme as
+    ParallelSanitizer, so the output equals the serial chain, including the
+    serial fallback for scripts where the pieces are not independent.
+    Token engine: single pass, so the whole script is the cache unit.
+    """
+
+    @staticmethod
+    def sanitize(script, cache, engine="regex", workers=None, profile=None, piece_size=DEFAULT_PIECE_SIZE,
+                 dialect=None):
+        from .sanitizer import SQLSanitizer
+
+        if engine != "regex":
+            key = cache.key(script, engine, dialect)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit[0]
+            result = SQLSanitizer.sanitize(script, engine=engine, profile=profile, dialect=dialect)
+            cache.put(key, result)
+            cache.commit()
+            return result
+
+        batched = batch_script(script, profile, dialect)
+        pieces = split_pieces(batched, piece_size, content_defined=True)
+        keys = [cache.key(piece, engine, dialect) for piece in pieces]
+        results = [cache.get(key) for key in keys]
+
+        missing = [i for i, hit in enumerate(results) if hit is None]
+        if missing:
+            computed = sanitize_pieces([pieces[i] for i in missing], workers or 1, profiling=profile is not None,
+                                       dialect=dialect)
+            for i, (value, piece_profile, unsafe) in zip(missing, computed):
+                results[i] = (value, unsafe)
+                cache.put(keys[i], value, unsafe)
+                if profile is not None:
+                    profile.merge(piece_profile)
+        cache.commit()
+
+        if any(unsafe for _, unsafe in results[:-1]):
+            return serial_rules(batched, profile, dialect)
+        return '\n'.join(value for value, _ in results)
@@ -0,0 +1,162 @@
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from .sql_lexer import scan, NEWLINE, WHITESPACE, COMMENT, PUNCT
+from .sanitizer_rules import RuleProfile
+
+DEFAULT_PIECE_SIZE = 1 << 14    # characters of batched script per task
+
+# Without a VALUE( anywhere the INSERT ... VALUE( rule cannot match (and would scan quadratically)
+_VALUE_RE = re.compile(r'(?i)\bVALUE\s*\(')
+# Rules that scan for a balanced ')' and may run past a statement end when parens don't balance
+_PAREN_SCAN_RE = re.compile(r'(?i)\b(?:CHECK|CONVERT)\s*\(|\bPERIOD\s+FOR\b')
+# Lines a piece may start with: no rule anchored at a line start ('^\s*...') can match them,
+# so a line emptied at the end of the previous piece is never swallowed differently.
+_SAFE_LINE_RE = re.compile(r'(?i)(?:INSERT\b|CREATE\s+TABLE\b|--|/\*)')
+# Only GO batching and the INSERT ... VALUE( rule (whose lazy match can span statements)
+# run on the whole script; every later rule runs per piece.
+_MAIN_RULES = ('tsql.go_batches', 'inline.insert_value')
+
+
+# Content-defined cuts look at up to this many characters of the next line
+_ANCHOR_WINDOW = 256
+_ANCHOR_DIVISOR = 8
+
+
+def _main_rule_names(rules):
+    """
+    The whole-script rules of a chain: _MAIN_RULES and, when GO batching runs, every
+    rule before it (the postgres family when all dialects run), as they decide what it batches.
+    """
+    names = [rule.name for rule in rules]
+    if 'tsql.go_batches' not in names:
+        return set(_MAIN_RULES)
+    return set(names[:names.index('tsql.go_batches')]).union(_MAIN_RULES)
+
+
+def _piece_rules(dialect=None):
+    from .sanitizer import SQLSanitizer
+    rules = SQLSanitizer.rules(dialect)
+    main = _main_rule_names(rules)
+    return tuple(rule for rule in rules if rule.name not in main)
+
+
+def _sanitize_piece(args):
+    """
+    Worker: runs the per-piece rules on one piece of the script. Also reports
+    whether the serial pass could behave differently here: unbalanced parens
+    near a balanced-paren scanner.
+    """
+    piece, profiling, dialect = args
+    profile = RuleProfile() if profiling else None
+    unsafe = piece.count('(') != piece.count(')') and _PAREN_SCAN_RE.search(piece) is not None
+    for rule in _piece_rules(dialect):
+        piece = rule.apply(piece, profile)
+    return piece, profile, unsafe
+
+
+def split_pieces(script, piece_size=DEFAULT_PIECE_SIZE, content_defined=False):
+    """
+    Cuts a batched script into pieces of about `piece_size` characters.
+    Cuts are made only at line breaks right after a ';' outside strings and
+    comments, where the next line starts with INSERT, CREATE TABLE or a
+    comment, so every piece is a run of whole statements. The newline at
+    each cut is dropped; rejoin the pieces with '\n'.
+
+    content_defined: choose cuts from the text of the following line instead
+    of the running size (pieces of piece_size/8 up to piece_size), so an edit
+    only changes the pieces around it; used for caching.
+    """
+    pieces = []
+    start = 0
+    last_code = None
+    min_size = piece_size // 8 if content_defined else piece_size
+    for m in scan(script):
+        kind = m.lastgroup
+        if kind == NEWLINE:
+            size = m.start() - start
+            if (last_code == ';' and script[m.start() - 1] == ';' and size >= min_size
+                    and _SAFE_LINE_RE.match(script, m.end())
+                    and (size >= piece_size or _is_anchor(script, m.end()))):
+                pieces.append(script[start:m.start()])
+                start = m.end()
+        elif kind not in (WHITESPACE, COMMENT):
+            last_code = m.group() if kind == PUNCT else None
+    pieces.append(script[start:])
+    return pieces
+
+
+def _is_anchor(script, pos):
+    """Content-defined cut point: about one line in _ANCHOR_DIVISOR qualifies."""
+    end = script.find('\n', pos, pos + _ANCHOR_WINDOW)
+    line = script[pos:end if end != -1 else pos + _ANCHOR_WINDOW]
+    return zlib.crc32(line.encode('utf-8', 'surrogatepass')) % _ANCHOR_DIVISOR == 0
+
+
+def sanitize_pieces(pieces, workers, profiling=False, dialect=None):
+    """
+    Runs the per-piece rules on every piece, in a process pool when workers > 1.
+    Returns (sanitized, RuleProfile or None, unsafe) per piece, in order.
+    """
+    tasks = [(p, profiling, dialect) for p in pieces]
+    if workers < 2 or len(pieces) < 2:
+        return [_sanitize_piece(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(pieces))) as pool:
+        chunksize = max(1, len(pieces) // (workers * 4))
+        return list(pool.map(_sanitize_piece, tasks, chunksize=chunksize))
+
+
+def batch_script(script, profile=None, dialect=None):
+    """The whole-script rules: GO batching (and the rules before it), then INSERT ... VALUE( when the script has one."""
+    from .sanitizer import SQLSanitizer
+    rules = SQLSanitizer.rules(dialect)
+    main = _main_rule_names(rules)
+    for rule in rules:
+        if rule.name in main and (rule.name != 'inline.insert_value' or _VALUE_RE.search(script)):
+            script = rule.apply(script, profile)
+    return script
+
+
+def serial_rules(batched, profile=None, dialect=None):
+    """Runs the per-piece rules over the whole batched script (the serial chain)."""
+    for rule in _piece_rules(dialect):
+        batched = rule.apply(batched, profile)
+    return batched
+
+
+class ParallelSanitizer:
+    """
+    Runs the regex rule chain over a ProcessPoolExecutor.
+
+    GO batching and the INSERT ... VALUE( rule run first on the whole script,
+    exactly as in the serial chain. The result is cut into groups of whole
+    statements (split_pieces), every other rule runs on each group in a
+    worker, and the results are joined in their original order. Dumps without
+    GO are cut the same way, so they parallelize too.
+
+    The output equals SQLSanitizer.sanitize(engine="regex"). The remaining
+    rules are statement-local at the chosen cut points, except when a
+    CHECK/CONVERT with unbalanced parens makes a balanced-paren scanner run
+    past its statement. The workers report that and such scripts are
+    sanitized serially instead.
+    """
+
+    @staticmethod
+    def sanitize(script, workers=None, piece_size=DEFAULT_PIECE_SIZE, profile=None, dialect=None):
+        batched = batch_script(script, profile, dialect)
+
+        pieces = split_pieces(batched, piece_size)
+        workers = workers or os.cpu_count() or 1
+        if len(pieces) < 2 or workers < 2:
+            return serial_rules(batched, profile, dialect)
+
+        results = sanitize_pieces(pieces, workers, profiling=profile is not None, dialect=dialect)
+        if any(unsafe for _, _, unsafe in results[:-1]):
+            return serial_rules(batched, profile, dialect)
+
+        if profile is not None:
+            for _, piece_profile, _ in results:
+                profile.merge(piece_profile)
+        return '\n'.join(piece for piece, _, _ in results)
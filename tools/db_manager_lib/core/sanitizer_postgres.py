@@ -0,0 +1,133 @@
+import re
+
+from .sanitizer_rules import FuncRule, Rule, match_parens, run_rules
+
+# Rest of a statement up to its ';', skipping over ';' inside string literals; it never runs
+# past a GO line, so a T-SQL statement without ';' in a dump of unknown dialect stays in its batch
+_BODY_TEXT = r"(?:'[^']*(?:''[^']*)*'|[^';\n]|\n(?![ \t]*GO\b))*"
+_BODY = _BODY_TEXT + ";"
+# The same within one line (SET and pg_catalog calls are always written on one)
+_LINE = r"(?:'[^'\n]*'|[^';\n])*;"
+
+# Type names a '::' cast can carry in pg_dump output, multi-word ones first
+_CAST_TYPE = (r'(?:character\s+varying|bit\s+varying|double\s+precision'
+              r'|time(?:stamp)?(?:\s*\(\d+\))?\s+with(?:out)?\s+time\s+zone|"?[\w.]+"?)')
+
+# Keys pg_dump adds after the data, which fold_keys moves into the CREATE TABLE:
+# ALTER TABLE [ONLY] t ADD CONSTRAINT c PRIMARY KEY (...) / FOREIGN KEY (...) REFERENCES ...;
+_TABLE_NAME = r'((?:"[^"]+"|[\w$]+)(?:\.(?:"[^"]+"|[\w$]+))?)'
+_ADD_KEY_RE = re.compile(r'(?im)^[ \t]*ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?' + _TABLE_NAME
+                         + r'\s+ADD\s+(CONSTRAINT\s+(?:"[^"]+"|[\w$]+)\s+(?:PRIMARY|FOREIGN)\s+KEY\b'
+                         + _BODY_TEXT + r');[ \t]*\n?')
+_CREATE_TABLE_RE = re.compile(r'(?im)^[ \t]*CREATE\s+(?:UNLOGGED\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?'
+                              + _TABLE_NAME + r'\s*\(')
+# Key clauses SQLite cannot take inside CREATE TABLE (index options, several ADDs); those are dropped
+_UNFOLDABLE_RE = re.compile(r"(?i)\bUSING\b|\bWITH\b|\bINCLUDE\b|,\s*ADD\b|'")
+_NOT_VALID_RE = re.compile(r'(?i)\s+NOT\s+VALID\b')
+
+
+def _table_key(name):
+    """A table name as fold_keys matches CREATE TABLE and ALTER TABLE: without the public schema."""
+    return re.sub(r'^(?:"public"|public)\.', '', name)
+
+
+class PostgresSanitizerRules:
+    """
+    pg_dump output SQLite cannot run: session settings, ownership and privileges,
+    sequences, ALTER TABLE statements (keys are folded into CREATE TABLE), the public
+    schema prefix and '::' casts.
+    Runs before the other families, so the statements it drops never reach them.
+    """
+
+    @staticmethod
+    def apply(script, profile=None):
+        return run_rules(script, PostgresSanitizerRules.RULES, profile)
+
+    @staticmethod
+    def key_alters(script):
+        """
+        Matches of the ALTER TABLE ... ADD CONSTRAINT ... PRIMARY KEY / FOREIGN KEY statements
+        of a script that fold_keys can move into a CREATE TABLE (see _UNFOLDABLE_RE).
+        """
+        return [m for m in _ADD_KEY_RE.finditer(script) if not _UNFOLDABLE_RE.search(m.group(2))]
+
+    @staticmethod
+    def table_keys(script, alters=None):
+        """
+        {table: [constraint clauses]} of a script's key_alters (or of `alters`, matches in it);
+        clauses on one line, without NOT VALID.
+        """
+        keys = {}
+        for m in PostgresSanitizerRules.key_alters(script) if alters is None else alters:
+            keys.setdefault(_table_key(m.group(1)), []).append(_NOT_VALID_RE.sub('', ' '.join(m.group(2).split())))
+        return keys
+
+    @staticmethod
+    def fold_keys(script, keys=None):
+        """
+        Adds PRIMARY KEY / FOREIGN KEY constraints to the CREATE TABLE statements of a script
+        (SQLite has no ALTER TABLE ADD CONSTRAINT; pg_dump writes every key that way).
+        keys: {table: [constraint clauses]} to add (table_keys of the whole file, when it is
+        streamed); None = those of the script's own ALTER TABLE statements. Those ALTERs
+        are removed when their table's CREATE TABLE is in the script; the rest are left
+        for postgres.alter_table to drop.
+        """
+        alters = PostgresSanitizerRules.key_alters(script)
+        if keys is None:
+            keys = PostgresSanitizerRules.table_keys(script, alters)
+        creates = [m for m in _CREATE_TABLE_RE.finditer(script) if _table_key(m.group(1)) in keys]
+        if not creates:
+            return script
+        parens = match_parens(script, [m.end() - 1 for m in creates])
+        edits, folded = [], set()
+        for m in creates:
+            table, close = _table_key(m.group(1)), parens[m.end() - 1][0]
+            if close == -1 or table in folded:
+                continue
+            folded.add(table)
+            start = close
+            while script[start - 1].isspace():
+                start -= 1
+            comma = '' if script[start - 1] == '(' else ','
+            edits.append((start, close, comma + ','.join(f'\n    {clause}' for clause in keys[table]) + '\n'))
+        edits.extend((m.start(), m.end(), '') for m in alters if _table_key(m.group(1)) in folded)
+        out, prev = [], 0
+        for start, end, text in sorted(edits):
+            out.append(script[prev:start])
+            out.append(text)
+            prev = end
+        out.append(script[prev:])
+        return ''.join(out)
+
+    # Applied in order by apply(); names are what RuleProfile reports
+    RULES = (
+        # 1. Session settings: SET ...; and SELECT pg_catalog.set_config(...) / setval(...)
+        Rule('postgres.set', r'(?im)^[ \t]*SET\s+(?:SESSION\s+|LOCAL\s+)?\w+' + _LINE, ''),
+        Rule('postgres.catalog_select', r'(?im)^[ \t]*SELECT\s+pg_catalog\.\w+\s*\(' + _LINE, ''),
+
+        # 2. Ownership, privileges and objects SQLite has no use for
+        Rule('postgres.owner_to', r'(?im)^[ \t]*ALTER\b[^;\n]*?\bOWNER\s+TO\b' + _BODY, ''),
+        Rule('postgres.grant_revoke', r'(?im)^[ \t]*(?:GRANT|REVOKE)\b' + _BODY, ''),
+        Rule('postgres.comment_on', r'(?im)^[ \t]*COMMENT\s+ON\b' + _BODY, ''),
+        Rule('postgres.schema_extension', r'(?im)^[ \t]*CREATE\s+(?:SCHEMA|EXTENSION)\b' + _BODY, ''),
+        Rule('postgres.sequence', r'(?im)^[ \t]*(?:CREATE|ALTER)\s+SEQUENCE\b' + _BODY, ''),
+        # ALTER TABLE [ONLY] t ADD CONSTRAINT / ALTER COLUMN ... (SQLite has no such ALTERs;
+        # pg_dump writes keys and serial defaults this way, after the data). Primary and foreign
+        # keys of tables created in the same script are folded into the CREATE TABLE first
+        FuncRule('postgres.fold_keys', lambda s: PostgresSanitizerRules.fold_keys(s)),
+        Rule('postgres.alter_table', r'(?im)^[ \t]*ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?[^\s;]+\s+'
+             r'(?:ADD\s+CONSTRAINT|ALTER\s+COLUMN|ATTACH\s+PARTITION|ENABLE|DISABLE|REPLICA|CLUSTER\s+ON)\b'
+             + _BODY, ''),
+
+        # 3. Names: public.t -> t (SQLite reads "public" as an attached database)
+        Rule('postgres.public_prefix', r'(?i)(?<![\w."])(?:"public"|public)\.(?=[\w"])', ''),
+        Rule('postgres.index_method', r'(?i)\bUSING\s+(?:btree|hash|gin|gist|brin|spgist)\s*(?=\()', ''),
+
+        # 4. Expressions: '::type' casts, then DEFAULTs SQLite cannot parse
+        Rule('postgres.cast', r'(?i)::' + _CAST_TYPE + r'(?:\s*\(\s*\d+(?:\s*,\s*\d+)?\s*\))?(?:\[\])*', ''),
+        Rule('postgres.nextval_default', r"(?i)\s+DEFAULT\s+nextval\s*\(\s*'[^']*'\s*\)", ''),
+        Rule('postgres.now_default', r'(?i)\bDEFAULT\s+(?:now\s*\(\s*\)|CURRENT_TIMESTAMP\s*\(\s*\d*\s*\))',
+             'DEFAULT CURRENT_TIMESTAMP'),
+        # Any other function call default becomes an expression default: DEFAULT (f(...))
+        Rule('postgres.function_default', r'(?i)\bDEFAULT\s+(\w+\s*\([^()]*\))', r'DEFAULT (\1)'),
+    )
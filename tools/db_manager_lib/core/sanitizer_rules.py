@@ -0,0 +1,169 @@
+import re
+import time
+
+_PAREN_RE = re.compile(r'[(),]')
+
+
+class Rule:
+    """A named regex rewrite, compiled once when the rule list is built."""
+
+    def __init__(self, name, pattern, repl, flags=0):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.repl = repl
+
+    def apply(self, script, profile=None):
+        if profile is None:
+            return self.regex.sub(self.repl, script)
+
+        changed = 0
+        repl = self.repl
+
+        def counting_repl(m):
+            nonlocal changed
+            new = repl(m) if callable(repl) else m.expand(repl)
+            old = m.group(0)
+            if new != old:
+                changed += max(len(old), len(new))
+            return new
+
+        start = time.perf_counter()
+        script, subs = self.regex.subn(counting_repl, script)
+        profile.record(self.name, time.perf_counter() - start, subs, changed)
+        return script
+
+
+class FuncRule:
+    """A named rewrite implemented as a function (balanced parsers, line filters, batch splitting)."""
+
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+
+    def apply(self, script, profile=None):
+        if profile is None:
+            return self.func(script)
+
+        start = time.perf_counter()
+        new = self.func(script)
+        elapsed = time.perf_counter() - start
+        changed = _changed_span(script, new)
+        profile.record(self.name, elapsed, 1 if changed else 0, changed)
+        return new
+
+
+def run_rules(script, rules, profile=None):
+    for rule in rules:
+        script = rule.apply(script, profile)
+    return script
+
+
+def match_parens(script, opens):
+    """
+    One pass over the parentheses and commas of `script`. For every index in
+    `opens` (positions of '(') returns {open: (close, commas)}: the index of
+    the matching ')' (-1 if it is never closed) and the commas directly inside
+    that pair. Like the balanced scanners it replaces, the pass does not skip
+    string literals or comments.
+    """
+    result = {}
+    if not opens:
+        return result
+    opens = set(opens)
+    stack = []
+    for m in _PAREN_RE.finditer(script):
+        char, pos = m.group(), m.start()
+        if char == '(':
+            stack.append(pos)
+            if pos in opens:
+                result[pos] = (-1, [])
+        elif not stack:
+            continue
+        elif char == ')':
+            open_pos = stack.pop()
+            if open_pos in result:
+                result[open_pos] = (pos, result[open_pos][1])
+        elif stack[-1] in result:
+            result[stack[-1]][1].append(pos)
+    return result
+
+
+def _changed_span(old, new):
+    """Length of the region that differs between two strings (common prefix/suffix excluded)."""
+    if old == new:
+        return 0
+    limit = min(len(old), len(new))
+    # Binary search on slice equality keeps the comparisons in C
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+    lo, hi = 0, limit - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return max(len(old), len(new)) - prefix - lo
+
+
+class RuleProfile:
+    """
+    Per-rule statistics collected while sanitizing: calls, wall time,
+    substitutions and characters changed. One instance can be passed to
+    several sanitize() calls (e.g. every group of a streamed file) to
+    accumulate totals.
+
+    For regex rules `subs` counts matches and `chars` the length of each
+    rewritten span (the longer of old and new text). Function rules count
+    one substitution per call that changed the script.
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    def _entry(self, name):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = {"calls": 0, "seconds": 0.0, "subs": 0, "chars": 0}
+        return entry
+
+    def record(self, name, seconds, subs, chars):
+        entry = self._entry(name)
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["subs"] += subs
+        entry["chars"] += chars
+
+    def merge(self, other):
+        for name, theirs in other.stats.items():
+            entry = self._entry(name)
+            for key, value in theirs.items():
+                entry[key] += value
+
+    def report(self):
+        """List of {name, calls, seconds, subs, chars} dicts, slowest rule first."""
+        rows = [dict(name=name, **entry) for name, entry in self.stats.items()]
+        rows.sort(key=lambda r: r["seconds"], reverse=True)
+        return rows
+
+    def dead_rules(self):
+        """Names of rules that ran but never matched."""
+        return [name for name, entry in self.stats.items() if entry["subs"] == 0]
+
+    def format(self, limit=None):
+        rows = self.report()
+        if limit:
+            rows = rows[:limit]
+        total = sum(entry["seconds"] for entry in self.stats.values())
+        lines = [f"{'rule':<32} {'calls':>7} {'ms':>10} {'%':>6} {'subs':>9} {'chars':>11}"]
+        for r in rows:
+            share = (r["seconds"] / total * 100) if total else 0.0
+            lines.append(f"{r['name']:<32} {r['calls']:>7} {r['seconds'] * 1000:>10.1f} {share:>6.1f} {r['subs']:>9} {r['chars']:>11}")
+        lines.append(f"{'total':<32} {'':>7} {total * 1000:>10.1f}")
+        return '\n'.join(lines)
@@ -1,70 +1,25 @@
 import re
+from .sanitizer_rules import Rule, FuncRule, run_rules, match_parens
 
 class SchemaSanitizerRules:
-    @staticmethod
-    def apply(script):
-        # 0. Remove Constraints FIRST (to avoid syntax cleanup corrupting literals like '[FM]')
-        script = SchemaSanitizerRules._clean_check_constraints(script)
+    # Bracketed T-SQL type names that SQLite should see unquoted
+    TYPE_LIST = ["int", "nvarchar", "datetime", "image", "ntext", "money", "smallint", "real", "bit", "tinyint", "float", "decimal", "char", "varchar", "date", "time"]
 
-        # 1. Clean up Syntax
-        script = re.sub(r'\[\w+\]\.\[(\w+)\]', r'[\1]', script)
-        script = re.sub(r'\[\w+\]\.(\w+)', r'"\1"', script) 
-        script = re.sub(r'\b\w+\.\[(\w+)\]', r'[\1]', script)
-        script = re.sub(r'\[\w+\]\.\[\w+\]\.\[(\w+)\]', r'[\1]', script)
-        script = re.sub(r'\[(\w+)\]', r'"\1"', script)
-        script = re.sub(r'"dbo"\."(\w+)"', r'"\1"', script)
-        
-        # 2. Types
-        type_list = ["int", "nvarchar", "datetime", "image", "ntext", "money", "smallint", "real", "bit", "tinyint", "float", "decimal", "char", "varchar", "date", "time"]
-        for t in type_list:
-            script = re.sub(f'"{t}"', t, script, flags=re.IGNORECASE)
-            
-        script = re.sub(r'(?i)\bGEOMETRY\b', 'TEXT', script)
-        script = re.sub(r'(?i)\bGEOGRAPHY\b', 'TEXT', script)
-        script = re.sub(r'(?i)\bHIERARCHYID\b', 'TEXT', script)
-        script = re.sub(r'(?i)N?VARCHAR\s*\(\s*MAX\s*\)', 'TEXT', script)
-        script = re.sub(r'(?i)VARBINARY\s*\(\s*MAX\s*\)', 'BLOB', script)
-        
-        # 3. Table Options
-        script = re.sub(r'(?i)\)\s*ENGINE.*?;', ');', script)
-        script = re.sub(r'(?i)\s+AUTO_INCREMENT\b', '', script)
-        script = re.sub(r'(?i)\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP', '', script)
-        script = re.sub(r'(?i)\b(NON)?CLUSTERED\b', '', script)
-        script = re.sub(r'(?i)CHECK\s+CONSTRAINT\s+\[.*?\]', '', script)
-        script = re.sub(r'(?i)\bWITH\s*\(.*?\)', '', script)
-        script = re.sub(r'(?i)\)\s*ON\s+("PRIMARY"|\[PRIMARY\]|PRIMARY)', ')', script)
-        
-        # Remove GENERATED ALWAYS AS ROW START/END
-        script = re.sub(r'(?i)\bGENERATED\s+ALWAYS\s+AS\s+ROW\s+(START|END)\b', '', script)
-        # Remove NEXT VALUE FOR defaults
-        script = re.sub(r'(?i)DEFAULT\s*\(\s*NEXT\s+VALUE\s+FOR\s+.*?\)', '', script)
+    # CHECK (...) bodies SQLite cannot evaluate, removed by the balanced parser
+    CHECK_PATTERNS = (
+        r'(?:\[FM\]|\"FM\")',          # [FM] patterns
+        r'LIKE\s*[\'\"].*?\[.*?\]',    # other LIKE '...[...]' patterns (e.g. range checks)
+    )
 
-        # 4. Keys/Indexes/Constraints
-        script = SchemaSanitizerRules._clean_create_statements(script)
-        script = SchemaSanitizerRules._clean_drop_statements(script)
-        # _clean_check_constraints moved to top
-        
-        # 5. Final Syntax Cleanup (Dangling commas after removals)
-        script = re.sub(r',(\s*\))', r'\1', script)
-        script = re.sub(r',(\s*;)', r'\1', script)
-        
-        # Fix potential double closing parens artifacts
-        # script = re.sub(r'\)\s*[\r\n]+\s*\);', ');', script)
-        
-        
-        # Remove computed columns: "ColumnName AS (Expression) [PERSISTED]"
-        script = re.sub(r'(?i)\bAS\s+\(.*?\)(\s+PERSISTED)?(?=\s*,|\s*$)', '', script, flags=re.MULTILINE)
+    # One character of a constraint name
+    _NAME_CHAR = re.compile(r'[\w\[\]"\'`]')
 
-        # Remove INCLUDE (...) from indexes
-        script = re.sub(r'(?i)\bINCLUDE\s*\(.*?\)', '', script)
-        
-        # Remove ALTER TABLE ... NOCHECK CONSTRAINT ALL (T-SQL specific)
-        script = re.sub(r'(?i)ALTER\s+TABLE\s+.*?\s+(NOCHECK|CHECK)\s+CONSTRAINT\s+ALL\s*;?', '', script)
-        
-        return script
+    @staticmethod
+    def apply(script, profile=None):
+        return run_rules(script, SchemaSanitizerRules.RULES, profile)
 
     @staticmethod
-    def _clean_create_statements(script):
+    def _remove_key_lines(script):
         # Filter lines for unsupported KEYs
         lines = script.split('\n')
         cleaned = []
@@ -73,84 +28,152 @@ class SchemaSanitizerRules:
             if key_pattern.match(line):
                 if 'PRIMARY KEY' not in line.upper() and 'FOREIGN KEY' not in line.upper(): continue
             cleaned.append(line)
-        script = '\n'.join(cleaned)
-        
+        return '\n'.join(cleaned)
+
+    @staticmethod
+    def _replace_create_index(m):
         # Create Index fixes
-        def replace_create_index(m):
-            unique = (m.group(1) or "").strip()
-            if unique: unique += " "
-            idx_name = m.group(2)
-            table_name = m.group(3)
-            cols = m.group(4)
-            table_name = re.sub(r'^("?\[?\w+\]?"?)\.', '', table_name)
-            clean_idx = idx_name.replace('"', '').replace('[', '').replace(']', '')
-            clean_tbl = table_name.replace('"', '').replace('[', '').replace(']', '')
-            if not clean_idx.lower().startswith(clean_tbl.lower()):
-                new_idx_name = f'"{clean_tbl}_{clean_idx}"'
-            else:
-                new_idx_name = idx_name
-            return f"CREATE {unique}INDEX IF NOT EXISTS {new_idx_name} ON {table_name} {cols}"
+        unique = (m.group(1) or "").strip()
+        if unique: unique += " "
+        return SchemaSanitizerRules.format_create_index(unique, m.group(2), m.group(3), m.group(4))
 
-        script = re.sub(r'(?i)CREATE\s+(UNIQUE\s+)?(?:\b(?:NON)?CLUSTERED\s+)?INDEX\s+(?!IF\s+NOT\s+EXISTS\s+)([\w"\[\]]+)\s+ON\s+(.+?)\s*(\(.*?\))', replace_create_index, script)
-        return script
+    @staticmethod
+    def format_create_index(unique, idx_name, table_name, cols):
+        # Index names are global in SQLite, so prefix them with the table name
+        table_name = re.sub(r'^("?\[?\w+\]?"?)\.', '', table_name)
+        clean_idx = idx_name.replace('"', '').replace('[', '').replace(']', '')
+        clean_tbl = table_name.replace('"', '').replace('[', '').replace(']', '')
+        if not clean_idx.lower().startswith(clean_tbl.lower()):
+            new_idx_name = f'"{clean_tbl}_{clean_idx}"'
+        else:
+            new_idx_name = idx_name
+        return f"CREATE {unique}INDEX IF NOT EXISTS {new_idx_name} ON {table_name} {cols}"
 
     @staticmethod
-    def _clean_drop_statements(script):
+    def _replace_drop_table(m):
         # Convert Drop to If Exists
-        script = re.sub(r'(?i)^\s*DROP\s+INDEX\s+[\w"]+\.([\w"]+)', r'DROP INDEX IF EXISTS \1', script, flags=re.MULTILINE)
-        
-        def replace_drop_table(m):
-            tables = m.group(1).split(',')
-            cleaned_tables = [re.sub(r'^("?\[?\w+\]?"?)\.', '', t.strip()) for t in tables]
-            return '; '.join([f'DROP TABLE IF EXISTS {t}' for t in cleaned_tables]) + ';'
-        script = re.sub(r'(?i)^\s*DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(.*?)(?:;|$)', replace_drop_table, script, flags=re.MULTILINE | re.DOTALL)
-        return script
+        tables = m.group(1).split(',')
+        cleaned_tables = [re.sub(r'^("?\[?\w+\]?"?)\.', '', t.strip()) for t in tables]
+        return '; '.join([f'DROP TABLE IF EXISTS {t}' for t in cleaned_tables]) + ';'
 
     @staticmethod
-    def _clean_check_constraints(script):
-        # Remove LIKE '[...]' checks
-        # check_regex ... (Disabled as fragile)
-        # script = re.sub(check_regex, "", script, flags=re.MULTILINE | re.DOTALL)
-        
-        # Remove [FM] patterns via Robust Balanced Parser
-        script = SchemaSanitizerRules.remove_check_with_pattern(script, r'(?:\[FM\]|\"FM\")')
-
-        # Remove other LIKE '[...]' patterns via Parser (e.g. range checks)
-        # Matches: LIKE '...[...]' inside a CHECK block
-        script = SchemaSanitizerRules.remove_check_with_pattern(script, r'LIKE\s*[\'\"].*?\[.*?\]')
-        
-        return script
+    def _constraint_prefix(script, pos):
+        """Start of a 'CONSTRAINT <name>' right before `pos`, or `pos` if there is none."""
+        i = pos
+        while i > 0 and script[i - 1].isspace():
+            i -= 1
+        name_end = i
+        while i > 0 and SchemaSanitizerRules._NAME_CHAR.match(script[i - 1]):
+            i -= 1
+        if i == name_end or i == 0 or not script[i - 1].isspace():
+            return pos
+        while i > 0 and script[i - 1].isspace():
+            i -= 1
+        if i >= 10 and script[i - 10:i].lower() == 'constraint':
+            return i - 10
+        return pos
 
     @staticmethod
     def remove_check_with_pattern(script, pattern_str):
-        # (Copied from original db_manager.py: Robust Balanced Parser)
-        lower_script = script.lower()
-        check_indices = [m.start() for m in re.finditer(r'(?i)\bCHECK\s*\(', script)]
-        
-        for start_pos in reversed(check_indices):
-            open_paren_idx = script.find('(', start_pos)
-            if open_paren_idx == -1: continue
-            depth = 1
-            current = open_paren_idx + 1
-            end_pos = -1
-            while current < len(script):
-                char = script[current]
-                if char == '(': depth += 1
-                elif char == ')': depth -= 1
-                if depth == 0:
-                    end_pos = current + 1
-                    break
-                current += 1
-            if end_pos != -1:
+        """
+        Removes every CHECK (...) whose body matches `pattern_str`, together with a
+        'CONSTRAINT <name>' right before it. Parentheses are matched in one pass
+        and the kept text is joined once at the end, so this is linear in the
+        script size however many constraints it holds.
+        """
+        pattern = re.compile(pattern_str, re.IGNORECASE)
+        checks = [(m.start(), m.end() - 1) for m in re.finditer(r'(?i)\bCHECK\s*\(', script)]
+        parens = match_parens(script, [open_pos for _, open_pos in checks])
+
+        # Innermost first, as a CHECK nested in another is judged on the text left after its own removal
+        removed = []     # (start, end) spans, in descending order of start
+        for start_pos, open_pos in reversed(checks):
+            close = parens[open_pos][0]
+            if close == -1:
+                continue
+            end_pos = close + 1
+            inner = 0
+            while inner < len(removed) and removed[-1 - inner][0] < end_pos:
+                inner += 1
+            if inner:
+                spans = removed[-inner:][::-1]
+                kept, prev = [], start_pos
+                for a, b in spans:
+                    kept.append(script[prev:a])
+                    prev = b
+                kept.append(script[prev:end_pos])
+                block = ''.join(kept)
+            else:
                 block = script[start_pos:end_pos]
-                if re.search(pattern_str, block, re.IGNORECASE):
-                    prefix_remove_start = start_pos
-                    pre_chunk = script[:start_pos]
-                    constraint_match = re.search(r'(?i)CONSTRAINT\s+[\w\[\]"\'`]+\s*$', pre_chunk)
-                    if constraint_match: prefix_remove_start = constraint_match.start()
-                    script = script[:prefix_remove_start] + script[end_pos:]
-        
+            if pattern.search(block):
+                if inner:
+                    del removed[-inner:]
+                removed.append((SchemaSanitizerRules._constraint_prefix(script, start_pos), end_pos))
+
+        if removed:
+            kept, prev = [], 0
+            for a, b in reversed(removed):
+                kept.append(script[prev:a])
+                prev = b
+            kept.append(script[prev:])
+            script = ''.join(kept)
+
         # Remove computed columns: "ColumnName AS (Expression)"
         script = re.sub(r'(?i)\bAS\s+\(.*?\)(?=\s*,|\s*$)', '', script, flags=re.MULTILINE)
         
         return script
+
+    # Applied in order by apply(); names are what RuleProfile reports
+    RULES = (
+        # 0. Remove Constraints FIRST (to avoid syntax cleanup corrupting literals like '[FM]')
+        FuncRule('schema.check_fm', lambda s: SchemaSanitizerRules.remove_check_with_pattern(s, SchemaSanitizerRules.CHECK_PATTERNS[0])),
+        FuncRule('schema.check_like_range', lambda s: SchemaSanitizerRules.remove_check_with_pattern(s, SchemaSanitizerRules.CHECK_PATTERNS[1])),
+
+        # 1. Clean up Syntax
+        Rule('schema.bracket_schema_bracket', r'\[\w+\]\.\[(\w+)\]', r'[\1]'),
+        Rule('schema.bracket_schema_word', r'\[\w+\]\.(\w+)', r'"\1"'),
+        Rule('schema.word_schema_bracket', r'\b\w+\.\[(\w+)\]', r'[\1]'),
+        Rule('schema.three_part_name', r'\[\w+\]\.\[\w+\]\.\[(\w+)\]', r'[\1]'),
+        Rule('schema.brackets_to_quotes', r'\[(\w+)\]', r'"\1"'),
+        Rule('schema.dbo_prefix', r'"dbo"\."(\w+)"', r'"\1"'),
+
+        # 2. Types
+        *(Rule(f'schema.type.{t}', f'"{t}"', t, re.IGNORECASE) for t in TYPE_LIST),
+        Rule('schema.geometry', r'(?i)\bGEOMETRY\b', 'TEXT'),
+        Rule('schema.geography', r'(?i)\bGEOGRAPHY\b', 'TEXT'),
+        Rule('schema.hierarchyid', r'(?i)\bHIERARCHYID\b', 'TEXT'),
+        Rule('schema.varchar_max', r'(?i)N?VARCHAR\s*\(\s*MAX\s*\)', 'TEXT'),
+        Rule('schema.varbinary_max', r'(?i)VARBINARY\s*\(\s*MAX\s*\)', 'BLOB'),
+
+        # 3. Table Options
+        Rule('schema.engine_options', r'(?i)\)\s*ENGINE.*?;', ');'),
+        Rule('schema.auto_increment', r'(?i)\s+AUTO_INCREMENT\b', ''),
+        Rule('schema.on_update_timestamp', r'(?i)\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP', ''),
+        Rule('schema.clustered', r'(?i)\b(NON)?CLUSTERED\b', ''),
+        Rule('schema.check_constraint_name', r'(?i)CHECK\s+CONSTRAINT\s+\[.*?\]', ''),
+        Rule('schema.with_options', r'(?i)\bWITH\s*\(.*?\)', ''),
+        Rule('schema.on_primary', r'(?i)\)\s*ON\s+("PRIMARY"|\[PRIMARY\]|PRIMARY)', ')'),
+        # Remove GENERATED ALWAYS AS ROW START/END
+        Rule('schema.generated_row', r'(?i)\bGENERATED\s+ALWAYS\s+AS\s+ROW\s+(START|END)\b', ''),
+        # Remove NEXT VALUE FOR defaults
+        Rule('schema.next_value_default', r'(?i)DEFAULT\s*\(\s*NEXT\s+VALUE\s+FOR\s+.*?\)', ''),
+
+        # 4. Keys/Indexes/Constraints
+        FuncRule('schema.key_lines', lambda s: SchemaSanitizerRules._remove_key_lines(s)),
+        Rule('schema.create_index', r'(?i)CREATE\s+(UNIQUE\s+)?(?:\b(?:NON)?CLUSTERED\s+)?INDEX\s+(?!IF\s+NOT\s+EXISTS\s+)([\w"\[\]]+)\s+ON\s+(.+?)\s*(\(.*?\))',
+             lambda m: SchemaSanitizerRules._replace_create_index(m)),
+        Rule('schema.drop_index', r'(?i)^\s*DROP\s+INDEX\s+[\w"]+\.([\w"]+)', r'DROP INDEX IF EXISTS \1', re.MULTILINE),
+        Rule('schema.drop_table', r'(?i)^\s*DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(.*?)(?:;|$)',
+             lambda m: SchemaSanitizerRules._replace_drop_table(m), re.MULTILINE | re.DOTALL),
+
+        # 5. Final Syntax Cleanup (Dangling commas after removals)
+        Rule('schema.comma_paren', r',(\s*\))', r'\1'),
+        Rule('schema.comma_semicolon', r',(\s*;)', r'\1'),
+
+        # Remove computed columns: "ColumnName AS (Expression) [PERSISTED]"
+        Rule('schema.computed_column', r'(?i)\bAS\s+\(.*?\)(\s+PERSISTED)?(?=\s*,|\s*$)', '', re.MULTILINE),
+        # Remove INCLUDE (...) from indexes
+        Rule('schema.include', r'(?i)\bINCLUDE\s*\(.*?\)', ''),
+        # Remove ALTER TABLE ... NOCHECK CONSTRAINT ALL (T-SQL specific)
+        Rule('schema.nocheck_constraint_all', r'(?i)ALTER\s+TABLE\s+.*?\s+(NOCHECK|CHECK)\s+CONSTRAINT\s+ALL\s*;?', ''),
+    )
@@ -0,0 +1,992 @@
+import re
+from functools import lru_cache
+from .sql_lexer import tokenize, is_hash_comment, NEWLINE, WHITESPACE, COMMENT, STRING, IDENT, NUMBER, WORD, PUNCT
+from .sanitizer_tsql import TSQLSanitizerRules
+from .sanitizer_schema import SchemaSanitizerRules
+
+
+class TokenSanitizer:
+    """
+    Single-pass alternative to the regex rule chain used by SQLSanitizer.
+
+    The script is tokenized once (see sql_lexer) and every rewrite of
+    TSQLSanitizerRules, SQLSanitizer and SchemaSanitizerRules is applied while
+    walking the token stream left to right, using a small lookahead instead of
+    re-scanning the whole dump for each rule. String literals and comments are
+    atomic tokens, so rules never fire inside them. On real dumps the output
+    matches the regex chain; it only differs where the chain rewrites text
+    inside literals or where one regex accidentally matches across statements.
+    """
+
+    @staticmethod
+    def sanitize(script):
+        script = script.replace('\r\n', '\n').lstrip('\ufeff')
+        return _Rewriter(tokenize(script)).run()
+
+
+_SKIP_PREFIXES = tuple(kw.upper() for kw in TSQLSanitizerRules.SKIP_KEYWORDS)
+
+# Schema step 1 (bracket / schema-qualified identifiers), applied per identifier
+_CHAIN_RULES = (
+    (re.compile(r'\[\w+\]\.\[(\w+)\]'), r'[\1]'),
+    (re.compile(r'\[\w+\]\.(\w+)'), r'"\1"'),
+    (re.compile(r'\b\w+\.\[(\w+)\]'), r'[\1]'),
+    (re.compile(r'\[\w+\]\.\[\w+\]\.\[(\w+)\]'), r'[\1]'),
+    (re.compile(r'\[(\w+)\]'), r'"\1"'),
+    (re.compile(r'"dbo"\."(\w+)"'), r'"\1"'),
+)
+_TYPE_RE = re.compile('"(' + '|'.join(SchemaSanitizerRules.TYPE_LIST) + ')"', re.IGNORECASE)
+_SPATIAL_RE = re.compile(r'(?i)\b(?:GEOMETRY|GEOGRAPHY|HIERARCHYID)\b')
+_ALIAS_PART_RE = re.compile(r'[a-zA-Z0-9_"\.\[\]]+\Z')
+_CONSTRAINT_NAME_RE = re.compile(r'[\w\[\]"\'`]+\Z')
+_INDEX_NAME_RE = re.compile(r'[\w"\[\]]+\Z')
+_DROP_INDEX_RE = re.compile(r'[\w"]+\.([\w"]+)\Z')
+_SCHEMA_PREFIX_RE = re.compile(r'^("?\[?\w+\]?"?)\.')
+_CHECK_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in SchemaSanitizerRules.CHECK_PATTERNS)
+_FRAGMENT_WORDS = frozenset(f for f in TSQLSanitizerRules.FRAGMENTS if ' ' not in f)
+
+
+@lru_cache(maxsize=8192)
+def _rewrite_identifier(text):
+    for pattern, repl in _CHAIN_RULES:
+        text = pattern.sub(repl, text)
+    text = _TYPE_RE.sub(lambda m: m.group(1).lower(), text)
+    return _SPATIAL_RE.sub('TEXT', text)
+
+
+def _is_int(tok):
+    return tok[0] == NUMBER and tok[1].isdigit()
+
+
+def _is_primary(tok):
+    return tok[1].upper() in ('PRIMARY', '"PRIMARY"', '[PRIMARY]') and tok[0] in (WORD, IDENT)
+
+
+class _TokenStream:
+    """Token iterator with unbounded lookahead and push-back."""
+
+    def __init__(self, tokens):
+        self._it = iter(tokens)
+        self._buf = []
+        self._pos = 0
+
+    def peek(self, i=0):
+        buf = self._buf
+        need = self._pos + i
+        while len(buf) <= need:
+            tok = next(self._it, None)
+            if tok is None:
+                return None
+            buf.append(tok)
+        return buf[need]
+
+    def next(self):
+        if self._pos < len(self._buf):
+            tok = self._buf[self._pos]
+            self._pos += 1
+            if self._pos > 512 and self._pos * 2 > len(self._buf):
+                del self._buf[:self._pos]
+                self._pos = 0
+            return tok
+        return next(self._it, None)
+
+    def take(self, n):
+        return [self.next() for _ in range(n)]
+
+    def skip(self, n):
+        for _ in range(n):
+            self.next()
+
+    def push(self, tokens):
+        self._buf[self._pos:self._pos] = tokens
+
+
+class _Emitter:
+    """
+    Collects output line by line. Blank lines are dropped (as the T-SQL pass
+    does) unless a later-stage rule emptied the line, and a comma that ends up
+    directly before ')' or ';' is removed once that token arrives.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.line = []
+        self.content = False
+        self.keep = False
+        self.comma = None
+        self.lines = 0
+        self.last_char = ''
+        self.prev_ws_tail = False
+
+    def ws(self, text):
+        self.line.append(text)
+
+    def write(self, text):
+        if self.comma is not None and text[0] in ');':
+            buf, idx = self.comma
+            buf[idx] = ''
+        self.comma = None
+        self.line.append(text)
+        self.content = True
+        if text == ',':
+            self.comma = (self.line, len(self.line) - 1)
+        stripped = text.rstrip()
+        if stripped:
+            self.last_char = stripped[-1]
+
+    def newline(self):
+        if self.content or self.keep:
+            if self.lines:
+                self.parts.append('\n')
+            base = len(self.parts)
+            self.parts.extend(self.line)
+            if self.comma is not None and self.comma[0] is self.line:
+                self.comma = (self.parts, base + self.comma[1])
+            tail = ''.join(self.line[-2:])
+            self.prev_ws_tail = bool(tail) and tail[-1] in ' \t\r\f\v'
+            self.lines += 1
+        self.line = []
+        self.content = self.keep = False
+
+    def at_line_start(self):
+        return not self.content
+
+    def keep_line(self):
+        self.keep = True
+
+    def drop_indent(self):
+        if not self.content:
+            self.line = []
+
+    def rstrip(self):
+        while self.line and not self.line[-1].strip():
+            if self.comma is not None and self.comma[0] is self.line and self.comma[1] == len(self.line) - 1:
+                self.comma = None
+            self.line.pop()
+
+    def getvalue(self):
+        self.newline()
+        return ''.join(self.parts)
+
+
+class _Rewriter:
+    def __init__(self, tokens, fragment=False):
+        self.ts = _TokenStream(tokens)
+        self.out = _Emitter()
+        # Fragments (CONVERT arguments, index parts) are rendered on their own
+        # and never start a line or a batch.
+        self.fragment = fragment
+        self.in_insert = False
+        self.jobs_insert = False
+
+    # --- Batches -----------------------------------------------------------
+
+    def run(self):
+        ts, out = self.ts, self.out
+        kept = False
+        while ts.peek(0) is not None:
+            n = self._go_line_length()
+            if n:
+                ts.skip(n)
+                continue
+            head, first_line = self._read_head()
+            ts.push(head)
+            if first_line is None or first_line.strip().upper().startswith(_SKIP_PREFIXES):
+                self._drain_batch()
+                continue
+            if kept:
+                out.write(';')
+                out.newline()
+            kept = True
+            self._rewrite_batch()
+        out.write(';')
+        return out.getvalue()
+
+    def render(self):
+        self._rewrite_batch()
+        return self.out.getvalue()
+
+    def _go_line_length(self):
+        """Number of tokens forming a 'GO' separator line at the current position."""
+        i = self._skip_ws(0, newlines=False)
+        tok = self.ts.peek(i)
+        if tok is None or tok[0] != WORD or tok[1].upper() != 'GO':
+            return 0
+        i = self._skip_ws(i + 1, newlines=False)
+        tok = self.ts.peek(i)
+        if tok == (PUNCT, ';'):
+            i = self._skip_ws(i + 1, newlines=False)
+            tok = self.ts.peek(i)
+        if tok is None or tok[0] == NEWLINE:
+            return i
+        return 0
+
+    def _read_head(self):
+        """
+        Reads a batch up to the end of its first code line. Returns the tokens
+        read and that line's text, or None when the batch has no code at all.
+        """
+        ts = self.ts
+        head = []
+        line_start = True
+        last_comment = None
+        while True:
+            if line_start and self._go_line_length():
+                break
+            tok = ts.next()
+            if tok is None:
+                break
+            head.append(tok)
+            kind, val = tok
+            line_start = kind == NEWLINE
+            if kind in (NEWLINE, WHITESPACE):
+                continue
+            if kind == COMMENT and not is_hash_comment(val):
+                last_comment = val
+                continue
+            line = [val]
+            while ts.peek(0) is not None and ts.peek(0)[0] != NEWLINE:
+                tok = ts.next()
+                head.append(tok)
+                line.append(tok[1])
+            return head, ''.join(line).split('\n')[0]
+        # A batch of comments only is dropped, except when it ends in a
+        # '--' comment (the regex chain cannot strip that one either).
+        if last_comment is not None and last_comment.startswith('--'):
+            return head, last_comment
+        return head, None
+
+    def _drain_batch(self):
+        ts = self.ts
+        while True:
+            tok = ts.next()
+            if tok is None:
+                return
+            if tok[0] == NEWLINE:
+                n = self._go_line_length()
+                if n:
+                    ts.skip(n)
+                    return
+
+    def _rewrite_batch(self):
+        ts, out = self.ts, self.out
+        self.in_insert = self.jobs_insert = False
+        while True:
+            tok = ts.next()
+            if tok is None:
+                return
+            kind = tok[0]
+            if kind == NEWLINE:
+                out.newline()
+                if not self.fragment:
+                    n = self._go_line_length()
+                    if n:
+                        ts.skip(n)
+                        return
+            elif kind == WHITESPACE:
+                out.ws(tok[1])
+            else:
+                self._rewrite_token(kind, tok[1])
+
+    # --- Lookahead helpers ------------------------------------------------
+
+    def _skip_ws(self, i, newlines=True):
+        ts = self.ts
+        while True:
+            tok = ts.peek(i)
+            if tok is None or not (tok[0] == WHITESPACE or (newlines and tok[0] == NEWLINE)):
+                return i
+            i += 1
+
+    def _seq(self, i, *items):
+        """
+        Matches items at lookahead index i, each optionally preceded by
+        whitespace. An item is an upper-case word or punctuation string, a
+        tuple of alternatives, or a predicate on the token. Returns the index
+        just past the match, or None.
+        """
+        for item in items:
+            i = self._skip_ws(i)
+            tok = self.ts.peek(i)
+            if tok is None:
+                return None
+            if callable(item):
+                ok = item(tok)
+            else:
+                if tok[0] not in (WORD, PUNCT):
+                    return None
+                value = tok[1].upper()
+                ok = value == item if isinstance(item, str) else value in item
+            if not ok:
+                return None
+            i += 1
+        return i
+
+    def _find(self, i, value, same_line=True):
+        """Index of the first punctuation token equal to value, or None."""
+        ts = self.ts
+        while True:
+            tok = ts.peek(i)
+            if tok is None or (same_line and tok[0] == NEWLINE):
+                return None
+            if tok == (PUNCT, value):
+                return i
+            i += 1
+
+    def _balanced(self, i):
+        """Given the index of a '(' token, returns the index of its matching ')'."""
+        depth = 0
+        ts = self.ts
+        while True:
+            tok = ts.peek(i)
+            if tok is None:
+                return None
+            if tok[0] == PUNCT:
+                if tok[1] == '(':
+                    depth += 1
+                elif tok[1] == ')':
+                    depth -= 1
+                    if depth == 0:
+                        return i
+            i += 1
+
+    def _on_primary(self, i):
+        """Length of an `ON [PRIMARY]` filegroup clause at index i, or 0."""
+        j = self._seq(i, 'ON')
+        if j is None:
+            return 0
+        k = self._skip_ws(j)
+        tok = self.ts.peek(k)
+        if k > j and tok is not None and _is_primary(tok):
+            return k + 1
+        return 0
+
+    def _line_end(self, i):
+        ts = self.ts
+        while ts.peek(i) is not None and ts.peek(i)[0] != NEWLINE:
+            i += 1
+        return i
+
+    def _line_start(self):
+        return not self.fragment and self.out.at_line_start()
+
+    def _preceded_by_ws(self):
+        line = self.out.line
+        return self.out.content and bool(line) and not line[-1].strip()
+
+    def _emit_tokens(self, tokens):
+        for kind, val in tokens:
+            if kind == NEWLINE:
+                self.out.newline()
+            else:
+                self.out.ws(val)
+
+    @staticmethod
+    def _render(tokens):
+        return _Rewriter(tokens, fragment=True).render()
+
+    # --- Dispatch ---------------------------------------------------------
+
+    def _rewrite_token(self, kind, val):
+        out = self.out
+        if kind == WORD:
+            handler = _WORD_HANDLERS.get(val.upper())
+            if handler is not None and handler(self, val):
+                return
+            nxt = self.ts.peek(0)
+            if val == 'N' and nxt is not None and nxt[0] == STRING:
+                return  # N'...' -> '...'
+            if nxt == (PUNCT, '.'):
+                after = self.ts.peek(1)
+                if after is not None and after[0] == IDENT:
+                    self._on_identifier(val)
+                    return
+            out.write(val)
+        elif kind == IDENT:
+            self._on_identifier(val)
+        elif kind == NUMBER:
+            nxt = self.ts.peek(0)
+            if val[:2] in ('0x', '0X') and not (nxt is not None and nxt[0] in (WORD, NUMBER)):
+                val = f"X'{val[2:]}'"
+            out.write(val)
+        elif kind == COMMENT:
+            if is_hash_comment(val) and self._line_start():
+                out.keep_line()
+                return
+            out.write(val)
+        elif kind == PUNCT:
+            self._on_punct(val)
+        else:
+            out.write(val)
+
+    def _on_punct(self, val):
+        out, ts = self.out, self.ts
+        if val == ',':
+            out.write(',')
+            i = self._skip_ws(0)
+            end = self._alias_assign(i)
+            if end is not None:
+                self._emit_tokens(ts.take(i))
+                ts.skip(end - i)
+            return
+        if val == ';':
+            self.in_insert = self.jobs_insert = False
+            out.write(';')
+            return
+        if val == ')':
+            i = self._seq(0, 'ENGINE')
+            if i is not None:
+                j = self._find(i, ';')
+                if j is not None:
+                    ts.skip(j + 1)
+                    out.write(');')
+                    return
+            ts.skip(self._on_primary(0))
+            out.write(')')
+            return
+        if val == '$':
+            # Money literal $123.45 -> 123.45
+            nxt = ts.peek(0)
+            tail = out.line[-1][-1:] if out.line and out.line[-1] else ''
+            if nxt is not None and nxt[0] == NUMBER and nxt[1][0].isdigit() and not (tail.isalnum() or tail == '_'):
+                return
+        if val == '@' and self._line_start():
+            nxt = ts.peek(0)
+            if nxt is not None and nxt[0] == WORD:
+                self._drop_fragment_line()
+                return
+        if val == ':' and self._line_start():
+            nxt = ts.peek(0)
+            if nxt is not None and nxt[0] == WORD and nxt[1].startswith('setvar'):
+                self._drop_fragment_line()
+                return
+        out.write(val)
+
+    def _on_identifier(self, val):
+        ts = self.ts
+        parts = [val]
+        while ts.peek(0) == (PUNCT, '.') and ts.peek(1) is not None and ts.peek(1)[0] in (WORD, IDENT):
+            parts.extend(t[1] for t in ts.take(2))
+        text = _rewrite_identifier(''.join(parts))
+        if text.lower() in ('varchar', 'nvarchar') and self._max_length():
+            text = 'TEXT'
+        self.out.write(text)
+
+    def _max_length(self):
+        """Consumes '(MAX)' if it comes next."""
+        i = self._seq(0, '(', 'MAX', ')')
+        if i is None:
+            return False
+        self.ts.skip(i)
+        return True
+
+    def _alias_assign(self, i):
+        """Matches `name =` at index i (SELECT col = expr); returns the index after it."""
+        ts = self.ts
+        j = i
+        while True:
+            tok = ts.peek(j)
+            if tok is None or tok[0] not in (WORD, NUMBER, IDENT, PUNCT) or not _ALIAS_PART_RE.match(tok[1]):
+                break
+            j += 1
+        if j == i:
+            return None
+        j = self._skip_ws(j)
+        if ts.peek(j) != (PUNCT, '='):
+            return None
+        return self._skip_ws(j + 1)
+
+    def _drop_fragment_line(self):
+        """Drops the rest of the line up to (not including) ';' or the newline."""
+        ts = self.ts
+        self.out.drop_indent()
+        while True:
+            tok = ts.peek(0)
+            if tok is None or tok[0] == NEWLINE or tok == (PUNCT, ';'):
+                return True
+            ts.next()
+
+    def _drop_statement_line(self, i):
+        """Drops a whole `... ;` statement on this line, leaving the line blank."""
+        j = self._find(i, ';')
+        if j is None:
+            return False
+        self.out.drop_indent()
+        self.out.keep_line()
+        self.ts.skip(j + 1)
+        return True
+
+    # --- Word handlers ----------------------------------------------------
+
+    def _on_insert(self, val):
+        ts, out = self.ts, self.out
+        self.in_insert = True
+        self.jobs_insert = False
+        i = self._skip_ws(0)
+        tok = ts.peek(i)
+        if i == 0 or tok is None:
+            return False
+        if tok[0] == WORD and tok[1].upper() == 'INTO':
+            add_into = False
+            target = self._skip_ws(i + 1)
+        elif tok[0] == WORD or (tok[0] == IDENT and tok[1][0] in '["' and re.fullmatch(r'.[\w\s]+.', tok[1])):
+            add_into = True
+            target = i
+        else:
+            return False
+        table = ts.peek(target)
+        if table is not None and table[0] == WORD and table[1].lower() == 'jobs':
+            k = self._seq(target + 1, ('VALUES', 'VALUE'))
+            self.jobs_insert = k is not None and self._seq(k, '(') is not None
+        if add_into and self._line_start():
+            out.drop_indent()
+        if self._line_start() and out.lines and (out.last_char != ';' or out.prev_ws_tail):
+            out.write('; ')
+        if add_into:
+            out.write('INSERT INTO')
+            out.ws(' ')
+            ts.skip(i)
+        else:
+            out.write(val)
+        return True
+
+    def _on_value(self, val):
+        if not self.in_insert:
+            return False
+        i = self._seq(0, '(')
+        if i is None:
+            return False
+        if val == 'VALUE':
+            val = 'VALUES'
+        elif val == 'value':
+            val = 'values'
+        elif val.upper() == 'VALUE':
+            return False
+        self.out.write(val)
+        if self.jobs_insert:
+            self.jobs_insert = False
+            self._emit_tokens(self.ts.take(i - 1))
+            self.ts.next()
+            self.out.write('(')
+            self.out.write('NULL')
+            self.out.write(',')
+            self.out.ws(' ')
+        return True
+
+    def _on_row(self, val):
+        i = self._seq(0, '(')
+        if i is None:
+            return False
+        self.ts.skip(i - 1)
+        return True
+
+    def _on_getdate(self, val):
+        i = self._seq(0, '(', ')')
+        if i is None:
+            return False
+        self.ts.skip(i)
+        self.out.write('CURRENT_TIMESTAMP')
+        return True
+
+    def _on_newid(self, val):
+        i = self._seq(0, '(', ')')
+        if i is None:
+            return False
+        self.ts.skip(i)
+        self.out.write(TSQLSanitizerRules.NEWID_SQL)
+        return True
+
+    def _on_identity(self, val):
+        i = self._seq(0, '(', _is_int, ',', _is_int, ')')
+        if i is not None:
+            self.ts.skip(i)
+        return True
+
+    def _on_drop_word(self, val):
+        return True
+
+    def _on_with(self, val):
+        ts = self.ts
+        if self._line_start() and self._seq(0, ('LOG', 'NOWAIT')) is not None:
+            return self._drop_fragment_line()
+        i = self._seq(0, 'ROLLUP')
+        if i is not None:
+            ts.skip(i)
+            return True
+        i = self._seq(0, '(', 'SYSTEM_VERSIONING', '=', 'ON')
+        if i is not None:
+            j = self._find(i, ';', same_line=False)
+            if j is not None:
+                ts.skip(j)
+                return True
+        i = self._seq(0, '(')
+        if i is not None:
+            j = self._find(i, ')')
+            if j is not None:
+                ts.skip(j + 1)
+                self.out.keep_line()
+                # `) WITH (...) ON [PRIMARY]` collapses to `)` once WITH is gone
+                n = self._on_primary(0)
+                if n and self.out.last_char == ')':
+                    self.out.rstrip()
+                    ts.skip(n)
+                return True
+        return False
+
+    def _on_period(self, val):
+        i = self._seq(0, 'FOR', 'SYSTEM_TIME', '(')
+        if i is None:
+            return False
+        j = self._find(i, ')', same_line=False)
+        if j is None:
+            return False
+        self.ts.skip(j + 1)
+        return True
+
+    def _on_convert(self, val):
+        ts = self.ts
+        i = self._seq(0, '(')
+        if i is None:
+            return False
+        end = self._balanced(i - 1)
+        if end is None:
+            return False
+        args, depth, current = [], 0, []
+        for k in range(i, end):
+            tok = ts.peek(k)
+            if tok[0] == PUNCT:
+                if tok[1] == '(':
+                    depth += 1
+                elif tok[1] == ')':
+                    depth -= 1
+                elif tok[1] == ',' and depth == 0:
+                    args.append(current)
+                    current = []
+                    continue
+            current.append(tok)
+        args.append(current)
+        if len(args) < 2:
+            return False
+        target_type = ''.join(t[1] for t in args[0]).strip()
+        if target_type.lower() == 'xml':
+            target_type = 'TEXT'
+        else:
+            target_type = self._render(args[0]).strip()
+        expr = self._render(args[1]).strip()
+        ts.skip(end + 1)
+        self.out.write(f"CAST({expr} AS {target_type})")
+        return True
+
+    def _on_select(self, val):
+        ts = self.ts
+        i = self._skip_ws(0)
+        end = self._alias_assign(i) if i > 0 else None
+        self.out.write(val)
+        if end is not None:
+            self._emit_tokens(ts.take(i))
+            ts.skip(end - i)
+        return True
+
+    def _on_fragment(self, val):
+        if not self._line_start():
+            return False
+        return self._drop_fragment_line()
+
+    def _on_as(self, val):
+        if self._line_start():
+            return self._drop_fragment_line()
+        # Computed column: `AS (expr) [PERSISTED]` followed by ',' or end of line
+        ts = self.ts
+        if ts.peek(0) is None or ts.peek(0)[0] != WHITESPACE:
+            return False
+        i = self._seq(0, '(')
+        if i is None:
+            return False
+        k = i
+        while True:
+            tok = ts.peek(k)
+            if tok is None or tok[0] == NEWLINE:
+                return False
+            if tok == (PUNCT, ')'):
+                end = k + 1
+                p = self._seq(end, 'PERSISTED')
+                for stop in ((p, end) if p is not None else (end,)):
+                    j = self._skip_ws(stop, newlines=False)
+                    nxt = ts.peek(j)
+                    if nxt is None or nxt[0] == NEWLINE or nxt == (PUNCT, ','):
+                        ts.skip(stop)
+                        self.out.keep_line()
+                        return True
+            k += 1
+
+    def _on_use(self, val):
+        if not self._line_start() or self.ts.peek(0) is None or self.ts.peek(0)[0] != WHITESPACE:
+            return False
+        return self._drop_statement_line(0)
+
+    def _on_lock(self, val):
+        if not self._line_start():
+            return False
+        i = self._seq(0, 'TABLES')
+        return i is not None and self._drop_statement_line(i)
+
+    def _on_create(self, val):
+        if self._line_start() and self._seq(0, 'DATABASE') is not None:
+            return self._drop_statement_line(0)
+        return self._create_index(val)
+
+    def _create_index(self, val):
+        ts = self.ts
+        i = self._skip_ws(0)
+        unique = ''
+        tok = ts.peek(i)
+        if tok is not None and tok[0] == WORD and tok[1].upper() == 'UNIQUE':
+            unique = tok[1] + ' '
+            i = self._skip_ws(i + 1)
+        tok = ts.peek(i)
+        if tok is not None and tok[0] == WORD and tok[1].upper() in ('CLUSTERED', 'NONCLUSTERED'):
+            i = self._skip_ws(i + 1)
+        tok = ts.peek(i)
+        if tok is None or tok[0] != WORD or tok[1].upper() != 'INDEX':
+            return False
+        i = self._skip_ws(i + 1)
+        if self._seq(i, 'IF', 'NOT', 'EXISTS') is not None:
+            return False
+        name = ts.peek(i)
+        if name is None or name[0] not in (WORD, IDENT):
+            return False
+        on = self._seq(i + 1, 'ON')
+        if on is None:
+            return False
+        t_start = self._skip_ws(on)
+        t_end = self._find(t_start, '(')
+        if t_end is None or t_end == t_start:
+            return False
+        c_end = self._find(t_end, ')')
+        if c_end is None:
+            return False
+        name_text = self._render([name])
+        if not _INDEX_NAME_RE.match(name_text):
+            return False
+        table = self._render([ts.peek(k) for k in range(t_start, t_end)]).strip()
+        cols = self._render([ts.peek(k) for k in range(t_end, c_end + 1)])
+        ts.skip(c_end + 1)
+        self.out.write(SchemaSanitizerRules.format_create_index(unique, name_text, table, cols))
+        return True
+
+    def _on_drop(self, val):
+        if not self._line_start():
+            return False
+        ts, out = self.ts, self.out
+        if self._seq(0, 'DATABASE') is not None:
+            return self._drop_statement_line(0)
+        i = self._seq(0, 'INDEX')
+        if i is not None:
+            j = self._skip_ws(i)
+            parts = [ts.peek(j + k) for k in range(3)]
+            if None in parts or parts[1] != (PUNCT, '.'):
+                return False
+            m = _DROP_INDEX_RE.match(self._render(parts))
+            if m is None:
+                return False
+            out.drop_indent()
+            ts.skip(j + 3)
+            out.write(f'DROP INDEX IF EXISTS {m.group(1)}')
+            return True
+        i = self._seq(0, 'TABLE')
+        if i is None:
+            return False
+        k = self._seq(i, 'IF', 'EXISTS')
+        start = self._skip_ws(k if k is not None else i)
+        end = start
+        while ts.peek(end) is not None and ts.peek(end)[0] != NEWLINE and ts.peek(end) != (PUNCT, ';'):
+            end += 1
+        tables = self._render([ts.peek(n) for n in range(start, end)]).split(',')
+        if ts.peek(end) == (PUNCT, ';'):
+            end += 1
+        ts.skip(end)
+        out.drop_indent()
+        cleaned = [_SCHEMA_PREFIX_RE.sub('', t.strip()) for t in tables]
+        out.write('; '.join(f'DROP TABLE IF EXISTS {t}' for t in cleaned) + ';')
+        return True
+
+    def _on_constraint(self, val):
+        ts = self.ts
+        i = self._skip_ws(0)
+        name = ts.peek(i)
+        if i > 0 and name is not None and _CONSTRAINT_NAME_RE.match(name[1]):
+            paren = self._seq(i + 1, 'CHECK', '(')
+            if paren is not None and self._remove_check(self._skip_ws(i + 1), paren - 1):
+                return True
+        return self._key_line(val)
+
+    def _on_key(self, val):
+        upper = val.upper()
+        if upper == 'UNIQUE':
+            ok = self._seq(0, ('KEY', 'INDEX', 'CONSTRAINT')) is not None
+        elif upper == 'FULLTEXT':
+            ok = self._seq(0, 'KEY') is not None
+        else:
+            ok = self.ts.peek(0) is not None and self.ts.peek(0)[0] in (WHITESPACE, NEWLINE)
+        return ok and self._key_line(val)
+
+    def _key_line(self, val):
+        """Drops index / constraint lines inside CREATE TABLE unless they define a PK or FK."""
+        if not self._line_start():
+            return False
+        ts = self.ts
+        end = self._line_end(0)
+        text = (val + ''.join(ts.peek(k)[1] for k in range(end))).upper()
+        if 'PRIMARY KEY' in text or 'FOREIGN KEY' in text:
+            return False
+        self.out.drop_indent()
+        ts.skip(end)
+        return True
+
+    def _on_check(self, val):
+        ts = self.ts
+        i = self._seq(0, 'CONSTRAINT')
+        if i is not None:
+            # CHECK CONSTRAINT [name with spaces] (plain [name] is already quoted)
+            j = self._skip_ws(i)
+            tok = ts.peek(j)
+            if j > i and tok is not None and tok[0] == IDENT and tok[1].startswith('[') \
+                    and not re.fullmatch(r'\[\w+\]', tok[1]):
+                ts.skip(j + 1)
+                self.out.keep_line()
+                return True
+        paren = self._seq(0, '(')
+        return paren is not None and self._remove_check(0, paren - 1, prefix=val)
+
+    def _remove_check(self, check, paren, prefix=''):
+        """
+        Drops a CHECK (...) block, together with everything read before it
+        (e.g. its CONSTRAINT name), when its body matches one of the
+        CHECK_PATTERNS. `check` and `paren` are lookahead indexes of the block
+        start and of its opening parenthesis.
+        """
+        ts = self.ts
+        end = self._balanced(paren)
+        if end is None:
+            return False
+        block = prefix + ''.join(ts.peek(k)[1] for k in range(check, end + 1))
+        if not any(p.search(block) for p in _CHECK_PATTERNS):
+            return False
+        ts.skip(end + 1)
+        self.out.keep_line()
+        return True
+
+    def _on_spatial(self, val):
+        self.out.write('TEXT')
+        return True
+
+    def _on_varchar(self, val):
+        if not self._max_length():
+            return False
+        self.out.write('BLOB' if val.upper() == 'VARBINARY' else 'TEXT')
+        return True
+
+    def _on_auto_increment(self, val):
+        if not self._preceded_by_ws():
+            return False
+        self.out.rstrip()
+        return True
+
+    def _on_on(self, val):
+        if not self._preceded_by_ws():
+            return False
+        i = self._seq(0, 'UPDATE', 'CURRENT_TIMESTAMP')
+        if i is None:
+            return False
+        self.out.rstrip()
+        self.ts.skip(i)
+        return True
+
+    def _on_generated(self, val):
+        i = self._seq(0, 'ALWAYS', 'AS', 'ROW', ('START', 'END'))
+        if i is None:
+            return False
+        self.ts.skip(i)
+        return True
+
+    def _on_default(self, val):
+        i = self._seq(0, '(', 'NEXT', 'VALUE', 'FOR')
+        if i is None:
+            return False
+        j = self._find(i, ')')
+        if j is None:
+            return False
+        self.ts.skip(j + 1)
+        self.out.keep_line()
+        return True
+
+    def _on_include(self, val):
+        i = self._seq(0, '(')
+        if i is None:
+            return False
+        j = self._find(i, ')')
+        if j is None:
+            return False
+        self.ts.skip(j + 1)
+        self.out.keep_line()
+        return True
+
+    def _on_alter(self, val):
+        ts = self.ts
+        i = self._seq(0, 'TABLE')
+        if i is None:
+            return False
+        end = self._line_end(i)
+        for k in range(i + 1, end):
+            tok = ts.peek(k)
+            if tok[0] == WORD and tok[1].upper() in ('NOCHECK', 'CHECK') and ts.peek(k - 1)[0] == WHITESPACE:
+                j = self._seq(k + 1, 'CONSTRAINT', 'ALL')
+                if j is not None:
+                    semi = self._seq(j, ';')
+                    ts.skip(semi if semi is not None else j)
+                    self.out.keep_line()
+                    return True
+        return False
+
+
+_WORD_HANDLERS = {
+    'INSERT': _Rewriter._on_insert,
+    'VALUE': _Rewriter._on_value,
+    'VALUES': _Rewriter._on_value,
+    'ROW': _Rewriter._on_row,
+    'GETDATE': _Rewriter._on_getdate,
+    'NEWID': _Rewriter._on_newid,
+    'IDENTITY': _Rewriter._on_identity,
+    'CLUSTERED': _Rewriter._on_drop_word,
+    'NONCLUSTERED': _Rewriter._on_drop_word,
+    'WITH': _Rewriter._on_with,
+    'PERIOD': _Rewriter._on_period,
+    'CONVERT': _Rewriter._on_convert,
+    'SELECT': _Rewriter._on_select,
+    'AS': _Rewriter._on_as,
+    'USE': _Rewriter._on_use,
+    'LOCK': _Rewriter._on_lock,
+    'UNLOCK': _Rewriter._on_lock,
+    'CREATE': _Rewriter._on_create,
+    'DROP': _Rewriter._on_drop,
+    'CONSTRAINT': _Rewriter._on_constraint,
+    'KEY': _Rewriter._on_key,
+    'INDEX': _Rewriter._on_key,
+    'UNIQUE': _Rewriter._on_key,
+    'FULLTEXT': _Rewriter._on_key,
+    'CHECK': _Rewriter._on_check,
+    'GEOMETRY': _Rewriter._on_spatial,
+    'GEOGRAPHY': _Rewriter._on_spatial,
+    'HIERARCHYID': _Rewriter._on_spatial,
+    'VARCHAR': _Rewriter._on_varchar,
+    'NVARCHAR': _Rewriter._on_varchar,
+    'VARBINARY': _Rewriter._on_varchar,
+    'AUTO_INCREMENT': _Rewriter._on_auto_increment,
+    'ON': _Rewriter._on_on,
+    'GENERATED': _Rewriter._on_generated,
+    'DEFAULT': _Rewriter._on_default,
+    'INCLUDE': _Rewriter._on_include,
+    'ALTER': _Rewriter._on_alter,
+}
+for _word in _FRAGMENT_WORDS - set(_WORD_HANDLERS):
+    _WORD_HANDLERS[_word] = _Rewriter._on_fragment
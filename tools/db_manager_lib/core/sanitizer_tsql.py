@@ -1,8 +1,34 @@
+import bisect
 import re
+from .sanitizer_rules import Rule, FuncRule, run_rules, match_parens
 
 class TSQLSanitizerRules:
+    SKIP_KEYWORDS = (
+        'CREATE TRIGGER', 'CREATE PROCEDURE', 'CREATE PROC', 
+        'CREATE FUNCTION', 'ALTER TRIGGER', 'ALTER PROCEDURE', 
+        'CREATE FUNCTION', 'ALTER TRIGGER', 'ALTER PROCEDURE', 
+        'ALTER PROC', 'ALTER FUNCTION', 'CREATE VIEW', 'CREATE SCHEMA', 'CREATE SEQUENCE',
+        'CREATE ROLE', 'CREATE SECURITY POLICY', 'CREATE TYPE', 'ALTER TABLE',
+        'IF ', 'IF(', 'ELSE', 'WHILE ', 'UPDATE STATISTICS',
+        'GRANT ', 'REVOKE ', 'DENY ', 'SET ', 'DECLARE ', 
+        'PRINT ', 'RAISERROR', 'CHECKPOINT', 'DBCC ', 
+        'USE ', 'BACKUP ', 'RESTORE ', 'DISK ', 'ALTER DATABASE',
+        'DROP DATABASE', 'CREATE DATABASE', 'DROP PROC', 'DROP PROCEDURE',
+        'DROP TRIGGER', 'DROP FUNCTION', 'SELECT @', 'EXEC ', 'EXECUTE '
+    )
+
+    # Leftover control-flow lines that survive batch skipping
+    FRAGMENTS = ('BEGIN', 'END', 'AS', 'ELSE', 'WITH LOG', 'WITH NOWAIT')
+
+    # SQLite has no NEWID(); build a random v4 UUID string instead
+    NEWID_SQL = '(lower(hex(randomblob(4))) || "-" || lower(hex(randomblob(2))) || "-4" || substr(lower(hex(randomblob(2))),2) || "-" || substr("89ab",abs(random()) % 4 + 1, 1) || substr(lower(hex(randomblob(2))),2) || "-" || lower(hex(randomblob(6))))'
+
+    @staticmethod
+    def apply(script, profile=None):
+        return run_rules(script, TSQLSanitizerRules.RULES, profile)
+
     @staticmethod
-    def apply(script):
+    def _split_batches(script):
         # 0. Normalize line endings
         script = script.replace('\r\n', '\n').lstrip('\ufeff')
         
@@ -10,140 +36,135 @@ class TSQLSanitizerRules:
         batches = re.split(r'(?im)^\s*GO\s*;?\s*$', script)
         cleaned_batches = []
         
-        skip_keywords = (
-            'CREATE TRIGGER', 'CREATE PROCEDURE', 'CREATE PROC', 
-            'CREATE FUNCTION', 'ALTER TRIGGER', 'ALTER PROCEDURE', 
-            'CREATE FUNCTION', 'ALTER TRIGGER', 'ALTER PROCEDURE', 
-            'ALTER PROC', 'ALTER FUNCTION', 'CREATE VIEW', 'CREATE SCHEMA', 'CREATE SEQUENCE',
-            'CREATE ROLE', 'CREATE SECURITY POLICY', 'CREATE TYPE', 'ALTER TABLE',
-            'IF ', 'IF(', 'ELSE', 'WHILE ', 'UPDATE STATISTICS',
-            'GRANT ', 'REVOKE ', 'DENY ', 'SET ', 'DECLARE ', 
-            'PRINT ', 'RAISERROR', 'CHECKPOINT', 'DBCC ', 
-            'USE ', 'BACKUP ', 'RESTORE ', 'DISK ', 'ALTER DATABASE',
-            'DROP DATABASE', 'CREATE DATABASE', 'DROP PROC', 'DROP PROCEDURE',
-            'DROP TRIGGER', 'DROP FUNCTION', 'SELECT @', 'EXEC ', 'EXECUTE '
-        )
-        
         for batch in batches:
-            trimmed_content = batch.strip()
-            if not trimmed_content:
-                continue
-            
-            # Remove leading comments to find meaningful code start
-            # (Matches both -- and /* */ style comments at the START of the batch)
-            code_start = trimmed_content
-            while True:
-                last_start = code_start
-                # Remove -- style
-                code_start = re.sub(r'^--.*?\n', '', code_start).strip()
-                # Remove /* */ style
-                code_start = re.sub(r'^/\*.*?\*/', '', code_start, flags=re.DOTALL).strip()
-                if code_start == last_start:
-                    break
-            
-            if not code_start:
-                continue
-                
-            first_line = code_start.split('\n')[0].strip().upper()
-            
-            should_skip = False
-            for kw in skip_keywords:
-                if first_line.startswith(kw.upper()):
-                    should_skip = True
-                    break
-            
-            if should_skip:
+            if TSQLSanitizerRules.should_skip_batch(batch):
                 continue
             
             cleaned_batches.append(batch)
             
         # Rejoin with semicolons
-        script = ';\n'.join(cleaned_batches) + ';'
+        return ';\n'.join(cleaned_batches) + ';'
+
+    @staticmethod
+    def _remove_empty_lines(script):
+        return '\n'.join([line for line in script.split('\n') if line.strip()])
+
+    @staticmethod
+    def first_code_line(batch):
+        """Upper-cased first line of code in a batch (leading comments skipped), or None."""
+        trimmed_content = batch.strip()
+        if not trimmed_content:
+            return None
         
-        # 2. Global replacements for inline T-SQL
+        # Remove leading comments to find meaningful code start
+        # (Matches both -- and /* */ style comments at the START of the batch)
+        code_start = trimmed_content
+        while True:
+            last_start = code_start
+            # Remove -- style
+            code_start = re.sub(r'^--.*?\n', '', code_start).strip()
+            # Remove /* */ style
+            code_start = re.sub(r'^/\*.*?\*/', '', code_start, flags=re.DOTALL).strip()
+            if code_start == last_start:
+                break
         
+        if not code_start:
+            return None
+            
+        return code_start.split('\n')[0].strip().upper()
+
+    @staticmethod
+    def should_skip_batch(batch):
+        first_line = TSQLSanitizerRules.first_code_line(batch)
+        if first_line is None:
+            return True
+        for kw in TSQLSanitizerRules.SKIP_KEYWORDS:
+            if first_line.startswith(kw.upper()):
+                return True
+        return False
+
+    @staticmethod
+    def _replace_convert(script):
+        """
+        Rewrites every CONVERT(type, expr[, style]) as CAST(expr AS type), nested
+        calls included. Parentheses are matched in one pass and the output is
+        built once, so this is linear in the script size. A CONVERT without a
+        closing parenthesis or a comma is left as it is.
+        """
+        matches = list(re.finditer(r'(?i)\bCONVERT\s*\(', script))
+        if not matches:
+            return script
+        parens = match_parens(script, [m.end() - 1 for m in matches])
+        starts = [m.start() for m in matches]
+
+        def rewrite(lo, hi):
+            out = []
+            prev = lo
+            i = bisect.bisect_left(starts, lo)
+            while i < len(matches) and matches[i].end() <= hi:
+                match = matches[i]
+                i += 1
+                close, commas = parens[match.end() - 1]
+                if close == -1 or close >= hi or not commas:
+                    continue
+                target_type = rewrite(match.end(), commas[0]).strip()
+                expr_end = commas[1] if len(commas) > 1 else close
+                expr = rewrite(commas[0] + 1, expr_end).strip()
+                if target_type.lower() == 'xml': target_type = 'TEXT'
+                out.append(script[prev:match.start()])
+                out.append(f"CAST({expr} AS {target_type})")
+                prev = close + 1
+                i = bisect.bisect_left(starts, prev, i)
+            out.append(script[prev:hi])
+            return ''.join(out)
+
+        return rewrite(0, len(script))
+
+    # Applied in order by apply(); names are what RuleProfile reports
+    RULES = (
+        FuncRule('tsql.go_batches', lambda s: TSQLSanitizerRules._split_batches(s)),
+
+        # 2. Global replacements for inline T-SQL
+        # VALUE( and ROW( are MySQL syntax: in the "inline" family, so every dialect runs them
+        # (see SQLSanitizer.DIALECT_FAMILIES); kept here for their place in the chain
         # Normalize VALUE -> VALUES (for INSERT)
-        # T-SQL allows INSERT INTO ... VALUE ...
-        script = re.sub(r'(?is)\bINSERT\s+(?:INTO\s+)?.*?\bVALUE\s*\(', lambda m: m.group(0).replace('VALUE', 'VALUES').replace('value', 'values'), script)
+        Rule('inline.insert_value', r'(?is)\bINSERT\s+(?:INTO\s+)?.*?\bVALUE\s*\(', lambda m: m.group(0).replace('VALUE', 'VALUES').replace('value', 'values')),
         # Remove ROW(...) wrapper often used in VALUES
         # e.g. VALUES (ROW(1,2)), (ROW(3,4)) -> VALUES (1,2), (3,4)
-        script = re.sub(r'(?i)\bROW\s*\(', '(', script)
-
-        script = re.sub(r'(?i)\bgetdate\s*\(\s*\)', 'CURRENT_TIMESTAMP', script)
-        script = re.sub(r'(?i)\bnewid\s*\(\s*\)', '(lower(hex(randomblob(4))) || "-" || lower(hex(randomblob(2))) || "-4" || substr(lower(hex(randomblob(2))),2) || "-" || substr("89ab",abs(random()) % 4 + 1, 1) || substr(lower(hex(randomblob(2))),2) || "-" || lower(hex(randomblob(6))))', script)
-        script = re.sub(r'(?i)\bIDENTITY\s*\(\s*\d+\s*,\s*\d+\s*\)', '', script)
-        script = re.sub(r'(?i)\bIDENTITY\b', '', script)
-        script = re.sub(r'(?i)\b(NON)?CLUSTERED\b', '', script)
-        script = re.sub(r'(?i)\bWITH\s+ROLLUP\b', '', script)
-        script = re.sub(r'(?i)\bWITH\s+ROLLUP\b', '', script)
-        script = re.sub(r'(?is)\bPERIOD\s+FOR\s+SYSTEM_TIME\s*\(.*?\)', '', script)
-        script = re.sub(r'(?is)\bWITH\s*\(\s*SYSTEM_VERSIONING\s*=\s*ON.*?;', ';', script)
+        Rule('inline.row_wrapper', r'(?i)\bROW\s*\(', '('),
+        Rule('tsql.getdate', r'(?i)\bgetdate\s*\(\s*\)', 'CURRENT_TIMESTAMP'),
+        Rule('tsql.newid', r'(?i)\bnewid\s*\(\s*\)', NEWID_SQL),
+        Rule('tsql.identity_seed', r'(?i)\bIDENTITY\s*\(\s*\d+\s*,\s*\d+\s*\)', ''),
+        Rule('tsql.identity', r'(?i)\bIDENTITY\b', ''),
+        Rule('tsql.clustered', r'(?i)\b(NON)?CLUSTERED\b', ''),
+        Rule('tsql.with_rollup', r'(?i)\bWITH\s+ROLLUP\b', ''),
+        Rule('tsql.period_system_time', r'(?is)\bPERIOD\s+FOR\s+SYSTEM_TIME\s*\(.*?\)', ''),
+        Rule('tsql.system_versioning', r'(?is)\bWITH\s*\(\s*SYSTEM_VERSIONING\s*=\s*ON.*?;', ';'),
         
         # Money literals $123.45 -> 123.45
-        script = re.sub(r'(?<!\w)\$(\d+(?:\.\d+)?)', r'\1', script)
+        Rule('tsql.money_literal', r'(?<!\w)\$(\d+(?:\.\d+)?)', r'\1'),
         
         # fix IDENTITY column omission in INSERT
         # Specifically for 'jobs' table in instpubs.sql
-        script = re.sub(r'(?i)(INSERT\s+(?:INTO\s+)?jobs\s+values\s*\()', r'\1NULL, ', script)
+        Rule('tsql.jobs_identity', r'(?i)(INSERT\s+(?:INTO\s+)?jobs\s+values\s*\()', r'\1NULL, '),
         
         # 3. Helper Funcs
-        script = TSQLSanitizerRules._replace_convert(script)
-        script = TSQLSanitizerRules._replace_alias_assign(script)
+        FuncRule('tsql.convert', lambda s: TSQLSanitizerRules._replace_convert(s)),
+        Rule('tsql.alias_assign', r'(?i)(,\s*|\bSELECT\s+)([a-zA-Z0-9_"\.\[\]]+)\s*=\s*', r'\1'),
         
         # 4. Cleanup leftover T-SQL fragments
-        fragments = ('BEGIN', 'END', 'AS', 'ELSE', 'WITH LOG', 'WITH NOWAIT')
-        frag_pattern = r'(?im)^\s*(?:' + '|'.join(fragments) + r')\b.*?(?=[;\n]|$)'
-        script = re.sub(frag_pattern, '', script)
-        
-        
+        Rule('tsql.fragments', r'(?im)^\s*(?:' + '|'.join(FRAGMENTS) + r')\b.*?(?=[;\n]|$)', ''),
         # Lines starting with @
-        script = re.sub(r'(?m)^\s*@\w+\b.*?(?=[;\n]|$)', '', script)
-        
+        Rule('tsql.variable_lines', r'(?m)^\s*@\w+\b.*?(?=[;\n]|$)', ''),
         # SQLCMD :setvar variables
-        script = re.sub(r'(?m)^\s*:setvar.*?(?=[;\n]|$)', '', script)
+        Rule('tsql.setvar', r'(?m)^\s*:setvar.*?(?=[;\n]|$)', ''),
         
         # 5. Syntax Cleanup
-        script = re.sub(r',(\s*;)', r'\1', script)
-        script = re.sub(r',(\s*\))', r'\1', script)
-        script = re.sub(r',(\s*[\r\n]+\s*;)', r'\1', script)
-        script = re.sub(r',(\s*[\r\n]+\s*\))', r'\1', script)
+        Rule('tsql.comma_semicolon', r',(\s*;)', r'\1'),
+        Rule('tsql.comma_paren', r',(\s*\))', r'\1'),
+        Rule('tsql.comma_newline_semicolon', r',(\s*[\r\n]+\s*;)', r'\1'),
+        Rule('tsql.comma_newline_paren', r',(\s*[\r\n]+\s*\))', r'\1'),
         
         # Remove empty lines
-        script = '\n'.join([line for line in script.split('\n') if line.strip()])
-        
-        return script
-
-    @staticmethod
-    def _replace_convert(script):
-        pattern = re.compile(r'(?i)\bCONVERT\s*\(')
-        for _ in range(400):
-            match = pattern.search(script)
-            if not match: break
-            start = match.end()
-            depth = 1
-            current = start
-            comma_indices = []
-            while current < len(script) and depth > 0:
-                char = script[current]
-                if char == '(': depth += 1
-                elif char == ')': depth -= 1
-                elif char == ',' and depth == 1:
-                    comma_indices.append(current)
-                if depth == 0: break
-                current += 1
-            if depth != 0: break
-            end = current
-            if len(comma_indices) >= 1:
-                target_type = script[start:comma_indices[0]].strip()
-                expr_end = comma_indices[1] if len(comma_indices) > 1 else end
-                expr = script[comma_indices[0]+1:expr_end].strip()
-                if target_type.lower() == 'xml': target_type = 'TEXT'
-                new_seg = f"CAST({expr} AS {target_type})"
-                script = script[:match.start()] + new_seg + script[end+1:]
-            else:
-                break 
-        return script
-
-    @staticmethod
-    def _replace_alias_assign(script):
-        return re.sub(r'(?i)(,\s*|\bSELECT\s+)([a-zA-Z0-9_"\.\[\]]+)\s*=\s*', r'\1', script)
+        FuncRule('tsql.empty_lines', lambda s: TSQLSanitizerRules._remove_empty_lines(s)),
+    )
@@ -0,0 +1,108 @@
+import bz2
+import os
+import zipfile
+import zlib
+
+# Compressed bytes read per step; decompressed output is written as it comes
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Accepted upload names, longest suffix first: plain dumps, single compressed dumps, zip archives
+SQL_SUFFIXES = ('.sql.gz', '.sql.bz2', '.sql', '.gz', '.bz2', '.zip')
+
+_DECOMPRESSORS = {
+    '.gz': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),     # gzip header and trailer
+    '.bz2': bz2.BZ2Decompressor,
+}
+
+
+def dump_suffix(name):
+    """The SQL_SUFFIXES entry `name` ends with (case-insensitive), or None."""
+    lower = name.lower()
+    for suffix in SQL_SUFFIXES:
+        if lower.endswith(suffix):
+            return suffix
+    return None
+
+
+def dump_name(name):
+    """File name of the decompressed dump: 'orders.sql.gz' -> 'orders.sql', 'orders.bz2' -> 'orders.sql'."""
+    base = os.path.basename(name.replace('\\', '/'))
+    suffix = dump_suffix(base)
+    if suffix is None or suffix == '.sql':
+        return base
+    return base[:-len(suffix)] + '.sql'
+
+
+def copy_decompressed(src, dst, suffix, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Copies the binary file object src to dst chunk by chunk, decompressing it
+    on the way if suffix is '.gz' / '.sql.gz' or '.bz2' / '.sql.bz2'.
+    Concatenated members (pigz / pbzip2 output) are all decompressed.
+    Returns the number of bytes written.
+    """
+    kind = suffix[suffix.rindex('.'):]
+    make = _DECOMPRESSORS.get(kind)
+    written = 0
+    decompressor = make() if make is not None else None
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        while chunk:
+            data = decompressor.decompress(chunk) if decompressor is not None else chunk
+            dst.write(data)
+            written += len(data)
+            chunk = b''
+            if decompressor is not None and decompressor.eof:
+                # Next member, if any
+                chunk = decompressor.unused_data
+                decompressor = make()
+    if decompressor is not None and kind == '.gz':
+        data = decompressor.flush()
+        dst.write(data)
+        written += len(data)
+    return written
+
+
+def unpack_dump(fileobj, name, dest_dir, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Writes the dump(s) in an uploaded file to dest_dir and yields each .sql path as
+    soon as it is complete, so callers can start on the first while the rest unpack.
+
+    fileobj: binary file object of the upload, named `name`. .sql is copied as it is,
+    .gz / .bz2 are decompressed while being read, and a .zip yields every member with
+    one of those suffixes (must be seekable, like the spooled files of a web framework).
+    Only base names are used, so names cannot point outside dest_dir.
+    Raises ValueError for an unsupported name or a zip without dumps.
+    """
+    suffix = dump_suffix(name)
+    if suffix is None:
+        raise ValueError(f"Unsupported upload {name!r}; expected one of {', '.join(SQL_SUFFIXES)}")
+    os.makedirs(dest_dir, exist_ok=True)
+    if suffix != '.zip':
+        path = os.path.join(dest_dir, dump_name(name))
+        with open(path, 'wb') as out:
+            copy_decompressed(fileobj, out, suffix, chunk_size)
+        yield path
+        return
+
+    # Members go to a directory of their own, so two archives with a schema.sql do not collide
+    member_dir = os.path.join(dest_dir, os.path.basename(name.replace('\\', '/')) + '.d')
+    os.makedirs(member_dir, exist_ok=True)
+    names = set()
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            member_suffix = dump_suffix(info.filename)
+            if info.is_dir() or member_suffix in (None, '.zip'):
+                continue
+            member = dump_name(info.filename)
+            if member.lower() in names:
+                # Same base name in two folders of the archive
+                member = f"{len(names)}_{member}"
+            names.add(member.lower())
+            path = os.path.join(member_dir, member)
+            with archive.open(info) as src, open(path, 'wb') as out:
+                copy_decompressed(src, out, member_suffix, chunk_size)
+            yield path
+    if not names:
+        raise ValueError(f"No SQL dumps in {name!r}")
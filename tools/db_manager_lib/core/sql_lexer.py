@@ -0,0 +1,55 @@
+import re
+
+# Token kinds
+NEWLINE = "nl"
+WHITESPACE = "ws"
+COMMENT = "comment"
+STRING = "string"
+IDENT = "ident"
+NUMBER = "number"
+WORD = "word"
+PUNCT = "punct"
+
+_TOKEN_TEMPLATE = r"""
+    (?P<nl>\n)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z)|(?:(?<=\n)|\A)[ \t]*\#[^\n]*)
+  | (?P<ws>[ \t\r\f\v]+)
+  | (?P<string>{string})
+  | (?P<ident>\[[^\]]*(?:\]|\Z)|"(?:[^"]|"")*(?:"|\Z)|`[^`]*(?:`|\Z))
+  | (?P<number>0[xX][0-9A-Fa-f]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[^\W\d]\w*)
+  | (?P<punct>.)
+"""
+
+# T-SQL / ANSI strings only escape quotes by doubling them. MySQL dumps also
+# use backslash escapes (e.g. 'It\'s'), which must not end the literal.
+_STRING_PLAIN = r"'(?:[^']|'')*(?:'|\Z)"
+_STRING_BACKSLASH = r"'(?:[^'\\]|''|\\.)*(?:'|\Z)"
+
+_TOKEN_RE = re.compile(_TOKEN_TEMPLATE.format(string=_STRING_PLAIN), re.DOTALL | re.VERBOSE)
+_TOKEN_RE_BACKSLASH = re.compile(_TOKEN_TEMPLATE.format(string=_STRING_BACKSLASH), re.DOTALL | re.VERBOSE)
+
+
+def scan(text, pos=0, backslash_escapes=False):
+    """Like tokenize(), but yields the raw match objects starting at `pos` (offsets included)."""
+    pattern = _TOKEN_RE_BACKSLASH if backslash_escapes else _TOKEN_RE
+    return pattern.finditer(text, pos)
+
+
+def tokenize(text, backslash_escapes=False):
+    """
+    Splits a SQL script into (kind, value) tokens in a single left-to-right scan.
+
+    The lexer is quote- and comment-aware: string literals, quoted identifiers
+    ([x], "x", `x`) and comments (--, /* */, and # at the start of a line) are
+    returned as single tokens, so rewrite rules never look inside them by
+    accident. Concatenating the token values reproduces the input exactly.
+    Unterminated literals run to the end of the text.
+    """
+    for m in scan(text, backslash_escapes=backslash_escapes):
+        yield m.lastgroup, m.group()
+
+
+def is_hash_comment(value):
+    """True for MySQL-style '# ...' line comments (which may carry indentation)."""
+    return value.lstrip(' \t').startswith('#')
@@ -0,0 +1,761 @@
+import codecs
+import re
+import sqlite3
+import zlib
+from typing import NamedTuple
+
+from .sql_lexer import scan, NEWLINE, WHITESPACE, COMMENT, WORD, PUNCT
+from .sanitizer import SQLSanitizer
+from .dialect import sniff_dialect
+from .sanitizer_tsql import TSQLSanitizerRules
+from .sanitizer_postgres import PostgresSanitizerRules
+from .insert_batch import coalesce_inserts
+from .bulk_rows import BulkRows, load_rows, parse_copy, parse_insert
+from .quarantine import Quarantined, isolate, split_statements
+
+DEFAULT_CHUNK_SIZE = 1 << 20      # characters read from the file per refill
+# Source characters sanitized per SQLSanitizer call. The regex chain slows down
+# super-linearly with input size, so it gets small runs; the token engine is linear.
+GROUP_SIZES = {"regex": 1 << 12, "token": 1 << 16}
+DEFAULT_FLUSH_SIZE = 1 << 20      # sanitized characters buffered per executescript call
+# Dialects whose INSERT ... VALUES rows load_sql_stream parses itself (see bulk_rows);
+# COPY blocks are parsed whatever the dialect
+BULK_DIALECTS = ("mysql", "postgres")
+
+# Statements that start a new statement when they open a line, even without a ';'
+# (T-SQL batches often carry one INSERT per line and no terminators).
+_LINE_STARTERS = frozenset(('INSERT', 'COMMIT', 'ROLLBACK'))
+# 'BEGIN <word>' forms that are transaction control, not a BEGIN ... END block
+_BEGIN_TXN_WORDS = frozenset(('TRAN', 'TRANSACTION', 'DISTRIBUTED', 'WORK'))
+# 'END <word>' forms that close a MySQL control statement, not a BEGIN/CASE block
+_END_CONTROL_WORDS = frozenset(('IF', 'WHILE', 'LOOP', 'REPEAT'))
+
+# In T-SQL a routine body runs until the next GO, ';' included
+_ROUTINE_PREFIXES = tuple(
+    f'{verb} {kind}'
+    for verb in ('CREATE', 'ALTER', 'CREATE OR ALTER')
+    for kind in ('PROC', 'PROCEDURE', 'FUNCTION', 'TRIGGER', 'VIEW')
+)
+# The loader commits on its own schedule, so the dump's own transaction control is dropped
+_TXN_CONTROL_RE = re.compile(
+    r'(?is)\s*(?:BEGIN(?:\s+(?:TRAN|TRANSACTION|DISTRIBUTED\s+TRAN(?:SACTION)?|WORK)\b[^;]*)?'
+    r'|START\s+TRANSACTION\b[^;]*|COMMIT\b[^;]*|ROLLBACK\b[^;]*|SAVE\s+TRAN(?:SACTION)?\b[^;]*)\s*;?\s*'
+)
+
+
+# Characters of an INSERT handed to the reader's skip predicate (enough for the table name)
+_SKIP_HEAD = 512
+
+# Runs from inside an INSERT to its end without tokenizing: stops at ';' outside strings,
+# identifiers and comments, or before a line starting a new statement (T-SQL dumps often
+# have no ';'). Unterminated literals run to the end of the buffer.
+_SKIP_TAIL_TEMPLATE = r"""
+    (?: [^'"`\[;\n/-]+
+      | {string}
+      | "(?:[^"]|"")*(?:"|\Z) | `[^`]*(?:`|\Z) | \[[^\]]*(?:\]|\Z)
+      | --[^\n]* | /\*.*?(?:\*/|\Z)
+      | \n(?![ \t\r]*(?:(?:INSERT|COMMIT|ROLLBACK)\b|GO[ \t\r]*;?[ \t\r]*(?:\n|\Z)))
+      | [/-]
+    )*
+"""
+_SKIP_TAIL_RE = re.compile(_SKIP_TAIL_TEMPLATE.format(string=r"'(?:[^']|'')*(?:'|\Z)"),
+                           re.DOTALL | re.VERBOSE | re.IGNORECASE)
+_SKIP_TAIL_RE_BACKSLASH = re.compile(_SKIP_TAIL_TEMPLATE.format(string=r"'(?:[^'\\]|''|\\.)*(?:'|\Z)"),
+                                     re.DOTALL | re.VERBOSE | re.IGNORECASE)
+
+# Whitespace and comments before a statement's first word. Comments only match whole, so
+# backtracking cannot stop inside one and find the keyword in the comment text.
+_LEADING = r'(?:\s|--[^\n]*(?=\n|\Z)|/\*(?:[^*]|\*(?!/))*(?:\*/|\Z))*'
+
+_NAME_PART = r'(?:\[[^\]]+\]|"[^"]+"|`[^`]+`|[\w$#@]+)'
+_INSERT_HEAD_RE = re.compile(
+    r'(?is)' + _LEADING + r'INSERT\s+(?:(?:IGNORE|LOW_PRIORITY|DELAYED|HIGH_PRIORITY)\s+)*(?:INTO\s+)?'
+    rf'({_NAME_PART}(?:\s*\.\s*{_NAME_PART})*)'
+)
+
+
+# pg_dump's "COPY ... FROM stdin;" is followed by raw data lines up to a "\." line
+_COPY_STDIN_RE = re.compile(r'(?is)' + _LEADING + r'COPY\b[^;]*\bFROM\s+stdin\b')
+_COPY_END_RE = re.compile(r'^\\\.[ \t\r]*$', re.MULTILINE)
+
+
+# A GO batch separator line, looked for in the part of a file skipped on resume
+_GO_LINE_RE = re.compile(r'(?im)^[ \t]*GO[ \t]*;?[ \t]*$')
+
+
+# CREATE INDEX statements, held back by iter_sanitized(deferred_indexes=...)
+_CREATE_INDEX_HEAD_RE = re.compile(r'(?is)' + _LEADING + r'CREATE\s+(?:UNIQUE\s+)?(?:(?:NON)?CLUSTERED\s+)?INDEX\b')
+# Statements PostgresSanitizerRules.fold_keys may change: CREATE TABLE and ALTER TABLE
+_TABLE_DDL_HEAD_RE = re.compile(r'(?is)' + _LEADING + r'(?:CREATE|ALTER)\s+(?:UNLOGGED\s+)?TABLE\b')
+# Characters kept between two chunks of scan_table_keys, so a statement cut by a refill is seen whole
+_KEY_SCAN_OVERLAP = 1 << 16
+
+
+class Statement(NamedTuple):
+    text: str
+    batch: int      # index of the GO batch the statement belongs to
+    start: int      # character offset of the statement in the file
+    end: int
+
+
+class SQLStreamError(sqlite3.Error):
+    """A group of streamed statements failed; start/end locate it in the source file."""
+
+    def __init__(self, message, start, end):
+        super().__init__(f"{message} (statements at characters {start}-{end})")
+        self.message = message
+        self.start = start
+        self.end = end
+
+    def __reduce__(self):
+        # Rebuilt from the constructor arguments, so it survives the trip back from a worker process
+        return type(self), (self.message, self.start, self.end)
+
+
+def detect_encoding(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns 'utf-8-sig' if the whole file decodes as UTF-8, else 'latin-1'.
+    Checked incrementally so the file never has to fit in memory.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        try:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    decoder.decode(b'', final=True)
+                    return 'utf-8-sig'
+                decoder.decode(chunk)
+        except UnicodeDecodeError:
+            return 'latin-1'
+
+
+class SQLStatementReader:
+    """
+    Splits a SQL file object into statements while reading it in chunks.
+
+    Boundaries are GO lines, ';' outside of BEGIN/CASE ... END blocks, and
+    INSERT/COMMIT/ROLLBACK at the start of a line. A "COPY ... FROM stdin;"
+    statement is yielded together with its data block, up to and including
+    the terminating "\\." line. The scan uses the same
+    lexer as the token sanitizer, so ';' or GO inside strings, quoted
+    identifiers and comments never split. Only the statement being read is
+    buffered, so memory is bounded by the largest statement, not the file.
+
+    skip: optional function(head) called with the first characters of every
+    INSERT; when it returns True the statement is passed over with a single
+    regex instead of the tokenizer and never yielded (see RowSampler).
+    offset: character offset in the file that `f` is positioned at, so
+    statement offsets stay file-relative when reading starts mid-file.
+    whole_inserts: INSERTs that `skip` keeps are delimited with the same regex
+    and yielded without being tokenized either (for callers that parse the
+    rows themselves, see bulk_rows).
+    """
+
+    def __init__(self, f, chunk_size=DEFAULT_CHUNK_SIZE, backslash_escapes=False, skip=None, offset=0,
+                 whole_inserts=False):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.backslash_escapes = backslash_escapes
+        self.skip = skip
+        self.offset = offset
+        self.whole_inserts = whole_inserts
+        self.go_seen = False
+        self.count = 0      # statements yielded so far
+        self.skipped = 0    # INSERTs passed over by `skip`
+
+    def __iter__(self):
+        for stmt in self._statements():
+            self.count += 1
+            yield stmt
+
+    def _statements(self):
+        buf = ''
+        base = self.offset  # file offset of buf[0]
+        pos = 0             # next position to scan
+        stmt_start = 0
+        line_start = 0
+        has_code = False    # statement has more than whitespace/comments
+        line_has_code = False
+        go_state = 0        # 0: blank line so far, 1: 'GO', 2: 'GO;', -1: not a GO line
+        depth = 0
+        pending = None      # 'BEGIN' / 'END' waiting for the next word to decide depth
+        batch = 0
+        eof = False
+        read_size = self.chunk_size
+        rescan = False      # a statement was skipped; continue scanning after it
+
+        while True:
+            if rescan:
+                rescan = False
+            elif not eof:
+                chunk = self.f.read(read_size)
+                read_size = self.chunk_size
+                if chunk:
+                    buf += chunk
+                else:
+                    eof = True
+
+            for m in scan(buf, pos, self.backslash_escapes):
+                if not eof and m.end() == len(buf):
+                    break   # the token may continue in the next chunk
+                kind, val = m.lastgroup, m.group()
+                pos = m.end()
+
+                if kind == NEWLINE:
+                    if go_state > 0:
+                        if has_code:
+                            yield Statement(buf[stmt_start:line_start], batch, base + stmt_start, base + line_start)
+                        self.go_seen = True
+                        batch += 1
+                        stmt_start = pos
+                        has_code = False
+                        depth = 0
+                        pending = None
+                    line_start = pos
+                    line_has_code = False
+                    go_state = 0
+                    continue
+                if kind == WHITESPACE:
+                    continue
+                if go_state == 0 and kind == WORD and val.upper() == 'GO':
+                    go_state = 1
+                    continue
+                if go_state == 1 and val == ';':
+                    go_state = 2
+                    continue
+                if go_state > 0:
+                    has_code = line_has_code = True     # 'GO' was code after all
+                go_state = -1
+                if kind == COMMENT:
+                    continue
+
+                upper = val.upper() if kind == WORD else None
+                if (upper == 'INSERT' and (self.skip is not None or self.whole_inserts) and depth == 0
+                        and pending is None and not (has_code and line_has_code)):
+                    if has_code:
+                        yield Statement(buf[stmt_start:m.start()], batch, base + stmt_start, base + m.start())
+                        stmt_start = m.start()
+                        has_code = False
+                    found = self._insert_end(buf, m.start(), eof)
+                    if found is None:
+                        # Head or end of the statement not buffered yet: read more (doubling,
+                        # so a huge statement is not rescanned once per chunk) and retry
+                        pos = m.start()
+                        read_size = max(self.chunk_size, len(buf))
+                        break
+                    end, kept = found
+                    if end is not None:
+                        if kept:
+                            yield Statement(buf[stmt_start:end], batch, base + stmt_start, base + end)
+                        else:
+                            self.skipped += 1
+                        pos = stmt_start = end
+                        line_has_code = True
+                        rescan = True
+                        break
+
+                end_case = False
+                if pending == 'BEGIN':
+                    if upper not in _BEGIN_TXN_WORDS and val != ';':
+                        depth += 1
+                elif pending == 'END':
+                    if upper in _END_CONTROL_WORDS:
+                        depth += 1
+                    end_case = upper == 'CASE'
+                pending = None
+
+                if kind == WORD:
+                    if upper in _LINE_STARTERS and not line_has_code and depth == 0 and has_code:
+                        yield Statement(buf[stmt_start:m.start()], batch, base + stmt_start, base + m.start())
+                        stmt_start = m.start()
+                    elif upper == 'BEGIN':
+                        pending = 'BEGIN'
+                    elif upper == 'CASE' and not end_case:
+                        depth += 1
+                    elif upper == 'END' and depth:
+                        depth -= 1
+                        pending = 'END'
+                has_code = True
+                line_has_code = True
+
+                if kind == PUNCT and val == ';' and depth == 0:
+                    if _COPY_STDIN_RE.match(buf, stmt_start, pos):
+                        end = self._copy_end(buf, pos, eof)
+                        if end is None:
+                            pos = m.start()
+                            read_size = max(self.chunk_size, len(buf))
+                            break
+                        yield Statement(buf[stmt_start:end], batch, base + stmt_start, base + end)
+                        pos = stmt_start = line_start = end
+                        has_code = False
+                        rescan = True
+                        break
+                    yield Statement(buf[stmt_start:pos], batch, base + stmt_start, base + pos)
+                    stmt_start = pos
+                    has_code = False
+
+            if eof and not rescan:
+                break
+            if rescan:
+                continue    # trimming after every skipped statement would copy the buffer each time
+
+            # Drop what has been consumed. A possible GO line is kept whole, plus
+            # one character so a line-start '#' comment is still recognised.
+            keep = stmt_start if go_state < 0 else min(stmt_start, line_start)
+            cut = max(keep - 1, 0)
+            if cut:
+                buf = buf[cut:]
+                base += cut
+                pos -= cut
+                stmt_start -= cut
+                line_start -= cut
+
+        end = len(buf)
+        if go_state > 0:
+            self.go_seen = True
+            end = line_start
+        if has_code:
+            yield Statement(buf[stmt_start:end], batch, base + stmt_start, base + end)
+
+    @staticmethod
+    def _copy_end(buf, pos, eof):
+        """
+        End of the COPY data block after the ';' at `pos` (just past the "\\."
+        line), or None if it is not fully buffered yet.
+        """
+        nl = buf.find('\n', pos)
+        if nl < 0:
+            return None if not eof else len(buf)
+        m = _COPY_END_RE.search(buf, nl + 1)
+        if m is None or (m.end() == len(buf) and not eof):
+            return None if not eof else len(buf)
+        return m.end()
+
+    def _insert_end(self, buf, start, eof):
+        """
+        (end, kept) for the INSERT at `start`: its end offset, found without the tokenizer,
+        if `skip` rejects it or whole_inserts is set (end None: tokenize it as usual);
+        None when more input is needed to decide or to find the end.
+        """
+        if not eof and len(buf) - start < _SKIP_HEAD:
+            return None
+        kept = self.skip is None or not self.skip(buf[start:start + _SKIP_HEAD])
+        if kept and not self.whole_inserts:
+            return None, True
+        tail_re = _SKIP_TAIL_RE_BACKSLASH if self.backslash_escapes else _SKIP_TAIL_RE
+        at = tail_re.match(buf, start).end()
+        if at < len(buf) and buf[at] == ';':
+            return at + 1, kept
+        if at < len(buf) and (eof or len(buf) - at > _SKIP_HEAD):
+            return at, kept     # before the newline of the next statement's line
+        return (len(buf), kept) if eof else None
+
+
+class RowSampler:
+    """
+    Keeps the first `limit` INSERT rows of every table and rejects the rest,
+    for loads that only need the schema and a few sample rows. A multi-row
+    INSERT that starts below the limit is kept whole. Tables are told apart by
+    their unqualified, unquoted, lower-cased name, as the sanitizer drops schemas.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.rows = {}
+
+    @staticmethod
+    def table_of(text):
+        """Table an INSERT statement writes to, or None if `text` is not an INSERT."""
+        m = _INSERT_HEAD_RE.match(text)
+        if m is None:
+            return None
+        last = re.split(r'\s*\.\s*', m.group(1))[-1]
+        return last.strip('[]"`').lower()
+
+    @staticmethod
+    def count_rows(text):
+        """Number of VALUES tuples in an INSERT (1 for INSERT ... SELECT)."""
+        rows = depth = 0
+        in_values = False
+        for m in scan(text):
+            kind, val = m.lastgroup, m.group()
+            if kind == WORD and depth == 0 and val.upper() in ('VALUES', 'VALUE'):
+                in_values = True
+            elif kind == PUNCT:
+                if val == '(':
+                    if in_values and depth == 0:
+                        rows += 1
+                    depth += 1
+                elif val == ')' and depth:
+                    depth -= 1
+        return rows or 1
+
+    def skip(self, head):
+        table = self.table_of(head)
+        return table is not None and self.rows.get(table, 0) >= self.limit
+
+    def add(self, text):
+        """Records a statement that is being loaded."""
+        table = self.table_of(text)
+        if table is not None:
+            self.rows[table] = self.rows.get(table, 0) + self.count_rows(text)
+
+    def take(self, bulk):
+        """
+        Records a BulkRows that is being loaded; returns False if its table has all its
+        rows already. An INSERT is kept whole, a COPY block is cut to the rows still wanted.
+        """
+        table = bulk.table.lower()
+        wanted = self.limit - self.rows.get(table, 0)
+        if wanted <= 0:
+            return False
+        if bulk.count is None:
+            bulk.limit(wanted)
+        self.rows[table] = self.rows.get(table, 0) + (bulk.count if bulk.count is not None else wanted)
+        return True
+
+
+def scan_table_keys(path, encoding, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    PostgresSanitizerRules.table_keys of a whole file, read in chunks: pg_dump adds the
+    keys after the data, so a streamed load needs them before it reaches the CREATE TABLE.
+    """
+    keys = {}
+    tail = ''
+    with open(path, 'r', encoding=encoding) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            text = tail + chunk
+            # Substring tests first: most chunks are data, and far faster to rule out than to match
+            alters = PostgresSanitizerRules.key_alters(text) if 'CONSTRAINT' in text or 'constraint' in text else []
+            for table, clauses in PostgresSanitizerRules.table_keys(text, alters).items():
+                keys.setdefault(table, []).extend(clauses)
+            end = alters[-1].end() if alters else 0
+            if not chunk:
+                return keys
+            # Keys end with ';', so one cut short by the chunk was not matched; keep its lines
+            tail = text[max(end, text.rfind('\n', 0, max(0, len(text) - _KEY_SCAN_OVERLAP)) + 1):]
+
+
+def iter_sanitized(reader, engine="regex", group_size=None, profile=None, cache=None, dialect=None, sampler=None,
+                   deferred_indexes=None, bulk=False, statements=False, table_keys=None):
+    """
+    Sanitizes the statements of a SQLStatementReader in runs of about
+    `group_size` characters. Yields (start, end, sanitized_sql) per run.
+    With a SanitizeCache, runs end at content-defined statements (so an edit
+    only changes the runs around it) and unchanged runs come from the cache.
+
+    Each statement of a run is handed to SQLSanitizer as its own GO batch, so
+    the result matches sanitizing them one by one (batch skipping included)
+    without paying the per-call overhead of the rule chain for every row.
+    Once a file uses GO, a skipped routine (procedure, function, trigger,
+    view) takes the rest of its batch with it, as in TSQLSanitizerRules.
+    When the regex engine runs without the T-SQL rules (see
+    SQLSanitizer.DIALECT_FAMILIES) runs are plain newline-joined statements.
+    With a deferred_indexes list, CREATE INDEX statements are sanitized on
+    their own and appended to it instead of being yielded.
+    With bulk=True, COPY blocks and (for BULK_DIALECTS) INSERTs of plain literals
+    are parsed instead of sanitized and yielded on their own as BulkRows in place
+    of the sanitized SQL, after the run before them.
+    With statements=True, yields (start, end, sanitized_sql, statements) with the
+    source Statements of each run, so they can be run again one by one.
+    With table_keys (scan_table_keys of the file), keys are folded into each CREATE TABLE
+    as it comes (PostgresSanitizerRules.fold_keys) and their ALTER TABLE statements skipped.
+    """
+    families = SQLSanitizer.DIALECT_FAMILIES.get(dialect, ('tsql',))
+    separator = '\nGO\n' if engine != "regex" or 'tsql' in families else '\n'
+    if group_size is None:
+        group_size = GROUP_SIZES.get(engine, 1 << 12)
+    skip_batch = None
+    group, size = [], 0     # Statements of the run
+
+    def run():
+        sql = _sanitize_group(separator.join(stmt.text for stmt in group), engine, profile, cache, dialect)
+        if statements:
+            return group[0].start, group[-1].end, sql, tuple(group)
+        return group[0].start, group[-1].end, sql
+
+    for stmt in reader:
+        if stmt.batch == skip_batch:
+            continue
+        if _TXN_CONTROL_RE.fullmatch(stmt.text):
+            continue
+        if reader.go_seen:
+            first_line = TSQLSanitizerRules.first_code_line(stmt.text)
+            if first_line and first_line.startswith(_ROUTINE_PREFIXES):
+                skip_batch = stmt.batch
+                continue
+        if deferred_indexes is not None and _CREATE_INDEX_HEAD_RE.match(stmt.text):
+            deferred_indexes.append(_sanitize_group(stmt.text, engine, profile, cache, dialect).strip())
+            continue
+        rows = _parse_bulk(stmt.text, dialect) if bulk else None
+        if rows is not None:
+            if sampler is not None and not sampler.take(rows):
+                continue
+            if group:
+                yield run()
+                group, size = [], 0
+            yield (stmt.start, stmt.end, rows, (stmt,)) if statements else (stmt.start, stmt.end, rows)
+            continue
+        if table_keys and _TABLE_DDL_HEAD_RE.match(stmt.text):
+            if PostgresSanitizerRules.key_alters(stmt.text):
+                continue    # already in its CREATE TABLE
+            stmt = stmt._replace(text=PostgresSanitizerRules.fold_keys(stmt.text, table_keys))
+        if sampler is not None:
+            sampler.add(stmt.text)
+        group.append(stmt)
+        size += len(stmt.text)
+        if size >= group_size or (cache is not None and size >= group_size // 8 and _is_anchor(stmt.text)):
+            yield run()
+            group, size = [], 0
+    if group:
+        yield run()
+
+
+def _parse_bulk(text, dialect):
+    """BulkRows of a COPY block or plain-literal INSERT, or None to sanitize the statement."""
+    if _COPY_STDIN_RE.match(text):
+        return parse_copy(text)
+    if dialect in BULK_DIALECTS:
+        return parse_insert(text, backslash_escapes=dialect == "mysql")
+    return None
+
+
+def _is_anchor(text):
+    """Content-defined run boundary: about one statement in 8 qualifies."""
+    return zlib.crc32(text[:256].encode('utf-8', 'surrogatepass')) % 8 == 0
+
+
+def _sanitize_group(text, engine, profile, cache, dialect=None):
+    if cache is None:
+        return SQLSanitizer.sanitize(text, engine=engine, profile=profile, dialect=dialect)
+    key = cache.key(text, engine, dialect)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit[0]
+    sql = SQLSanitizer.sanitize(text, engine=engine, profile=profile, dialect=dialect)
+    cache.put(key, sql)
+    return sql
+
+
+def load_sql_stream(conn, path, engine="regex", encoding=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE, flush_size=DEFAULT_FLUSH_SIZE, on_sql=None, profile=None,
+                    cache=None, dialect=None, sample_rows=None, deferred_indexes=None, batch_inserts=False,
+                    resume_at=0, on_commit=None, on_progress=None, skip=None, bulk=True, on_error=None):
+    """
+    Streams a .sql file into an open SQLite connection: read a chunk, split it
+    into statements, sanitize and execute them, and move on. Sanitized SQL is
+    executed in groups of about `flush_size` characters, one transaction each.
+
+    on_sql: optional function(sql) called with every sanitized group (e.g. a debug dump).
+    profile: optional RuleProfile accumulating sanitizer rule statistics over the whole file.
+    cache: optional SanitizeCache; statement runs seen before are not sanitized again.
+    dialect: rule families to apply, as in SQLSanitizer.sanitize ("auto" sniffs the file head).
+    sample_rows: load every DDL statement but only the first N INSERT rows per table;
+    the other INSERTs are skipped without being tokenized or sanitized (see RowSampler).
+    deferred_indexes: optional list; CREATE INDEX statements are appended to it instead
+    of being executed, for the caller to run after the data (see sqlite_load.finish_load).
+    batch_inserts: merge runs of single-row INSERTs of each group into multi-row statements
+    (see insert_batch.coalesce_inserts); on_sql still sees the sanitized SQL as it was.
+    resume_at: resume at this character offset (a checkpoint from on_commit); the text before
+    it is read but not executed.
+    on_commit: optional function(end, statements) called inside each group's transaction
+    just before it commits, with the file offset and statement count the group reaches
+    (e.g. to record a checkpoint atomically with the data).
+    on_progress: optional function(bytes_read, statements) called after each group
+    (bytes of the file read so far, statements read since resume_at).
+    skip: optional function(head) passing over INSERTs unsanitized, as SQLStatementReader's
+    (e.g. the rows of other tables when loading one shard of a dump).
+    bulk: load COPY blocks and the plain-literal INSERTs of MySQL / Postgres dumps with
+    executemany from rows parsed in Python (see bulk_rows), bypassing the sanitizer and
+    SQLite's parser; those statements do not reach on_sql. MySQL strings are read with
+    backslash escapes, as mysqldump writes them.
+    on_error: optional function(Quarantined) that turns on recovery: a group that fails is
+    rolled back and run again statement by statement (row by row for parsed rows) in one
+    transaction, bisecting down to the statements that fail on their own (see
+    quarantine.isolate). Each of them is passed to on_error and skipped; the rest of the
+    group commits as usual, on_commit included, so on_error may write to the database too.
+    That takes a rollback journal: a connection with journal_mode OFF is switched to MEMORY.
+    Returns the number of statements read. Raises SQLStreamError on failure.
+    """
+    if encoding is None:
+        encoding = detect_encoding(path, chunk_size)
+    if dialect == "auto":
+        dialect = sniff_dialect(path, encoding)
+    # pg_dump adds primary and foreign keys after the data: read them first, to create the tables with them
+    table_keys = scan_table_keys(path, encoding, chunk_size) if dialect == "postgres" else None
+    if on_error is not None and conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "off":
+        conn.execute("PRAGMA journal_mode = MEMORY")
+
+    group, group_size = [], 0
+    sources = []    # source Statements of each group entry, kept for recovery
+    group_start = group_end = 0
+
+    def flush():
+        if not group:
+            return
+        if isinstance(group[0], BulkRows):
+            return flush_rows()
+        sql = '\n'.join(group)
+        if on_sql:
+            on_sql(sql + '\n')
+        if batch_inserts:
+            sql = coalesce_inserts(sql)
+        try:
+            if on_commit is None:
+                conn.executescript(f"BEGIN;\n{sql}\nCOMMIT;")
+            else:
+                conn.executescript(f"BEGIN;\n{sql}\n")
+                on_commit(group_end, reader.count)
+                conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            if on_error is None:
+                raise SQLStreamError(str(e), group_start, group_end) from e
+            recover(e)
+
+    def flush_rows():
+        try:
+            conn.execute("BEGIN")
+            load_rows(conn, group)
+            if on_commit is not None:
+                on_commit(group_end, reader.count)
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            if on_error is None:
+                raise SQLStreamError(str(e), group_start, group_end) from e
+            recover(e)
+
+    def recover(error):
+        units = []
+        for item, stmts in zip(group, sources):
+            if isinstance(item, BulkRows):
+                units.append(_RowsUnit(stmts[0], item))
+            else:
+                # The sanitizer gives the same for a statement alone as within its run
+                units.extend(_StatementUnit(stmt, _sanitize_group(stmt.text, engine, None, None, dialect))
+                             for stmt in stmts)
+        try:
+            conn.execute("BEGIN")
+            for unit, e in isolate(conn, units, error):
+                on_error(unit.quarantined(e))
+            if on_commit is not None:
+                on_commit(group_end, reader.count)
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            raise SQLStreamError(str(e), group_start, group_end) from e
+
+    with open(path, 'r', encoding=encoding) as f:
+        go_seen = _skip_chars(f, resume_at, chunk_size) if resume_at else False
+        sampler = RowSampler(sample_rows) if sample_rows is not None else None
+        if sampler is not None and skip is not None:
+            skip_insert = lambda head: skip(head) or sampler.skip(head)
+        else:
+            skip_insert = sampler.skip if sampler else skip
+        reader = SQLStatementReader(f, chunk_size=chunk_size, backslash_escapes=bulk and dialect == "mysql",
+                                    skip=skip_insert, offset=resume_at,
+                                    whole_inserts=bulk and dialect in BULK_DIALECTS)
+        reader.go_seen = go_seen
+        for item in iter_sanitized(reader, engine, profile=profile, cache=cache, dialect=dialect, sampler=sampler,
+                                   deferred_indexes=deferred_indexes, bulk=bulk, statements=on_error is not None,
+                                   table_keys=table_keys):
+            start, end, sql = item[:3]
+            is_rows = isinstance(sql, BulkRows)
+            if not is_rows and not sql.strip(' \t\n;'):
+                continue
+            if group and is_rows != isinstance(group[0], BulkRows):
+                # Parsed rows and sanitized SQL go in separate transactions (executescript would commit)
+                flush()
+                group, sources, group_size = [], [], 0
+            if not group:
+                group_start = start
+            group.append(sql)
+            if on_error is not None:
+                sources.append(item[3])
+            group_size += end - start if is_rows else len(sql)
+            group_end = end
+            if group_size >= flush_size:
+                flush()
+                group, sources, group_size = [], [], 0
+                if on_progress:
+                    on_progress(f.buffer.tell(), reader.count)
+        flush()
+        if on_progress:
+            on_progress(f.buffer.tell(), reader.count)
+
+    if cache is not None:
+        cache.commit()
+    return reader.count
+
+
+class _StatementUnit:
+    """A sanitized source statement, for quarantine.isolate."""
+
+    __slots__ = ('stmt', 'sql')
+
+    def __init__(self, stmt, sql):
+        self.stmt = stmt
+        self.sql = sql
+
+    def run(self, conn):
+        for sql in split_statements(self.sql):
+            conn.execute(sql)
+
+    def parts(self):
+        return None
+
+    def quarantined(self, error):
+        return Quarantined(self.stmt.start, self.stmt.end, self.stmt.text, str(error))
+
+
+class _RowsUnit:
+    """Parsed rows of a source statement (all, or rows[first:] as a list), for quarantine.isolate."""
+
+    __slots__ = ('stmt', 'bulk', 'first', 'rows')
+
+    def __init__(self, stmt, bulk, first=0, rows=None):
+        self.stmt = stmt
+        self.bulk = bulk
+        self.first = first
+        self.rows = rows
+
+    def run(self, conn):
+        if self.rows is None:
+            self.bulk.load(conn)
+        else:
+            BulkRows(self.bulk.table, self.bulk.columns, self.rows).load(conn)
+
+    def parts(self):
+        rows = self.rows if self.rows is not None else list(self.bulk)
+        if len(rows) < 2:
+            return None
+        middle = len(rows) // 2
+        return [_RowsUnit(self.stmt, self.bulk, self.first, rows[:middle]),
+                _RowsUnit(self.stmt, self.bulk, self.first + middle, rows[middle:])]
+
+    def quarantined(self, error):
+        if self.rows is None or len(self.rows) != 1:
+            return Quarantined(self.stmt.start, self.stmt.end, self.stmt.text, str(error))
+        return Quarantined(self.stmt.start, self.stmt.end, repr(self.rows[0]), str(error), self.first)
+
+
+def _skip_chars(f, count, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Reads `count` characters of a text file; returns whether a GO line was among them."""
+    go_seen = False
+    tail = ''
+    while count > 0:
+        chunk = f.read(min(chunk_size, count))
+        if not chunk:
+            break
+        count -= len(chunk)
+        if not go_seen:
+            text = tail + chunk
+            go_seen = _GO_LINE_RE.search(text) is not None
+            tail = text[-16:]
+    return go_seen
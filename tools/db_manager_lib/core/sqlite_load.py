@@ -0,0 +1,159 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+
+# tmpfs mount used for "tmpfs" scratch databases when it exists (Linux)
+TMPFS_DIR = "/dev/shm"
+# A "tmpfs" database is only put there if the mount has this many times its expected
+# size free (a loaded dump takes about as much as its text, more with its indexes);
+# Docker's default /dev/shm is 64 MB
+TMPFS_HEADROOM = 2
+
+# Page cache for bulk loads, in KiB (negative cache_size = KiB rather than pages)
+BULK_CACHE_KB = 256 * 1024
+
+_BULK_PRAGMAS = (
+    ("synchronous", "OFF"),
+    ("cache_size", str(-BULK_CACHE_KB)),
+    ("temp_store", "MEMORY"),
+)
+
+
+class LoadProfile:
+    """
+    How a dump is loaded into SQLite.
+
+    pragmas run on the connection before the load. With defer_indexes the
+    CREATE INDEX statements of streamed loads (load_sql_stream, which has the
+    statement boundaries anyway) are held back and built once the rows are in,
+    instead of being updated row by row; final_pragmas run after that.
+    With batch_inserts, runs of single-row INSERTs are merged into multi-row
+    statements before they are executed (see insert_batch.coalesce_inserts).
+    location only matters for throwaway databases (see ScratchDatabase):
+    "disk" (temp dir), "tmpfs" (TMPFS_DIR when available and large enough) or "memory".
+    """
+
+    def __init__(self, name, pragmas=(), defer_indexes=False, final_pragmas=(), location="disk",
+                 batch_inserts=False):
+        self.name = name
+        self.pragmas = tuple(pragmas)
+        self.defer_indexes = defer_indexes
+        self.batch_inserts = batch_inserts
+        self.final_pragmas = tuple(final_pragmas)
+        self.location = location
+
+    def __repr__(self):
+        return f"LoadProfile({self.name!r})"
+
+
+LOAD_PROFILES = {
+    # Connection defaults (rollback journal on disk, synchronous=FULL), as before profiles existed
+    "default": LoadProfile("default"),
+    # Real imports: in-memory rollback journal (ROLLBACK on a failed file still works), no fsync,
+    # large page cache; WAL afterwards so the UI can read the database while later imports write
+    "bulk": LoadProfile("bulk", (("journal_mode", "MEMORY"),) + _BULK_PRAGMAS, defer_indexes=True,
+                        final_pragmas=(("journal_mode", "WAL"), ("synchronous", "NORMAL")), batch_inserts=True),
+    # Throwaway extraction databases: no journal at all, kept on tmpfs when it has room
+    "scratch": LoadProfile("scratch", (("journal_mode", "OFF"),) + _BULK_PRAGMAS, defer_indexes=True,
+                           location="tmpfs", batch_inserts=True),
+    # As "scratch", in memory (the whole dump has to fit in RAM)
+    "memory": LoadProfile("memory", (("journal_mode", "OFF"),) + _BULK_PRAGMAS, defer_indexes=True,
+                          location="memory", batch_inserts=True),
+}
+
+
+def get_load_profile(profile):
+    """A LoadProfile from its name in LOAD_PROFILES (a LoadProfile is returned as is)."""
+    if isinstance(profile, LoadProfile):
+        return profile
+    try:
+        return LOAD_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown load profile: {profile!r} (expected one of {', '.join(LOAD_PROFILES)})")
+
+
+def apply_load_profile(conn, profile):
+    """Runs the profile's pragmas on a connection before loading."""
+    profile = get_load_profile(profile)
+    for name, value in profile.pragmas:
+        # A database already in WAL stays there, so readers are not locked out while appending
+        if name == "journal_mode" and conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+            continue
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def finish_load(conn, profile, deferred_indexes=()):
+    """Builds the deferred indexes in one transaction, then runs the profile's final pragmas."""
+    profile = get_load_profile(profile)
+    if deferred_indexes:
+        try:
+            conn.executescript("BEGIN;\n" + "\n".join(deferred_indexes) + "\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    for name, value in profile.final_pragmas:
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+class ScratchDatabase:
+    """
+    A throwaway SQLite database placed according to a profile's location.
+    connect() opens sqlite3 connections to it, url is the SQLAlchemy URL,
+    close() deletes it. directory overrides the temp dir for "disk" databases.
+    size_hint: expected size in bytes (e.g. of the dump loaded into it); a "tmpfs"
+    database goes to the temp dir instead when TMPFS_DIR has less than TMPFS_HEADROOM
+    times that free (or is missing), see self.location.
+    An in-memory database is a shared-cache URI kept alive by one open
+    connection, so the loader and DBExtractor see the same data.
+    """
+
+    def __init__(self, location="disk", directory=None, size_hint=0):
+        self.location = location
+        self.path = None
+        self.uri = None
+        self._keeper = None
+        if location == "memory":
+            self.uri = f"file:scratch_{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._keeper = sqlite3.connect(self.uri, uri=True)
+        else:
+            if location == "tmpfs":
+                if _tmpfs_fits(size_hint):
+                    directory = TMPFS_DIR
+                else:
+                    self.location = "disk"
+            fd, self.path = tempfile.mkstemp(suffix=".db", dir=directory)
+            os.close(fd)
+
+    @property
+    def url(self):
+        if self.uri:
+            return f"sqlite:///{self.uri}&uri=true"
+        return f"sqlite:///{self.path}"
+
+    def connect(self):
+        if self.uri:
+            return sqlite3.connect(self.uri, uri=True)
+        return sqlite3.connect(self.path)
+
+    def close(self):
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except Exception as e:
+                print(f"Warning: Failed to remove temp DB {self.path}: {e}")
+
+
+def _tmpfs_fits(size):
+    """Whether TMPFS_DIR exists, is writable and has room for a database of `size` bytes."""
+    if not (os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK)):
+        return False
+    try:
+        return shutil.disk_usage(TMPFS_DIR).free >= size * TMPFS_HEADROOM
+    except OSError:
+        return False
@@ -5,6 +5,8 @@ import os
 import threading
 from tools.db_manager_lib.ui.dialogs import DBConnectionDialog
 from tools.db_manager_lib.core.importer import ImportManager
+from ontologymirror.core.progress import ABORTED, DONE
+from ontologymirror.extractors.catalog import is_import_table
 
 CONNECTIONS_FILE = "db_connections.json"
 
@@ -20,6 +22,8 @@ class DBManagerApp:
         self.connections = self.load_connections()
         self.connector = None
         self.importer = ImportManager(os.path.dirname(os.path.abspath(__file__)))
+        # "略過錯誤語句": imports skip (and record) the statements SQLite rejects instead of stopping
+        self.recover_var = tk.BooleanVar(value=False)
         
         self._init_ui()
 
@@ -35,6 +39,7 @@ class DBManagerApp:
         
         tk.Button(top_frame, text="新增連線", command=self.add_connection, bg="#f0f0f0").pack(side=tk.LEFT, padx=2)
         tk.Button(top_frame, text="匯入 SQL (.sql)", command=self.import_sql, bg="#fff9c4").pack(side=tk.LEFT, padx=2)
+        tk.Checkbutton(top_frame, text="略過錯誤語句", variable=self.recover_var).pack(side=tk.LEFT, padx=2)
         tk.Button(top_frame, text="開啟 DB (.db)", command=self.open_db_file, bg="#e0f7fa").pack(side=tk.LEFT, padx=2)
         tk.Button(top_frame, text="編輯", command=self.edit_connection).pack(side=tk.LEFT, padx=2)
         tk.Button(top_frame, text="刪除", command=self.delete_connection).pack(side=tk.LEFT, padx=2)
@@ -42,6 +47,10 @@ class DBManagerApp:
         self.type_label = tk.Label(top_frame, text="", fg="gray")
         self.type_label.pack(side=tk.LEFT, padx=10)
 
+        # Status bar: import progress (phase, MB, statements/s, ETA)
+        self.status_label = tk.Label(self.root, text="", fg="gray", anchor="w", padx=10)
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
         # Middle Frame: Actions
         action_frame = tk.Frame(self.root, padx=10, pady=5)
         action_frame.pack(fill=tk.X)
@@ -185,7 +194,8 @@ class DBManagerApp:
                 tables = cursor.fetchall()
                 
                 self.table_list.delete(0, tk.END)
-                for t in tables: self.table_list.insert(tk.END, t[0])
+                for t in tables:
+                    if not is_import_table(t[0]): self.table_list.insert(tk.END, t[0])
                 
                 self.active_conn = conn
                 messagebox.showinfo("成功", f"已連線至 {name}")
@@ -305,31 +315,42 @@ class DBManagerApp:
                 except: pass
             else: mode = "append" # Logic simplified for brevity
             
-        # Sorting Logic
+        # Sorting Logic: a stable starting order; ImportManager moves schema files first (see import_plan)
         sorted_files = sorted(file_paths)
         
+        errors = []     # error events of this import, shown if it fails
+
         def log_callback(msg):
             print(msg)
-            if "Error" in msg or "錯誤" in msg:
-                self.root.after(0, lambda: messagebox.showerror("匯入錯誤", msg))
-            elif "成功" in msg:
-                 def on_success():
-                    # Check if actually successful
-                    messagebox.showinfo("匯入完成", msg)
-                    
-                    # Auto-add connection
-                    conn_data = {
-                        "name": conn_name,
-                        "type": "SQLite",
-                        "params": {"path": db_path},
-                        "connection_string": f"sqlite:///{db_path}"
-                    }
-                    self.connections[conn_name] = conn_data
-                    self.save_connections()
-                    self.update_combo()
-                    self.conn_combo.set(conn_name)
-                    self.on_select_connection(None)
-                    
-                 self.root.after(0, on_success)
 
-        self.importer.run_import_thread(sorted_files, conn_name, db_path, mode, log_callback)
+        def on_finish(event):
+            # Dialogs follow how the import ended, not what its log lines say: a recovering
+            # import reports the statements it skipped and still ends DONE
+            if event.phase == ABORTED:
+                messagebox.showerror("匯入錯誤", "\n".join(errors[-3:]) or "匯入失敗")
+                return
+            messagebox.showinfo("匯入完成", event.message or f"成功匯入資料庫: {conn_name}")
+
+            # Auto-add connection
+            conn_data = {
+                "name": conn_name,
+                "type": "SQLite",
+                "params": {"path": db_path},
+                "connection_string": f"sqlite:///{db_path}"
+            }
+            self.connections[conn_name] = conn_data
+            self.save_connections()
+            self.update_combo()
+            self.conn_combo.set(conn_name)
+            self.on_select_connection(None)
+
+        def progress_callback(event):
+            # Already throttled by the importer to a few events per second
+            if event.error:
+                errors.append(f"{os.path.basename(event.file)}: {event.error}" if event.file else event.error)
+            self.root.after(0, lambda: self.status_label.config(text=event.summary()))
+            if event.phase in (DONE, ABORTED):
+                self.root.after(0, lambda: on_finish(event))
+
+        self.importer.recover = self.recover_var.get()
+        self.importer.run_import_thread(sorted_files, conn_name, db_path, mode, log_callback, progress_callback)
@@ -328,7 +328,7 @@ function App() {
           <>
             <div className="card upload-zone">
               <h2>方法一：上傳 SQL 檔案 (Upload SQL File)</h2>
-              <input type="file" accept=".sql" onChange={handleFileUpload} disabled={loading} />
+              <input type="file" accept=".sql,.gz,.bz2,.zip" onChange={handleFileUpload} disabled={loading} />
               {loading && <p>Processing...</p>}
             </div>
 